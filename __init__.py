@@ -1,29 +1,46 @@
-"""FrequenCipher audio forensics toolkit."""
-
-from .analysis import run_full_analysis
-from .ingestion import load_audio
-from .spectral import compute_spectral_features
-from .phase import detect_phase_anomalies
-from .backmask import detect_backmasking
-from .subliminal import detect_subliminal
-from .anomaly import score_anomalies
-from .steganography import detect_steganography
-from .watermark import detect_watermark
-from .temporal import check_temporal_manipulation
-from .report import generate_report
-from .models import AudioSignal
-
-__all__ = [
-    "run_full_analysis",
-    "load_audio",
-    "compute_spectral_features",
-    "detect_phase_anomalies",
-    "detect_backmasking",
-    "detect_subliminal",
-    "score_anomalies",
-    "detect_steganography",
-    "detect_watermark",
-    "check_temporal_manipulation",
-    "generate_report",
-    "AudioSignal",
-]
+"""FrequenCipher audio forensics toolkit.
+
+Public names are resolved on first access so that importing the package (or
+running ``frequencipher.cli --help``) does not pull in the scientific stack.
+"""
+
+from importlib import import_module
+from typing import Any, List
+
+_EXPORTS = {
+    "run_full_analysis": "analysis",
+    "run_streaming_analysis": "analysis",
+    "load_audio": "ingestion",
+    "compute_spectral_features": "spectral",
+    "detect_phase_anomalies": "phase",
+    "detect_backmasking": "backmask",
+    "detect_subliminal": "subliminal",
+    "score_anomalies": "anomaly",
+    "detect_steganography": "steganography",
+    "detect_pcm_steganography": "steganography",
+    "detect_watermark": "watermark",
+    "check_temporal_manipulation": "temporal",
+    "detect_enf": "enf",
+    "compare_channels": "channels",
+    "extract_fingerprints": "fingerprint",
+    "FingerprintIndex": "fingerprint",
+    "select_detectors": "registry",
+    "Profiler": "profiling",
+    "generate_report": "report",
+    "AudioSignal": "models",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
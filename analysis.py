@@ -1,31 +1,184 @@
 """High-level orchestration for the FrequenCipher pipeline."""
 from __future__ import annotations
 
-from typing import Any, Dict, Optional, Tuple
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
 
 import numpy as np
+import soundfile as sf
 
-from .anomaly import score_anomalies
-from .backmask import detect_backmasking
-from .ingestion import load_audio
+from . import anomaly as _anomaly
+from . import backmask as _backmask
+from . import channels as _channels
+from . import enf as _enf
+from . import fingerprint as _fingerprint
+from . import phase as _phase
+from . import spectral as _spectral
+from . import steganography as _steganography
+from . import subliminal as _subliminal
+from . import temporal as _temporal
+from . import watermark as _watermark
+from .anomaly import BaselineModel, flatten_summaries, load_baseline, score_anomalies
+from .backmask import StreamingBackmaskDetector, detect_backmasking, screen_backmasking
+from .cache import ResultCache, hash_file
+from .channels import compare_channels
+from .context import AnalysisContext
+from .enf import detect_enf
+from .export import write_matrices
+from .fingerprint import FingerprintIndex, match_fingerprints, open_index
+from .ingestion import _validate_path, load_audio
 from .models import AudioSignal
 from .phase import detect_phase_anomalies
-from .spectral import compute_spectral_features
-from .steganography import detect_steganography
-from .subliminal import detect_subliminal
+from .profiling import Profiler, profiling, stage
+from .registry import DETECTORS, requested_detectors, select_detectors
+from .scheduler import Task, run_tasks
+from .spectral import SPECTRAL_FEATURES, compute_spectral_features
+from .steganography import (
+    StreamingSteganographyDetector,
+    detect_pcm_steganography,
+    detect_steganography,
+    pcm_bit_depth,
+)
+from .streaming import (
+    DEFAULT_BLOCK_SIZE,
+    DEFAULT_OVERLAP,
+    StreamReader,
+    empty_samples,
+    run_streaming_detectors,
+)
+from .subliminal import StreamingSubliminalDetector, detect_subliminal
 from .temporal import check_temporal_manipulation
+from .triage import check_thresholds, escalation_triggers, triage_scores
 from .watermark import detect_watermark
 
 
 AnalysisResult = Dict[str, Dict[str, Any]]
 
+DETECTOR_VERSIONS: Dict[str, int] = {
+    "fingerprint": _fingerprint.ALGORITHM_VERSION,
+    "spectral": _spectral.ALGORITHM_VERSION,
+    "phase": _phase.ALGORITHM_VERSION,
+    "backmask": _backmask.ALGORITHM_VERSION,
+    "subliminal": _subliminal.ALGORITHM_VERSION,
+    "steganography": _steganography.ALGORITHM_VERSION,
+    "temporal": _temporal.ALGORITHM_VERSION,
+    "watermark": _watermark.ALGORITHM_VERSION,
+    "enf": _enf.ALGORITHM_VERSION,
+    "channels": _channels.ALGORITHM_VERSION,
+    "anomaly": _anomaly.ALGORITHM_VERSION,
+}
 
-def _flatten_summaries(summaries: Dict[str, Dict[str, float]]) -> Dict[str, float]:
-    flattened: Dict[str, float] = {}
-    for feature, stats in summaries.items():
-        for stat_name, value in stats.items():
-            flattened[f"{feature}_{stat_name}"] = float(value)
-    return flattened
+# Detectors declaring an ``ANALYSIS_RATE`` get the signal at that rate (capped
+# at the native rate; ``None`` means native) instead of the pipeline rate.
+DETECTOR_RATES: Dict[str, Optional[int]] = {
+    "fingerprint": _fingerprint.ANALYSIS_RATE,
+    "subliminal": _subliminal.ANALYSIS_RATE,
+    "temporal": _temporal.ANALYSIS_RATE,
+    "watermark": _watermark.ANALYSIS_RATE,
+    "enf": _enf.ANALYSIS_RATE,
+}
+
+
+def _cache_lookup(
+    cache: Optional[ResultCache],
+    path: str,
+    params: Dict[str, Any],
+) -> Tuple[Optional[str], Optional[Tuple[AudioSignal, AnalysisResult]]]:
+    if cache is None:
+        return None, None
+    _validate_path(Path(path))
+    key = cache.key(hash_file(path), {**params, "detectors": DETECTOR_VERSIONS})
+    payload = cache.get(key)
+    if payload is None:
+        return key, None
+    meta = payload["audio"]
+    audio = AudioSignal(
+        samples=empty_samples(meta["channels"]),
+        sample_rate=meta["sample_rate"],
+        channels=meta["channels"],
+        duration=meta["duration"],
+        path=Path(path),
+    )
+    return key, (audio, payload["results"])
+
+
+def _cache_store(cache: Optional[ResultCache], key: Optional[str], audio: AudioSignal, results: AnalysisResult) -> None:
+    if cache is None or key is None:
+        return
+    cache.put(
+        key,
+        {
+            "audio": {"sample_rate": audio.sample_rate, "channels": audio.channels, "duration": audio.duration},
+            "results": results,
+        },
+    )
+
+
+def _detector_rate(name: str, native_rate: int, pipeline_rate: int) -> int:
+    if name not in DETECTOR_RATES:
+        return pipeline_rate
+    rate = DETECTOR_RATES[name]
+    if rate is None or rate >= native_rate:
+        return native_rate
+    return rate
+
+
+def _spectral_subset(model: Optional[BaselineModel]) -> Optional[List[str]]:
+    """Spectral features the anomaly baseline reads, or ``None`` for all of them."""
+
+    if model is None:
+        return None
+    return [
+        feature
+        for feature in SPECTRAL_FEATURES + ("wavelet_coefficients",)
+        if any(name.startswith(f"{feature}_") for name in model.feature_names)
+    ]
+
+
+def _metadata_only(path: str, mono: bool) -> AudioSignal:
+    """Describe ``path`` from its header without decoding any samples."""
+
+    info = sf.info(path)
+    channels = 1 if mono else info.channels
+    return AudioSignal(
+        samples=empty_samples(channels),
+        sample_rate=info.samplerate,
+        channels=channels,
+        duration=info.frames / info.samplerate,
+        path=Path(path),
+    )
+
+
+def _staged(task: Task) -> Task:
+    def run(inputs: Mapping[str, Any]) -> Any:
+        with stage(f"detector.{task.name}"):
+            return task.func(inputs)
+
+    return Task(task.name, run, task.depends_on)
+
+
+def _profiled(
+    profiler: Profiler | bool,
+    run: Callable[[], Tuple[AudioSignal, AnalysisResult]],
+) -> Tuple[AudioSignal, AnalysisResult]:
+    """Run an analysis under ``profiler`` and add its measurements as the ``"profile"`` section."""
+
+    active = profiler if isinstance(profiler, Profiler) else Profiler()
+    with profiling(active):
+        with stage("analysis"):
+            audio, results = run()
+    # Measurements describe this run only, so they are added after caching.
+    return audio, {**results, "profile": active.to_dict()}
+
+
+def _detector_context(name: str, native: AnalysisContext, pipeline: AnalysisContext) -> AnalysisContext:
+    rate = _detector_rate(name, native.sample_rate, pipeline.sample_rate)
+    if rate == native.sample_rate:
+        return native
+    # Derive from the pipeline signal when it is fast enough: fewer input samples to filter.
+    source = pipeline if pipeline.sample_rate >= rate else native
+    return source.at_rate(rate)
 
 
 def run_full_analysis(
@@ -34,46 +187,366 @@ def run_full_analysis(
     target_sr: Optional[int] = 44100,
     mono: bool = True,
     include_raw_spectra: bool = False,
+    spectra_dir: str | Path | None = None,
+    cache: Optional[ResultCache] = None,
+    baseline: BaselineModel | str | Path | None = None,
+    detector_workers: Optional[int] = None,
+    profile: Optional[str] = None,
+    only: Optional[Iterable[str]] = None,
+    skip: Optional[Iterable[str]] = None,
+    profiler: Profiler | bool | None = None,
+    cascade: bool = False,
+    triage_thresholds: Optional[Mapping[str, float]] = None,
+    index: FingerprintIndex | str | Path | None = None,
 ) -> Tuple[AudioSignal, AnalysisResult]:
-    """Run the full analysis pipeline on the provided audio file."""
+    """Run the full analysis pipeline on the provided audio file.
 
-    audio = load_audio(path, target_sr=target_sr, mono=mono)
-    samples = audio.samples
-    sr = audio.sample_rate
+    ``baseline`` is a corpus anomaly model (or the path of one, loaded once per
+    process) used to score the file's spectral summaries; without one the
+    anomaly score is a per-file z-score.
 
-    mono_samples = samples if samples.ndim == 1 else np.mean(samples, axis=0)
-    spectral = compute_spectral_features(mono_samples, sr)
-    spectral_result: Dict[str, Any] = {
-        "summaries": spectral["summaries"],
-    }
+    ``index`` is a fingerprint index of known content (or its directory);
+    with one, the ``fingerprint`` detector reports the indexed tracks the
+    file contains (see :meth:`~frequencipher.fingerprint.FingerprintIndex.query`).
+    Without one that detector is left out of every selection.
+
+    With a ``cache``, results are looked up by a hash of the file contents and
+    the analysis parameters (including detector versions) before any audio is
+    decoded. On a hit the returned :class:`AudioSignal` carries metadata only
+    and an empty sample array.
+
+    Audio is decoded at its native rate and resampled once to ``target_sr``
+    for the pipeline; detectors listed in :data:`DETECTOR_RATES` instead get a
+    memoised copy at the rate they declare, and ``metadata["analysis_rates"]``
+    records the rate each of them used.
+
+    Integer PCM files get steganography analysis on their original samples
+    (:func:`~frequencipher.steganography.detect_pcm_steganography`); other
+    encodings are analysed from the decoded float signal.
+
+    Detectors run concurrently on ``detector_workers`` threads (default: one
+    per CPU, up to the number of detectors) sharing one analysis context;
+    result keys keep a fixed order. A detector that raises is reported as
+    ``{"error": ...}`` in its section and in ``metadata["errors"]`` while the
+    others keep their results, and such partial results are not cached.
+
+    ``profile``, ``only`` and ``skip`` choose which detectors run (see
+    :func:`~frequencipher.registry.select_detectors`); only their sections are
+    returned and ``metadata["detectors"]`` lists them. When spectral features
+    are computed only to feed a baseline, just the features it reads are
+    computed, and a selection that needs no decoded samples (steganography on
+    integer PCM) skips decoding altogether.
+
+    With a ``profiler`` (or ``True`` for a fresh
+    :class:`~frequencipher.profiling.Profiler`), the wall time, CPU time and
+    peak allocation of ingestion, resampling, each detector and each spectral
+    feature are returned in a ``"profile"`` section, which is never cached.
+
+    ``include_raw_spectra`` writes every spectral matrix as an ``.npy`` file
+    in ``spectra_dir`` (see :func:`~frequencipher.export.write_matrices`) and
+    references them by path, dtype and shape in ``spectral["matrices"]``.
+    Such runs bypass the cache, since the sidecar files belong to the caller.
+
+    With ``cascade``, only the first-tier detectors of the selection run at
+    first (see :class:`~frequencipher.registry.DetectorSpec`), the backmask
+    segment scan replaced by a coarse screen (``screen_score``). Their cheap
+    scores (see :func:`~frequencipher.triage.triage_scores`) are compared
+    with ``triage_thresholds`` (defaults in
+    :data:`~frequencipher.triage.TRIAGE_THRESHOLDS`), and the second tier
+    runs only if one of them is reached or a first-tier detector failed.
+    ``metadata["cascade"]`` records the scores, the triggers, whether the
+    file was escalated and the tier that ran each detector.
+    """
+
+    if include_raw_spectra and spectra_dir is None:
+        raise ValueError("include_raw_spectra needs a spectra_dir to write the matrices to")
+    if profiler:
+        return _profiled(
+            profiler,
+            lambda: run_full_analysis(
+                path,
+                target_sr=target_sr,
+                mono=mono,
+                include_raw_spectra=include_raw_spectra,
+                spectra_dir=spectra_dir,
+                cache=cache,
+                baseline=baseline,
+                detector_workers=detector_workers,
+                profile=profile,
+                only=only,
+                skip=skip,
+                cascade=cascade,
+                triage_thresholds=triage_thresholds,
+                index=index,
+            ),
+        )
+
+    fingerprints = open_index(index) if index is not None else None
+    selected = select_detectors(profile=profile, only=only, skip=skip)
+    if fingerprints is None:
+        selected = [name for name in selected if name != "fingerprint"]
+    thresholds = check_thresholds(triage_thresholds) if cascade else None
+    model = load_baseline(baseline) if isinstance(baseline, (str, Path)) else baseline
     if include_raw_spectra:
-        spectral_result["matrices"] = {k: v.tolist() for k, v in spectral["matrices"].items()}
+        cache = None
+    key, hit = _cache_lookup(
+        cache,
+        path,
+        {
+            "mode": "full",
+            "target_sr": target_sr,
+            "mono": mono,
+            "include_raw_spectra": include_raw_spectra,
+            "baseline": model.identifier if model is not None else None,
+            "index": fingerprints.identifier if fingerprints is not None else None,
+            "rates": DETECTOR_RATES,
+            "selected": selected,
+            "cascade": thresholds,
+        },
+    )
+    if hit is not None:
+        return hit
+
+    _validate_path(Path(path))
+    native_pcm = "steganography" in selected and pcm_bit_depth(path) is not None
+    if selected == ["steganography"] and native_pcm:
+        with stage("ingestion"):
+            native_audio = _metadata_only(path, mono)
+        native = AnalysisContext(native_audio.samples, native_audio.sample_rate)
+        context = native
+    else:
+        with stage("ingestion"):
+            native_audio = load_audio(path, mono=mono)
+        native = AnalysisContext(native_audio.samples, native_audio.sample_rate)
+        context = native.at_rate(target_sr)
+    samples = context.samples
+    sr = context.sample_rate
+    audio = AudioSignal(
+        samples=samples,
+        sample_rate=sr,
+        channels=native_audio.channels,
+        duration=native_audio.duration,
+        path=native_audio.path,
+    )
+
+    def at_rate(name: str) -> AnalysisContext:
+        return _detector_context(name, native, context)
+
+    requested = requested_detectors(profile=profile, only=only, skip=skip)
+    spectral_features = None if "spectral" in requested else _spectral_subset(model)
+
+    def fingerprint_task(_: Mapping[str, Any]) -> Dict[str, Any]:
+        fingerprint_ctx = at_rate("fingerprint")
+        return match_fingerprints(
+            fingerprint_ctx.samples, fingerprint_ctx.sample_rate, fingerprints, context=fingerprint_ctx
+        )
+
+    def spectral_task(_: Mapping[str, Any]) -> Dict[str, Any]:
+        spectral = compute_spectral_features(samples, sr, context=context, features=spectral_features)
+        spectral_result: Dict[str, Any] = {"summaries": spectral["summaries"]}
+        if include_raw_spectra:
+            with stage("export.spectra"):
+                spectral_result["matrices"] = write_matrices(spectral["matrices"], spectra_dir)
+        return spectral_result
+
+    def backmask_task(_: Mapping[str, Any]) -> Dict[str, Any]:
+        if not cascade:
+            return detect_backmasking(samples, sr, context=context)
+        screened = detect_backmasking(samples, sr, context=context, scan=False)
+        for section, signal in ((screened, context.mono), (screened.get("side"), context.side)):
+            if section is not None:
+                del section["max_segment_score"], section["segments"]
+                section["screen_score"] = screen_backmasking(signal, sr)
+        return screened
+
+    def subliminal_task(_: Mapping[str, Any]) -> Dict[str, Any]:
+        sub_ctx = at_rate("subliminal")
+        return detect_subliminal(sub_ctx.samples, sub_ctx.sample_rate, context=sub_ctx)
+
+    def stego_task(_: Mapping[str, Any]) -> Dict[str, Any]:
+        if native_pcm:
+            return detect_pcm_steganography(path)
+        return detect_steganography(samples, sr, context=context)
 
-    phase = detect_phase_anomalies(mono_samples, sr)
-    backmask = detect_backmasking(samples, sr)
-    subliminal = detect_subliminal(samples, sr)
-    stego = detect_steganography(samples, sr)
-    temporal = check_temporal_manipulation(samples, sr)
-    watermark = detect_watermark(samples, sr)
+    def temporal_task(_: Mapping[str, Any]) -> Dict[str, Any]:
+        temporal_ctx = at_rate("temporal")
+        return check_temporal_manipulation(temporal_ctx.samples, temporal_ctx.sample_rate, context=temporal_ctx)
 
-    flattened = _flatten_summaries(spectral["summaries"])
-    anomaly_features = np.array(list(flattened.values())).reshape(1, -1)
-    anomaly = score_anomalies(anomaly_features)
+    def watermark_task(_: Mapping[str, Any]) -> Dict[str, Any]:
+        watermark_ctx = at_rate("watermark")
+        return detect_watermark(watermark_ctx.samples, watermark_ctx.sample_rate, context=watermark_ctx)
+
+    def enf_task(_: Mapping[str, Any]) -> Dict[str, Any]:
+        enf_ctx = at_rate("enf")
+        return detect_enf(enf_ctx.samples, enf_ctx.sample_rate, context=enf_ctx)
+
+    def anomaly_task(inputs: Mapping[str, Any]) -> Dict[str, float]:
+        flattened = flatten_summaries(inputs["spectral"]["summaries"])
+        if model is not None:
+            anomaly_features = model.align(flattened).reshape(1, -1)
+        else:
+            anomaly_features = np.array(list(flattened.values())).reshape(1, -1)
+        return score_anomalies(anomaly_features, baseline=model)
+
+    tasks = [
+        Task("fingerprint", fingerprint_task),
+        Task("spectral", spectral_task),
+        Task("phase", lambda _: detect_phase_anomalies(samples, sr, context=context)),
+        Task("backmask", backmask_task),
+        Task("subliminal", subliminal_task),
+        Task("steganography", stego_task),
+        Task("temporal", temporal_task),
+        Task("watermark", watermark_task),
+        Task("enf", enf_task),
+        Task("channels", lambda _: compare_channels(samples, sr, context=context)),
+        Task("anomaly", anomaly_task, depends_on=("spectral",)),
+    ]
+    tasks = [_staged(task) for task in tasks if task.name in selected]
+
+    def run(batch: List[Task]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        workers = detector_workers if detector_workers is not None else min(len(batch), os.cpu_count() or 1)
+        return run_tasks(batch, workers=workers)
+
+    first = [task for task in tasks if not cascade or DETECTORS[task.name].tier == 1]
+    outcomes, errors = run(first)
+    tiers = {task.name: 1 for task in first}
+    triage: Optional[Dict[str, Any]] = None
+    if cascade:
+        scores = triage_scores(outcomes)
+        triggers = escalation_triggers(scores, thresholds)
+        # Fail open: a file the first tier could not score is never ruled clean.
+        escalated = bool(triggers or errors or not scores)
+        second = [task for task in tasks if task.name not in tiers]
+        if escalated:
+            if "backmask" in outcomes:
+                second.insert(0, _staged(Task("backmask", lambda _: detect_backmasking(samples, sr, context=context))))
+            later, later_errors = run(second)
+            for name, outcome in later.items():
+                merged = {**outcomes.get(name, {}), **outcome}
+                if "side" in outcome and "side" in outcomes.get(name, {}):
+                    merged["side"] = {**outcomes[name]["side"], **outcome["side"]}
+                outcomes[name] = merged
+            errors.update(later_errors)
+            tiers.update({task.name: 2 for task in second})
+        triage = {
+            "escalated": escalated,
+            "triggers": triggers,
+            "scores": scores,
+            "thresholds": thresholds,
+            "deferred": [] if escalated else [task.name for task in second],
+        }
+    native.clear()
+    context.clear()
+    ran = [name for name in selected if name in tiers]
 
     results: AnalysisResult = {
         "metadata": {
             "sample_rate": audio.sample_rate,
             "duration_seconds": audio.duration,
             "channels": audio.channels,
+            "analysis_rates": {
+                name: _detector_rate(name, native.sample_rate, sr) for name in DETECTOR_RATES if name in ran
+            },
+            "detectors": ran,
         },
-        "spectral": spectral_result,
-        "phase": phase,
-        "backmask": backmask,
-        "subliminal": subliminal,
-        "steganography": stego,
-        "temporal": temporal,
-        "watermark": watermark,
-        "anomaly": anomaly,
     }
+    if triage is not None:
+        results["metadata"]["cascade"] = {**triage, "tiers": {name: tiers[name] for name in ran}}
+    for name in ran:
+        results[name] = outcomes[name] if name in outcomes else {"error": errors[name]}
+    if errors:
+        results["metadata"]["errors"] = errors
+        # Failures may be transient (e.g. memory pressure); do not pin them in the cache.
+        return audio, results
+
+    _cache_store(cache, key, audio, results)
+    return audio, results
+
 
+def run_streaming_analysis(
+    path: str,
+    *,
+    mono: bool = True,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+    cache: Optional[ResultCache] = None,
+    profile: Optional[str] = None,
+    only: Optional[Iterable[str]] = None,
+    skip: Optional[Iterable[str]] = None,
+    profiler: Profiler | bool | None = None,
+) -> Tuple[AudioSignal, AnalysisResult]:
+    """Run the block-streaming detectors without holding the recording in memory.
+
+    The file is analysed at its native sample rate in blocks of
+    ``block_size`` samples: the returned :class:`AudioSignal` carries an
+    empty sample array, and the backmasking segment scan keeps only a mono
+    copy decimated to about 8 kHz. Only detectors with a streaming
+    implementation (backmasking, subliminal and steganography) are run;
+    their result keys match :func:`run_full_analysis` for the downmix, but
+    multi-channel input (``mono=False``) gets no ``side`` sections.
+    ``cache``, ``profile``, ``only``, ``skip`` and ``profiler`` behave as in
+    :func:`run_full_analysis`; selected detectors without a streaming
+    implementation are left out.
+    """
+
+    if profiler:
+        return _profiled(
+            profiler,
+            lambda: run_streaming_analysis(
+                path,
+                mono=mono,
+                block_size=block_size,
+                overlap=overlap,
+                cache=cache,
+                profile=profile,
+                only=only,
+                skip=skip,
+            ),
+        )
+
+    selected = [
+        name for name in select_detectors(profile=profile, only=only, skip=skip) if DETECTORS[name].streaming
+    ]
+    key, hit = _cache_lookup(
+        cache,
+        path,
+        {"mode": "stream", "mono": mono, "block_size": block_size, "overlap": overlap, "selected": selected},
+    )
+    if hit is not None:
+        return hit
+
+    native_pcm = "steganography" in selected and pcm_bit_depth(path) is not None
+    with StreamReader(path, mono=mono, scan_block_size=block_size) as reader:
+        detectors: Dict[str, Any] = {}
+        if "backmask" in selected:
+            detectors["backmask"] = StreamingBackmaskDetector(reader)
+        if "subliminal" in selected:
+            detectors["subliminal"] = StreamingSubliminalDetector(reader.sample_rate)
+        if "steganography" in selected and not native_pcm:
+            detectors["steganography"] = StreamingSteganographyDetector(reader.sample_rate)
+        streamed = (
+            run_streaming_detectors(reader, detectors, block_size=block_size, overlap=overlap) if detectors else {}
+        )
+        audio = AudioSignal(
+            samples=empty_samples(reader.channels),
+            sample_rate=reader.sample_rate,
+            channels=reader.channels,
+            duration=reader.duration,
+            path=reader.path,
+        )
+
+    results: AnalysisResult = {
+        "metadata": {
+            "sample_rate": audio.sample_rate,
+            "duration_seconds": audio.duration,
+            "channels": audio.channels,
+            "streaming": {"block_size": block_size, "overlap": overlap},
+            "detectors": selected,
+        },
+        **streamed,
+    }
+    if native_pcm:
+        with stage("detector.steganography"):
+            results["steganography"] = detect_pcm_steganography(path)
+    _cache_store(cache, key, audio, results)
     return audio, results
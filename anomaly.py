@@ -1,34 +1,234 @@
 """
 Machine learning-based anomaly detection.
 """
+import copy
+import functools
+import importlib.util
+import os
+import pickle
+import uuid
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Union
+
 import numpy as np
-from typing import Dict
 
-try:
-    # Import IsolationForest if available
-    from sklearn.ensemble import IsolationForest  # type: ignore
-    _HAS_SKLEARN = True
-except ImportError:
-    _HAS_SKLEARN = False
+# scikit-learn is optional and slow to import, so only probe for it here and
+# import IsolationForest when a forest is actually fitted.
+_HAS_SKLEARN = importlib.util.find_spec("sklearn") is not None
+
+ALGORITHM_VERSION = 3
+
+_MODEL_FORMAT_VERSION = 2
+_MAX_RETAINED_ROWS = 10_000
 
 
-def score_anomalies(features: np.ndarray) -> Dict[str, float]:
+class BaselineModel:
     """
-    Score anomalies using either an Isolation Forest or a statistical z‑score.
+    Anomaly baseline fitted once over a reference corpus of clean material.
+
+    The model pairs an Isolation Forest (when scikit-learn is available) with
+    per-feature mean and standard deviation used for the z-score fallback. It
+    retains a bounded uniform sample (reservoir) of the reference rows, which
+    the forest is fitted on and whose scores place new files as a percentile
+    of the clean population.
+
+    Parameters
+    ----------
+    feature_names : sequence of str
+        Column names of the feature matrices the model is fitted on and scores.
+    n_estimators : int
+        Number of trees in the Isolation Forest.
+    random_state : int
+        Seed for the Isolation Forest.
+    """
+
+    def __init__(self, feature_names: Sequence[str], *, n_estimators: int = 100, random_state: int = 0):
+        self.feature_names = list(feature_names)
+        self.n_estimators = n_estimators
+        self.random_state = random_state
+        self.n_samples = 0
+        self.identifier = ""
+        self._mean = np.zeros(len(self.feature_names))
+        self._m2 = np.zeros(len(self.feature_names))
+        self._forest = None
+        self._rows = np.empty((0, len(self.feature_names)))
+        self._reference_scores = np.empty(0)
+
+    def _check(self, features: np.ndarray) -> np.ndarray:
+        features = np.atleast_2d(np.asarray(features, dtype=np.float64))
+        if features.shape[1] != len(self.feature_names):
+            raise ValueError(
+                f"Expected {len(self.feature_names)} features per row, got {features.shape[1]}"
+            )
+        return np.nan_to_num(features, nan=0.0, posinf=0.0, neginf=0.0)
+
+    def _update_moments(self, features: np.ndarray) -> None:
+        count = features.shape[0]
+        batch_mean = features.mean(axis=0)
+        batch_m2 = ((features - batch_mean) ** 2).sum(axis=0)
+        total = self.n_samples + count
+        delta = batch_mean - self._mean
+        self._mean = self._mean + delta * count / total
+        self._m2 = self._m2 + batch_m2 + delta**2 * self.n_samples * count / total
+        self.n_samples = total
+
+    def _z_scores(self, features: np.ndarray) -> np.ndarray:
+        std = np.sqrt(self._m2 / max(self.n_samples, 1))
+        return np.mean(np.abs((features - self._mean) / (std + 1e-8)), axis=1)
+
+    def fit(self, features: np.ndarray) -> "BaselineModel":
+        """Fit the baseline from scratch on a ``(n_files, n_features)`` matrix."""
+
+        features = self._check(features)
+        self.n_samples = 0
+        self._mean = np.zeros(features.shape[1])
+        self._m2 = np.zeros(features.shape[1])
+        self._forest = None
+        self._rows = np.empty((0, features.shape[1]))
+        self._reference_scores = np.empty(0)
+        return self.partial_fit(features)
+
+    def _retain(self, features: np.ndarray) -> None:
+        """Reservoir-sample ``features`` into the retained rows (call before updating ``n_samples``)."""
+
+        room = max(_MAX_RETAINED_ROWS - self._rows.shape[0], 0)
+        # A new array, so copies from load_baseline never share the rows written below.
+        self._rows = np.concatenate([self._rows, features[:room]])
+        rng = np.random.default_rng((self.random_state, self.n_samples))
+        for seen, row in enumerate(features[room:], start=self.n_samples + room):
+            slot = rng.integers(0, seen + 1)
+            if slot < _MAX_RETAINED_ROWS:
+                self._rows[slot] = row
+
+    def partial_fit(self, features: np.ndarray) -> "BaselineModel":
+        """
+        Incrementally extend the baseline with newly collected clean material.
+
+        The new rows join the retained reservoir, the running feature moments
+        are updated and the Isolation Forest is refitted on the reservoir, so
+        earlier corpora never need to be re-read. The reference scores are
+        recomputed with the refitted model, keeping percentiles on one scale.
+        """
+
+        features = self._check(features)
+        self._retain(features)
+        self._update_moments(features)
+        if _HAS_SKLEARN and self._rows.shape[0] > 1:
+            from sklearn.ensemble import IsolationForest  # type: ignore
+
+            self._forest = IsolationForest(
+                n_estimators=self.n_estimators,
+                contamination="auto",
+                random_state=self.random_state,
+            ).fit(self._rows)
+        self._reference_scores = self.score(self._rows)
+        self.identifier = uuid.uuid4().hex
+        return self
+
+    def score(self, features: np.ndarray) -> np.ndarray:
+        """Return one anomaly score per row; higher means more anomalous."""
+
+        features = self._check(features)
+        if self._forest is not None:
+            return -self._forest.score_samples(features)
+        return self._z_scores(features)
+
+    def percentile(self, scores: np.ndarray) -> np.ndarray:
+        """Fraction of the reference corpus scoring at or below each score."""
+
+        reference = np.sort(self._reference_scores)
+        if reference.size == 0:
+            return np.full(np.shape(scores), np.nan)
+        return np.searchsorted(reference, scores, side="right") / reference.size
+
+    def align(self, features: Dict[str, float]) -> np.ndarray:
+        """Order a name-to-value mapping into this model's feature columns."""
+
+        return np.array([features.get(name, np.nan) for name in self.feature_names], dtype=np.float64)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Persist the model to ``path`` (written atomically)."""
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("wb") as f:
+            pickle.dump({"format": _MODEL_FORMAT_VERSION, "model": self}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "BaselineModel":
+        """Load a model written by :meth:`save`."""
+
+        with Path(path).open("rb") as f:
+            payload = pickle.load(f)
+        if not isinstance(payload, dict) or "format" not in payload:
+            raise ValueError(f"'{path}' is not a FrequenCipher baseline model")
+        if payload["format"] != _MODEL_FORMAT_VERSION:
+            raise ValueError(f"'{path}' was written by an incompatible FrequenCipher version; refit it")
+        return payload["model"]
+
+
+def flatten_summaries(summaries: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    """Flatten ``{feature: {stat: value}}`` into ``{"feature_stat": value}`` model features."""
+
+    flattened: Dict[str, float] = {}
+    for feature, stats in summaries.items():
+        for stat_name, value in stats.items():
+            flattened[f"{feature}_{stat_name}"] = float(value)
+    return flattened
+
+
+@functools.lru_cache(maxsize=4)
+def _load_cached(path: str, mtime: float) -> BaselineModel:
+    return BaselineModel.load(path)
+
+
+def load_baseline(path: Union[str, Path]) -> BaselineModel:
+    """
+    Load a baseline model once per process.
+
+    The file is unpickled once per modification, so batch workers and
+    services pay that cost only once. Each call returns a shallow copy of the
+    cached model: :meth:`BaselineModel.fit` and :meth:`BaselineModel.partial_fit`
+    replace its arrays and forest rather than modifying them, so updating one
+    copy leaves the cache and every other caller's copy untouched.
+    """
+
+    resolved = os.path.abspath(path)
+    return copy.copy(_load_cached(resolved, os.path.getmtime(resolved)))
+
+
+def score_anomalies(features: np.ndarray, baseline: Optional[BaselineModel] = None) -> Dict[str, float]:
+    """
+    Score anomalies using a corpus baseline, an Isolation Forest or a statistical z‑score.
 
     Parameters
     ----------
     features : np.ndarray
         2D feature matrix where rows correspond to observations and columns to
         features extracted from the audio.
+    baseline : BaselineModel, optional
+        Model fitted on a reference corpus. When given, rows are scored against
+        it and the result also carries ``baseline_percentile``, the share of the
+        reference corpus that scored at or below this observation.
 
     Returns
     -------
     dict
-        A dictionary with a single key ``anomaly_score``. Higher scores
-        indicate more anomalous data.
+        A dictionary with the key ``anomaly_score``. Higher scores indicate
+        more anomalous data.
     """
-    if _HAS_SKLEARN and features.ndim == 2:
+    if baseline is not None:
+        scores = baseline.score(features)
+        score = float(np.mean(scores))
+        return {
+            "anomaly_score": score,
+            "baseline_percentile": float(baseline.percentile(np.array([score]))[0]),
+        }
+    if _HAS_SKLEARN and features.ndim == 2 and features.shape[0] > 1:
+        from sklearn.ensemble import IsolationForest  # type: ignore
+
         # Use IsolationForest to compute anomaly scores
         clf = IsolationForest(n_estimators=100, contamination='auto', random_state=0)
         clf.fit(features)
@@ -36,7 +236,8 @@ def score_anomalies(features: np.ndarray) -> Dict[str, float]:
         scores = -clf.score_samples(features)
         return {"anomaly_score": float(np.mean(scores))}
     else:
-        # Fall back to z-score on flattened features
+        # A forest fitted on a single observation carries no information, so
+        # fall back to z-score on flattened features
         flattened = features.flatten()
         z_scores = np.abs((flattened - flattened.mean()) / (flattened.std() + 1e-8))
         return {"anomaly_score": float(np.mean(z_scores))}
@@ -1,28 +1,350 @@
 """Real-time backmasking detection via reversed audio analysis."""
 from __future__ import annotations
 
-from typing import Dict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
-from scipy.signal import correlate
 
+from .context import AnalysisContext, ensure_context
+from .resample import PolyphaseResampler
 from .statistics import summarise_array
+from .streaming import AudioBlock, StreamReader, mono_block
 
+ALGORITHM_VERSION = 5
 
-def detect_backmasking(samples: np.ndarray, sample_rate: int) -> Dict[str, float]:
-    """Detect potential backmasked speech by comparing forward and reversed audio."""
+_SCAN_CHUNK = 1 << 20
+# Decimation misaligns mirrored samples by up to half a coarse sample, so the
+# coarse screen accepts lower scores than the full-rate verification.
+_SCREEN_RATIO = 0.5
+_MAX_SPANS = 16
+
+
+def _frame_correlations(forward: np.ndarray, backward: np.ndarray) -> np.ndarray:
+    """Pearson correlation of matching rows, ``0`` where either row is constant."""
+
+    a = forward - forward.mean(axis=1, keepdims=True)
+    b = backward - backward.mean(axis=1, keepdims=True)
+    numerator = np.einsum("ij,ij->i", a, b, dtype=np.float64)
+    denominator = np.sqrt(np.einsum("ij,ij->i", a, a, dtype=np.float64) * np.einsum("ij,ij->i", b, b, dtype=np.float64))
+    correlations = np.zeros(forward.shape[0], dtype=np.float64)
+    valid = denominator > 0
+    correlations[valid] = numerator[valid] / denominator[valid]
+    return correlations
+
+
+def _decimate(samples: np.ndarray, sample_rate: int, analysis_rate: Optional[int]) -> Tuple[np.ndarray, float]:
+    factor = sample_rate // analysis_rate if analysis_rate else 1
+    if factor < 2:
+        return samples, float(sample_rate)
+    from scipy.signal import resample_poly
+
+    return resample_poly(samples, 1, factor).astype(np.float32), sample_rate / factor
+
+
+def _mirror_candidates(samples: np.ndarray, count: int, separation: int) -> np.ndarray:
+    """Return the strongest mirror sums ``S`` where ``x[n]`` resembles ``x[S - n]``.
+
+    Correlating a signal with its own reversal is a self-convolution, so one
+    FFT of length ``2N`` scores every pairing of forward and reversed
+    positions at once. The phase transform (PHAT) weighting whitens the
+    spectrum so broadband reversed material yields sharp peaks instead of
+    being drowned out by tonal energy.
+    """
+
+    from scipy.fft import irfft, next_fast_len, rfft
+    from scipy.signal import find_peaks
+
+    size = samples.size
+    nfft = next_fast_len(2 * size - 1, real=True)
+    spectrum = rfft(samples, nfft)
+    spectrum *= spectrum
+    spectrum /= np.abs(spectrum) + 1e-12
+    mirror = irfft(spectrum, nfft)[: 2 * size - 1]
+    peaks, properties = find_peaks(mirror, distance=max(1, separation), height=0.0)
+    strongest = np.argsort(properties["peak_heights"])[::-1][:count]
+    return peaks[strongest]
+
+
+def _scan_mirror(
+    samples: np.ndarray,
+    mirror_sum: int,
+    windows: Sequence[int],
+    threshold: float,
+    region: Optional[Tuple[int, int]] = None,
+) -> List[Tuple[int, int, float]]:
+    """Windowed correlation between ``x[n]`` and ``x[S - n]`` for one mirror sum.
+
+    Window sums are built from half-window block sums computed chunk by
+    chunk, so memory stays proportional to the number of windows. Returns
+    ``(window, start, score)`` for windows scoring at least ``threshold``
+    that precede, and do not overlap, their mirrored partner. ``region``
+    optionally restricts the forward indices scanned.
+    """
+
+    size = samples.size
+    lo = max(0, mirror_sum - (size - 1))
+    hi = min(size - 1, mirror_sum) + 1
+    if region is not None:
+        lo, hi = max(lo, region[0]), min(hi, region[1])
+
+    hits: List[Tuple[int, int, float]] = []
+    for window in windows:
+        half = max(1, window // 2)
+        blocks = (hi - lo) // half
+        if blocks < 2:
+            continue
+        block_sums = np.empty((5, blocks), dtype=np.float64)
+        step = max(1, _SCAN_CHUNK // half)
+        for first in range(0, blocks, step):
+            last = min(blocks, first + step)
+            start, stop = lo + first * half, lo + last * half
+            a = samples[start:stop].astype(np.float64)
+            b = samples[mirror_sum - stop + 1 : mirror_sum - start + 1][::-1].astype(np.float64)
+            for row, values in enumerate((a, b, a * a, b * b, a * b)):
+                block_sums[row, first:last] = values.reshape(-1, half).sum(axis=1)
+
+        width = 2 * half
+        sum_a, sum_b, sum_aa, sum_bb, sum_ab = block_sums[:, :-1] + block_sums[:, 1:]
+        covariance = sum_ab - sum_a * sum_b / width
+        variance = (sum_aa - sum_a**2 / width) * (sum_bb - sum_b**2 / width)
+        score = np.zeros(blocks - 1)
+        valid = variance > 1e-12
+        score[valid] = covariance[valid] / np.sqrt(variance[valid])
+        forward_start = lo + np.arange(blocks - 1) * half
+        mirror_start = mirror_sum - (forward_start + width - 1)
+        keep = (score >= threshold) & (forward_start + width <= mirror_start)
+        hits.extend((width, int(begin), float(value)) for begin, value in zip(forward_start[keep], score[keep]))
+    return hits
+
+
+def _merge_hits(hits: Sequence[Tuple[int, int, float]]) -> List[Tuple[int, int, int, float, int]]:
+    """Merge overlapping same-scale windows into ``(window, start, end, score, best_start)`` spans.
+
+    ``score`` is the best window's and ``best_start`` where that window starts.
+    """
+
+    spans: List[Tuple[int, int, int, float, int]] = []
+    for window in sorted({hit[0] for hit in hits}):
+        current: Optional[List[float]] = None
+        for _, start, score in sorted(hit for hit in hits if hit[0] == window):
+            if current is not None and start <= current[1]:
+                current[1] = start + window
+                if score > current[2]:
+                    current[2], current[3] = score, start
+                continue
+            if current is not None:
+                spans.append((window, int(current[0]), int(current[1]), current[2], int(current[3])))
+            current = [start, start + window, score, start]
+        if current is not None:
+            spans.append((window, int(current[0]), int(current[1]), current[2], int(current[3])))
+    return spans
+
+
+def _forward_similarity(samples: np.ndarray, start: int, window: int, partner: int) -> float:
+    """Best correlation of ``x[start:start + window]``, *not* reversed, with windows starting near ``partner``.
+
+    Windows starting up to half a window either side of ``partner`` are
+    tried, so a signal that repeats with any period shorter than that
+    (steady tones, held chords) matches its mirror region this way too.
+    """
+
+    from scipy.signal import fftconvolve
+
+    reach = window // 2
+    lo = max(0, partner - reach)
+    hi = min(samples.size, partner + window + reach)
+    a = samples[start : start + window].astype(np.float64)
+    region = samples[lo:hi].astype(np.float64)
+    if a.size < window or region.size < window:
+        return 0.0
+    a -= a.mean()
+    numerator = fftconvolve(region, a[::-1], mode="valid")
+    sums = np.concatenate(([0.0], np.cumsum(region)))
+    squares = np.concatenate(([0.0], np.cumsum(region * region)))
+    total = sums[window:] - sums[:-window]
+    variance = (squares[window:] - squares[:-window]) - total * total / window
+    denominator = np.sqrt(np.maximum(variance, 0.0) * np.dot(a, a))
+    valid = denominator > 1e-12
+    return float(np.max(numerator[valid] / denominator[valid])) if valid.any() else 0.0
+
+
+def _discounted(samples: np.ndarray, window: int, start: int, mirror_sum: int, score: float) -> float:
+    """Mirror ``score`` of a window, discounted by how well the window matches its partner region unreversed.
+
+    Stationary periodic material (a steady tone, a held chord) is nearly
+    time-symmetric, so it matches its mirror about as well as it matches
+    itself one period on. The result is the share of the forward mismatch
+    ``1 - forward`` that the mirror explains: ``1`` for an exact reversal,
+    ``0`` when the reversal fits no better than an unreversed copy.
+    """
+
+    forward = max(_forward_similarity(samples, start, window, mirror_sum - start - window + 1), 0.0)
+    if forward >= 1.0 - 1e-9:
+        return 0.0
+    return float(min(1.0, max(0.0, 1.0 - (1.0 - score) / (1.0 - forward))))
+
+
+def _refine_mirror(samples: np.ndarray, guess: int, factor: int, start: int, end: int) -> int:
+    """Pick the full-rate mirror sum near ``guess`` that best matches ``[start, end)``."""
+
+    best, best_score = guess, -np.inf
+    for mirror_sum in range(guess - factor, guess + factor + 1):
+        lo = max(start, mirror_sum - (samples.size - 1))
+        hi = min(end, mirror_sum + 1)
+        if hi - lo < 2:
+            continue
+        a = samples[lo:hi].astype(np.float64)
+        b = samples[mirror_sum - hi + 1 : mirror_sum - lo + 1][::-1].astype(np.float64)
+        denominator = np.sqrt(np.dot(a, a) * np.dot(b, b))
+        score = np.dot(a, b) / denominator if denominator > 0 else -np.inf
+        if score > best_score:
+            best, best_score = mirror_sum, score
+    return best
+
+
+def scan_backmasking(
+    samples: np.ndarray,
+    sample_rate: int,
+    *,
+    scales: Sequence[float] = (0.25, 0.5, 1.0),
+    threshold: float = 0.6,
+    max_candidates: int = 8,
+    analysis_rate: Optional[int] = 8000,
+    max_segments: int = 50,
+) -> List[Dict[str, float]]:
+    """Locate segments that reappear time-reversed elsewhere in the recording.
+
+    The strongest mirror pairings are found with a single FFT
+    self-convolution of the signal decimated to roughly ``analysis_rate``,
+    screened with windowed correlations at every scale (window lengths in
+    seconds), then re-aligned and scored at the full sample rate around the
+    screened spans only, so runtime grows as ``N log N``. Each segment gives
+    the forward span (``start``/``end``), where its reversal sits
+    (``mirror_start``/``mirror_end``), both in seconds, and the best window
+    ``score``. Scores are discounted by how well that window matches its
+    mirror region *unreversed*, so stationary tonal material, which is
+    nearly time-symmetric, does not pass for a reversal.
+    """
 
     if samples.ndim > 1:
         samples = np.mean(samples, axis=0)
+    signal, rate = _decimate(samples, sample_rate, analysis_rate)
+    return _scan(
+        samples,
+        sample_rate,
+        signal,
+        rate,
+        scales=scales,
+        threshold=threshold,
+        max_candidates=max_candidates,
+        max_segments=max_segments,
+    )
 
+
+def _scan(
+    samples: Any,
+    sample_rate: int,
+    signal: np.ndarray,
+    rate: float,
+    *,
+    scales: Sequence[float] = (0.25, 0.5, 1.0),
+    threshold: float = 0.6,
+    max_candidates: int = 8,
+    max_segments: int = 50,
+) -> List[Dict[str, float]]:
+    """Body of :func:`scan_backmasking` given the decimated ``signal`` at ``rate``.
+
+    ``samples`` is only sliced around screened spans, so it may be a
+    :class:`_ReaderSamples` view that reads them from the file.
+    """
+
+    factor = int(round(sample_rate / rate))
+    coarse_windows = sorted({max(2, int(round(scale * rate))) for scale in scales})
+    full_windows = sorted({max(2, int(round(scale * sample_rate))) for scale in scales})
+    if signal.size < 2 * coarse_windows[0]:
+        return []
+
+    segments: List[Dict[str, float]] = []
+    for coarse_sum in _mirror_candidates(signal, max_candidates, coarse_windows[0]):
+        coarse_sum = int(coarse_sum)
+        screened = _merge_hits(_scan_mirror(signal, coarse_sum, coarse_windows, threshold * _SCREEN_RATIO))
+        for _, start, end, _, _ in sorted(screened, key=lambda span: span[3], reverse=True)[:_MAX_SPANS]:
+            region = (max(0, (start - coarse_windows[-1]) * factor), (end + coarse_windows[-1]) * factor)
+            mirror_sum = coarse_sum
+            if factor > 1:
+                mirror_sum = _refine_mirror(samples, coarse_sum * factor, factor, start * factor, end * factor)
+            hits = _scan_mirror(samples, mirror_sum, full_windows, threshold, region)
+            for window, begin, finish, score, best in _merge_hits(hits):
+                score = _discounted(samples, window, best, mirror_sum, score)
+                if score < threshold:
+                    continue
+                segments.append(
+                    {
+                        "start": float(begin / sample_rate),
+                        "end": float(finish / sample_rate),
+                        "mirror_start": float((mirror_sum - finish + 1) / sample_rate),
+                        "mirror_end": float((mirror_sum - begin + 1) / sample_rate),
+                        "score": score,
+                        "scale_seconds": float(window / sample_rate),
+                    }
+                )
+
+    unique = {(seg["start"], seg["end"], seg["mirror_start"], seg["scale_seconds"]): seg for seg in segments}
+    strongest = sorted(unique.values(), key=lambda segment: segment["score"], reverse=True)[:max_segments]
+    return sorted(strongest, key=lambda segment: (segment["start"], segment["scale_seconds"]))
+
+
+def screen_backmasking(
+    samples: np.ndarray,
+    sample_rate: int,
+    *,
+    scales: Sequence[float] = (0.25, 0.5, 1.0),
+    threshold: float = 0.6,
+    max_candidates: int = 8,
+    analysis_rate: Optional[int] = 8000,
+) -> float:
+    """Cheap indicator of the best segment score :func:`scan_backmasking` would find.
+
+    The decimated mirror search and coarse windowed correlations run as in
+    the scanner, but only the best coarse window of each candidate is
+    re-aligned and scored, with the scanner's discount for stationary
+    periodic material, at the full sample rate. Returns ``0`` when no
+    coarse window passes the screen.
+    """
+
+    if samples.ndim > 1:
+        samples = np.mean(samples, axis=0)
+    signal, rate = _decimate(samples, sample_rate, analysis_rate)
+    factor = int(round(sample_rate / rate))
+    coarse_windows = sorted({max(2, int(round(scale * rate))) for scale in scales})
+    if signal.size < 2 * coarse_windows[0]:
+        return 0.0
+
+    best = 0.0
+    for coarse_sum in _mirror_candidates(signal, max_candidates, coarse_windows[0]):
+        coarse_sum = int(coarse_sum)
+        hits = _scan_mirror(signal, coarse_sum, coarse_windows, threshold * _SCREEN_RATIO)
+        if not hits:
+            continue
+        window, start, _ = max(hits, key=lambda hit: hit[2])
+        begin, end = start * factor, (start + window) * factor
+        mirror_sum = coarse_sum
+        if factor > 1:
+            mirror_sum = _refine_mirror(samples, coarse_sum * factor, factor, begin, end)
+        verified = _scan_mirror(samples, mirror_sum, [end - begin], -1.0, (begin, end))
+        best = max([best] + [_discounted(samples, width, at, mirror_sum, score) for width, at, score in verified])
+    return float(best)
+
+
+def _backmask_metrics(samples: np.ndarray, sample_rate: int, scan: bool) -> Dict[str, Any]:
     reversed_samples = samples[::-1]
 
-    norm = np.linalg.norm(samples) * np.linalg.norm(reversed_samples)
+    norm = float(np.dot(samples, samples))
     if norm == 0:
         peak_correlation = 0.0
     else:
-        correlation = correlate(samples, reversed_samples, mode="valid")
-        peak_correlation = float(np.max(np.abs(correlation)) / norm)
+        # 'valid' correlation of two equal-length arrays is their single zero-lag dot product.
+        peak_correlation = abs(float(np.dot(samples, reversed_samples))) / norm
 
     frame_size = min(len(samples), sample_rate * 5)
     if frame_size == 0:
@@ -32,15 +354,7 @@ def detect_backmasking(samples: np.ndarray, sample_rate: int) -> Dict[str, float
         frames = len(samples) // frame_size or 1
         reshaped = samples[: frames * frame_size].reshape(frames, frame_size)
         reversed_reshaped = reversed_samples[: frames * frame_size].reshape(frames, frame_size)
-        frame_correlations = []
-        for i in range(frames):
-            a = reshaped[i]
-            b = reversed_reshaped[i]
-            if np.std(a) == 0 or np.std(b) == 0:
-                frame_correlations.append(0.0)
-            else:
-                frame_correlations.append(float(np.corrcoef(a, b)[0, 1]))
-        summary = summarise_array(np.array(frame_correlations)).to_dict()
+        summary = summarise_array(_frame_correlations(reshaped, reversed_reshaped)).to_dict()
         energy_symmetry = float(
             np.mean(
                 np.abs(np.sum(reshaped, axis=1) - np.sum(reversed_reshaped, axis=1))
@@ -48,9 +362,140 @@ def detect_backmasking(samples: np.ndarray, sample_rate: int) -> Dict[str, float
             / frame_size
         )
 
+    segments = scan_backmasking(samples, sample_rate) if scan and samples.size else []
+
     return {
         "peak_correlation": peak_correlation,
         "frame_correlation_mean": summary["mean"],
         "frame_correlation_std": summary["std"],
         "energy_symmetry": energy_symmetry,
+        "max_segment_score": max((segment["score"] for segment in segments), default=0.0),
+        "segments": segments,
     }
+
+
+def detect_backmasking(
+    samples: np.ndarray,
+    sample_rate: int,
+    *,
+    context: Optional[AnalysisContext] = None,
+    scan: bool = True,
+) -> Dict[str, Any]:
+    """Detect potential backmasked speech by comparing forward and reversed audio.
+
+    Besides the global symmetry metrics, ``segments`` lists where material
+    reappears time-reversed (see :func:`scan_backmasking`); pass
+    ``scan=False`` to skip the scanner. Multi-channel input is analysed as
+    its mono downmix and, under ``side`` with the same keys, as its side
+    signal (see :attr:`~frequencipher.context.AnalysisContext.side`), where
+    content planted in antiphase survives.
+    """
+
+    context = ensure_context(samples, sample_rate, context)
+    result = _backmask_metrics(context.mono, sample_rate, scan)
+    if context.side is not None:
+        result["side"] = _backmask_metrics(context.side, sample_rate, scan)
+    return result
+
+
+class _ReaderSamples:
+    """Mono samples of a :class:`StreamReader`, read from the file when sliced."""
+
+    ndim = 1
+
+    def __init__(self, reader: StreamReader) -> None:
+        self.reader = reader
+        self.size = reader.frames
+
+    def __getitem__(self, index: slice) -> np.ndarray:
+        start, stop, _ = index.indices(self.size)
+        samples = self.reader.read(start, stop - start)
+        return samples if samples.ndim == 1 else np.mean(samples, axis=0)
+
+
+class StreamingBackmaskDetector:
+    """Block-wise counterpart of :func:`detect_backmasking`.
+
+    For every forward block the mirrored segment is read from the end of the
+    file through ``reader``, and per-frame sums are accumulated so the frame
+    correlations, energy symmetry and zero-lag peak correlation equal the
+    in-memory detector's without ever reversing the whole recording. Blocks
+    are also decimated with the polyphase filter of :func:`scan_backmasking`,
+    so the segment scan runs on a copy of the signal at about
+    ``analysis_rate`` and reads the full-rate spans it verifies from the file.
+    """
+
+    def __init__(self, reader: StreamReader, *, analysis_rate: Optional[int] = 8000) -> None:
+        self.reader = reader
+        self.sample_rate = reader.sample_rate
+        self.total = reader.frames
+        self.frame_size = min(self.total, self.sample_rate * 5)
+        self.frames = (self.total // self.frame_size or 1) if self.frame_size else 0
+        self._dot = 0.0
+        self._energy = 0.0
+        # Per-frame sums: forward, reversed, forward^2, reversed^2, forward*reversed.
+        self._sums = np.zeros((5, self.frames), dtype=np.float64)
+        self.factor = max(1, self.sample_rate // analysis_rate) if analysis_rate else 1
+        # Rates in units of the decimated rate, so the filter decimates by exactly ``factor`` as _decimate does.
+        self._decimator = PolyphaseResampler(self.factor, 1) if self.factor > 1 else None
+        self._coarse: List[np.ndarray] = []
+
+    def update(self, block: AudioBlock) -> None:
+        forward = mono_block(block)[block.lead:].astype(np.float64)
+        if forward.size == 0:
+            return
+        start = block.start
+        stop = start + forward.size
+        mirror = self.reader.read(self.total - stop, forward.size)
+        if mirror.ndim > 1:
+            mirror = np.mean(mirror, axis=0)
+        backward = mirror[::-1].astype(np.float64)
+
+        self._dot += float(np.dot(forward, backward))
+        self._energy += float(np.dot(forward, forward))
+        coarse = forward if self._decimator is None else self._decimator.process(forward)
+        self._coarse.append(coarse.astype(np.float32))
+
+        limit = min(stop, self.frames * self.frame_size)
+        if limit <= start:
+            return
+        count = limit - start
+        a = forward[:count]
+        b = backward[:count]
+        frame_index = np.arange(start, limit) // self.frame_size
+        for row, values in enumerate((a, b, a * a, b * b, a * b)):
+            self._sums[row] += np.bincount(frame_index, weights=values, minlength=self.frames)
+
+    def finalize(self) -> Dict[str, Any]:
+        peak_correlation = abs(self._dot) / self._energy if self._energy else 0.0
+
+        if self.frame_size == 0:
+            summary = summarise_array(np.array([0.0])).to_dict()
+            energy_symmetry = 0.0
+        else:
+            n = float(self.frame_size)
+            sum_a, sum_b, sum_aa, sum_bb, sum_ab = self._sums
+            var_a = np.maximum(sum_aa / n - (sum_a / n) ** 2, 0.0)
+            var_b = np.maximum(sum_bb / n - (sum_b / n) ** 2, 0.0)
+            covariance = sum_ab / n - (sum_a / n) * (sum_b / n)
+            denominator = np.sqrt(var_a * var_b)
+            valid = denominator > 1e-12
+            frame_correlations = np.zeros(self.frames, dtype=np.float64)
+            frame_correlations[valid] = covariance[valid] / denominator[valid]
+            summary = summarise_array(frame_correlations).to_dict()
+            energy_symmetry = float(np.mean(np.abs(sum_a - sum_b)) / self.frame_size)
+
+        if self._decimator is not None:
+            self._coarse.append(self._decimator.flush().astype(np.float32))
+        signal = np.concatenate(self._coarse) if self._coarse else np.zeros(0, dtype=np.float32)
+        self._coarse = []
+        segments = _scan(_ReaderSamples(self.reader), self.sample_rate, signal, self.sample_rate / self.factor)
+
+        return {
+            "peak_correlation": float(peak_correlation),
+            "frame_correlation_mean": summary["mean"],
+            "frame_correlation_std": summary["std"],
+            "energy_symmetry": energy_symmetry,
+            "max_segment_score": max((segment["score"] for segment in segments), default=0.0),
+            "segments": segments,
+        }
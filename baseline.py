@@ -0,0 +1,130 @@
+"""Corpus baseline workflow: fit, update and apply anomaly baselines."""
+from __future__ import annotations
+
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .anomaly import BaselineModel, flatten_summaries
+from .exceptions import AnalysisError
+from .ingestion import load_audio
+from .spectral import compute_spectral_features
+
+logger = logging.getLogger(__name__)
+
+
+def features_from_results(results: Dict[str, Any]) -> Dict[str, float]:
+    """Return the anomaly features recorded in a ``run_full_analysis`` result."""
+
+    try:
+        return flatten_summaries(results["spectral"]["summaries"])
+    except KeyError as exc:
+        raise AnalysisError("Results carry no spectral summaries to build features from") from exc
+
+
+def extract_features(path: str | Path, *, target_sr: Optional[int] = 44100, mono: bool = True) -> Dict[str, float]:
+    """Compute anomaly features for one reference file.
+
+    ``.json`` files are read as previously exported analysis results, so a
+    corpus that was already batch-analysed is not decoded again. Audio files
+    only go through ingestion and spectral summaries, not the full pipeline.
+    """
+
+    path = Path(path)
+    if path.suffix.lower() == ".json":
+        with path.open("r", encoding="utf-8") as f:
+            return features_from_results(json.load(f))
+
+    audio = load_audio(path, target_sr=target_sr, mono=mono)
+    spectral = compute_spectral_features(audio.samples, audio.sample_rate)
+    return flatten_summaries(spectral["summaries"])
+
+
+def _extract_or_none(path: str, options: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    try:
+        return extract_features(path, **options)
+    except Exception as exc:  # reported and skipped; one bad file must not sink the corpus
+        logger.error("Skipping '%s': %s", path, exc)
+        return None
+
+
+def collect_features(
+    paths: Sequence[Path],
+    *,
+    feature_names: Optional[Sequence[str]] = None,
+    workers: int = 1,
+    **options: Any,
+) -> Tuple[List[Path], List[str], np.ndarray]:
+    """Build a ``(n_files, n_features)`` matrix for ``paths``.
+
+    Rows are aligned to ``feature_names`` (or to the first successfully
+    processed file's features). Files that fail are logged and left out of
+    the returned path list.
+    """
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            extracted = list(executor.map(_extract_or_none, [str(p) for p in paths], [options] * len(paths)))
+    else:
+        extracted = [_extract_or_none(str(p), options) for p in paths]
+
+    kept: List[Path] = []
+    rows: List[Dict[str, float]] = []
+    for path, features in zip(paths, extracted):
+        if features is not None:
+            kept.append(path)
+            rows.append(features)
+    if not rows:
+        raise AnalysisError("No features could be extracted from the supplied files")
+
+    names = list(feature_names) if feature_names is not None else list(rows[0])
+    matrix = np.array([[row.get(name, np.nan) for name in names] for row in rows], dtype=np.float64)
+    return kept, names, matrix
+
+
+def fit_baseline(
+    paths: Sequence[Path],
+    model_path: str | Path,
+    *,
+    update: bool = False,
+    workers: int = 1,
+    **options: Any,
+) -> BaselineModel:
+    """Fit a baseline on ``paths`` and save it to ``model_path``.
+
+    With ``update=True`` an existing model at ``model_path`` is extended with
+    :meth:`BaselineModel.partial_fit` instead of being replaced.
+    """
+
+    existing = BaselineModel.load(model_path) if update and Path(model_path).exists() else None
+    names = existing.feature_names if existing is not None else None
+    kept, names, matrix = collect_features(paths, feature_names=names, workers=workers, **options)
+    if existing is not None:
+        model = existing.partial_fit(matrix)
+    else:
+        model = BaselineModel(names).fit(matrix)
+    model.save(model_path)
+    logger.info("Baseline fitted on %d file(s) (%d in total)", len(kept), model.n_samples)
+    return model
+
+
+def score_files(
+    model: BaselineModel,
+    paths: Sequence[Path],
+    *,
+    workers: int = 1,
+    **options: Any,
+) -> List[Dict[str, Any]]:
+    """Score ``paths`` against ``model`` in one vectorised batch."""
+
+    kept, _, matrix = collect_features(paths, feature_names=model.feature_names, workers=workers, **options)
+    scores = model.score(matrix)
+    percentiles = model.percentile(scores)
+    return [
+        {"path": str(path), "anomaly_score": float(score), "baseline_percentile": float(percentile)}
+        for path, score, percentile in zip(kept, scores, percentiles)
+    ]
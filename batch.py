@@ -0,0 +1,206 @@
+"""Parallel, resumable batch analysis over many audio files."""
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .exceptions import AnalysisError
+from .export import sidecar_dir_for
+from .ingestion import SUPPORTED_FORMATS
+
+logger = logging.getLogger(__name__)
+
+FAILURE_LOG = "failures.jsonl"
+_GLOB_CHARS = set("*?[")
+
+
+@dataclass(slots=True)
+class BatchSummary:
+    """Outcome counts of a :func:`run_batch` invocation."""
+
+    completed: List[Path] = field(default_factory=list)
+    skipped: List[Path] = field(default_factory=list)
+    failed: List[Tuple[Path, str]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "completed": len(self.completed),
+            "skipped": len(self.skipped),
+            "failed": len(self.failed),
+        }
+
+
+def _is_supported(path: Path, extra_suffixes: Sequence[str] = ()) -> bool:
+    suffix = path.suffix.lower()
+    return suffix.lstrip(".") in SUPPORTED_FORMATS or suffix in extra_suffixes
+
+
+def _read_file_list(list_path: Path) -> List[str]:
+    try:
+        lines = list_path.read_text(encoding="utf-8").splitlines()
+    except OSError as exc:
+        raise AnalysisError(f"Cannot read file list '{list_path}': {exc}") from exc
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+def expand_inputs(inputs: Iterable[str], *, extra_suffixes: Sequence[str] = ()) -> List[Path]:
+    """Resolve files, directories, glob patterns and ``@filelist`` entries to audio paths.
+
+    Directories are searched recursively for supported formats, file lists
+    contain one path (or pattern) per line, and duplicates are dropped while
+    preserving first-seen order. ``extra_suffixes`` (e.g. ``(".json",)``)
+    admits additional file types when searching directories and patterns.
+    """
+
+    resolved: List[Path] = []
+    seen = set()
+
+    def add(path: Path) -> None:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            resolved.append(path)
+
+    pending = list(inputs)
+    while pending:
+        entry = pending.pop(0)
+        if entry.startswith("@"):
+            pending[0:0] = _read_file_list(Path(entry[1:]))
+        elif _GLOB_CHARS & set(entry):
+            for match in sorted(glob.glob(entry, recursive=True)):
+                candidate = Path(match)
+                if candidate.is_file() and _is_supported(candidate, extra_suffixes):
+                    add(candidate)
+        elif Path(entry).is_dir():
+            for candidate in sorted(Path(entry).rglob("*")):
+                if candidate.is_file() and _is_supported(candidate, extra_suffixes):
+                    add(candidate)
+        else:
+            add(Path(entry))
+    return resolved
+
+
+def result_path_for(source: Path, output_dir: Path) -> Path:
+    """Return the per-file result location, unique even for equal file names."""
+
+    digest = hashlib.sha1(os.path.abspath(source).encode("utf-8")).hexdigest()[:10]
+    return output_dir / f"{source.stem}-{digest}.json"
+
+
+def _write_json_atomic(path: Path, payload: Any) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _analyse_one(source: str, destination: str, stream: bool, options: Dict[str, Any]) -> Optional[str]:
+    """Worker entry point: analyse ``source`` and write its results to ``destination``."""
+
+    from .analysis import run_full_analysis, run_streaming_analysis
+
+    analyse = run_streaming_analysis if stream else run_full_analysis
+    if options.get("include_raw_spectra") and options.get("spectra_dir") is None:
+        options = {**options, "spectra_dir": sidecar_dir_for(destination)}
+    try:
+        _, results = analyse(source, **options)
+    except Exception as exc:  # failures are reported per file
+        return f"{type(exc).__name__}: {exc}"
+    results["metadata"]["source"] = source
+    _write_json_atomic(Path(destination), results)
+    return None
+
+
+def _warm_worker() -> None:
+    # Pay the heavy imports once per worker process rather than once per file.
+    from . import analysis
+
+
+def _log_failure(output_dir: Path, source: Path, error: str) -> None:
+    with (output_dir / FAILURE_LOG).open("a", encoding="utf-8") as f:
+        f.write(json.dumps({"path": str(source), "error": error}) + "\n")
+
+
+def run_batch(
+    paths: Sequence[Path],
+    output_dir: str | Path,
+    *,
+    workers: int = 1,
+    resume: bool = True,
+    stream: bool = False,
+    **options: Any,
+) -> BatchSummary:
+    """Analyse ``paths`` on a process pool, writing one JSON result per file.
+
+    Results are written atomically to ``output_dir``, so an interrupted run
+    can be restarted with ``resume=True`` and only files without a result are
+    analysed again. Failures are appended to ``failures.jsonl`` in
+    ``output_dir`` and do not stop the batch. ``options`` are forwarded to
+    :func:`frequencipher.analysis.run_full_analysis`, or to
+    :func:`frequencipher.analysis.run_streaming_analysis` when ``stream`` is set.
+    With ``include_raw_spectra``, each file's matrices go to a ``.spectra``
+    directory next to its JSON result.
+    """
+
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    summary = BatchSummary()
+    if workers > 1 and not stream and options.get("detector_workers") is None:
+        # Processes already occupy the cores; threads per file would oversubscribe them.
+        options["detector_workers"] = 1
+
+    jobs: List[Tuple[Path, Path]] = []
+    for source in paths:
+        destination = result_path_for(source, out)
+        if resume and destination.exists():
+            summary.skipped.append(source)
+        else:
+            jobs.append((source, destination))
+    if summary.skipped:
+        logger.info("Resuming: %d file(s) already analysed", len(summary.skipped))
+
+    def record(source: Path, error: Optional[str]) -> None:
+        if error is None:
+            summary.completed.append(source)
+            logger.info("Analysed '%s'", source)
+        else:
+            summary.failed.append((source, error))
+            _log_failure(out, source, error)
+            logger.error("Analysis of '%s' failed: %s", source, error)
+
+    if workers <= 1:
+        for source, destination in jobs:
+            record(source, _analyse_one(str(source), str(destination), stream, options))
+        return summary
+
+    # Keep a bounded number of jobs in flight so huge batches do not queue
+    # every submission up front.
+    max_in_flight = workers * 2
+    queue = list(reversed(jobs))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker) as executor:
+        in_flight: Dict[Future, Path] = {}
+        try:
+            while queue or in_flight:
+                while queue and len(in_flight) < max_in_flight:
+                    source, destination = queue.pop()
+                    in_flight[executor.submit(_analyse_one, str(source), str(destination), stream, options)] = source
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    source = in_flight.pop(future)
+                    try:
+                        error = future.result()
+                    except Exception as exc:  # e.g. a worker process crashed
+                        error = f"{type(exc).__name__}: {exc}"
+                    record(source, error)
+        except KeyboardInterrupt:
+            for future in in_flight:
+                future.cancel()
+            raise
+    return summary
@@ -0,0 +1,420 @@
+"""Benchmark suite: synthetic corpora with planted artefacts, timings and regression gates."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from .analysis import run_full_analysis, run_streaming_analysis
+from .backmask import detect_backmasking
+from .ingestion import load_audio
+from .profiling import Profiler, profiling, stage
+from .resample import rational_factors, resample
+from .statistics import summarise_array
+from .subliminal import detect_subliminal
+
+logger = logging.getLogger(__name__)
+
+THRESHOLDS_PATH = Path(__file__).with_name("benchmark_thresholds.json")
+ARTEFACTS = ("reversed_speech", "lsb_payload", "ultrasonic_carrier")
+CONTENTS = ("speech", "music")
+
+# Limits recorded by ``update_thresholds`` are ``measurement * factor + floor``
+# so ordinary run-to-run noise does not trip the gate.
+WALL_HEADROOM = (2.0, 0.05)
+MEMORY_HEADROOM = (1.25, 2.0)
+GATED_STAGES = ("load_audio", "analysis")
+GATED_PREFIXES = ("detector.",)
+
+_UNIT_SECONDS = 1
+_EXCERPT_SECONDS = 30
+_CARRIER_HZ = 21000.0
+_SEED = 2024
+_PEDAL_HZ = 65.41
+# Triads (root, third, fifth in Hz) of a I-vi-IV-V progression, one per unit.
+_PROGRESSION = ((261.63, 329.63, 392.0), (220.0, 261.63, 329.63), (174.61, 220.0, 261.63), (196.0, 246.94, 293.66))
+
+
+@dataclass(frozen=True, slots=True)
+class BenchmarkCase:
+    """One synthetic recording: speech-like or ``"music"`` audio with an optional planted artefact.
+
+    Music is held harmonic chords over a pedal bass note: steady, nearly
+    time-symmetric material that triage screens must not mistake for a
+    planted artefact.
+
+    ``stream`` cases are analysed with
+    :func:`~frequencipher.analysis.run_streaming_analysis`, for durations
+    whose full-resolution spectrograms would not fit in memory.
+    """
+
+    name: str
+    duration: int
+    sample_rate: int
+    channels: int = 1
+    artefact: Optional[str] = None
+    subtype: str = "PCM_16"
+    stream: bool = False
+    content: str = "speech"
+
+
+SUITES: Dict[str, Tuple[BenchmarkCase, ...]] = {
+    "smoke": (
+        BenchmarkCase("reversed-16k-mono-10s", 10, 16000, artefact="reversed_speech"),
+        BenchmarkCase("lsb-44k-stereo-10s", 10, 44100, 2, artefact="lsb_payload"),
+        BenchmarkCase("ultrasonic-48k-mono-10s", 10, 48000, artefact="ultrasonic_carrier", subtype="FLOAT"),
+        BenchmarkCase("music-44k-stereo-10s", 10, 44100, 2, content="music"),
+    ),
+    "standard": (
+        BenchmarkCase("reversed-44k-mono-2m", 120, 44100, artefact="reversed_speech"),
+        BenchmarkCase("lsb-96k-stereo-1m", 60, 96000, 2, artefact="lsb_payload", subtype="PCM_24"),
+        BenchmarkCase("ultrasonic-48k-stereo-2m", 120, 48000, 2, artefact="ultrasonic_carrier"),
+        BenchmarkCase("clean-22k-mono-5m", 300, 22050),
+        BenchmarkCase("music-48k-stereo-1m", 60, 48000, 2, content="music"),
+    ),
+    "long": (
+        BenchmarkCase("reversed-44k-mono-10m", 600, 44100, artefact="reversed_speech"),
+        BenchmarkCase("ultrasonic-48k-stereo-1h", 3600, 48000, 2, artefact="ultrasonic_carrier", stream=True),
+        BenchmarkCase("lsb-44k-mono-2h", 7200, 44100, artefact="lsb_payload", stream=True),
+    ),
+}
+
+
+def planted_region(case: BenchmarkCase) -> Dict[str, float]:
+    """Where the artefact of ``case`` sits, in seconds.
+
+    Reversed speech copies the unit starting at ``source`` backwards into
+    ``[start, end)``; LSB payloads and ultrasonic carriers cover ``[start, end)``.
+    """
+
+    units = case.duration // _UNIT_SECONDS
+    if case.artefact == "reversed_speech":
+        return {"source": float(units // 5), "start": float(3 * units // 5), "end": float(3 * units // 5 + 1)}
+    return {"start": float(2 * units // 5), "end": float(3 * units // 5)}
+
+
+def _channels(case: BenchmarkCase, mono: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """``mono`` as ``(frames, channels)``: further channels are a delayed, quieter copy plus their own noise."""
+
+    if case.channels == 1:
+        return mono[:, np.newaxis]
+    noise = 0.01 * rng.standard_normal((mono.size, case.channels - 1))
+    return np.column_stack([mono, 0.8 * np.roll(mono, 7)[:, np.newaxis] + noise])
+
+
+def _speech_unit(case: BenchmarkCase, index: int) -> np.ndarray:
+    """One deterministic second of voiced, syllable-modulated audio as ``(frames, channels)``."""
+
+    rng = np.random.default_rng([_SEED, index])
+    sr = case.sample_rate
+    t = np.arange(sr * _UNIT_SECONDS) / sr
+    f0 = 110.0 + 90.0 * rng.random()
+    vibrato = 0.5 * np.sin(2 * np.pi * 3.0 * t + rng.uniform(0, 2 * np.pi))
+    harmonics = [h for h in range(1, 25) if h * f0 < min(4000.0, sr / 2)]
+    voiced = sum(np.sin(2 * np.pi * h * f0 * t + h * vibrato + rng.uniform(0, 2 * np.pi)) / h for h in harmonics)
+    envelope = np.sin(np.pi * (4.0 * t + rng.random())) ** 2
+    mono = 0.25 * envelope * voiced / np.max(np.abs(voiced)) + 0.01 * rng.standard_normal(t.size)
+    return _channels(case, mono, rng)
+
+
+def _music_unit(case: BenchmarkCase, index: int) -> np.ndarray:
+    """One deterministic second of a held chord over a pedal bass note as ``(frames, channels)``.
+
+    Oscillators keep their phase across units, as a sustained pad does, so
+    the bass is one steady tone throughout and every chord is one between
+    the short fades at chord changes.
+    """
+
+    rng = np.random.default_rng([_SEED, index])
+    sr = case.sample_rate
+    t = index * _UNIT_SECONDS + np.arange(sr * _UNIT_SECONDS) / sr
+    notes = _PROGRESSION[index % len(_PROGRESSION)]
+    chord = sum(np.sin(2 * np.pi * h * f * t) / h for f in notes for h in (1, 2, 3, 4))
+    # A pedal bass note that never changes, under the chords.
+    bass = np.sin(2 * np.pi * _PEDAL_HZ * t)
+    # 20 ms fades at chord changes, as a pad crossfades, rather than clicks with broadband (and infrasonic) energy.
+    local = t - index * _UNIT_SECONDS
+    fade = np.sin(0.5 * np.pi * np.clip(np.minimum(local, _UNIT_SECONDS - local) / 0.02, 0.0, 1.0)) ** 2
+    mono = 0.1 * fade * chord / len(notes) + 0.1 * bass + 0.002 * rng.standard_normal(t.size)
+    return _channels(case, mono, rng)
+
+
+def _units(case: BenchmarkCase) -> Iterator[Tuple[int, np.ndarray]]:
+    region = planted_region(case)
+    start, end = int(region["start"]), int(region["end"])
+    content = _music_unit if case.content == "music" else _speech_unit
+    for index in range(case.duration // _UNIT_SECONDS):
+        unit = content(case, index)
+        if case.artefact == "reversed_speech" and index == start:
+            unit = content(case, int(region["source"]))[::-1]
+        elif case.artefact == "ultrasonic_carrier" and start <= index < end:
+            t = (index * case.sample_rate + np.arange(unit.shape[0])) / case.sample_rate
+            unit = unit + 0.05 * np.sin(2 * np.pi * _CARRIER_HZ * t)[:, np.newaxis]
+        yield index, unit
+
+
+def _to_pcm(unit: np.ndarray, subtype: str, payload: Optional[np.random.Generator]) -> np.ndarray:
+    """Quantise with the LSB cleared (a cover recorded at one bit less), or carrying ``payload`` bits."""
+
+    bits, dtype, shift = (24, np.int32, 8) if subtype == "PCM_24" else (16, np.int16, 0)
+    values = np.round(unit * 2 ** (bits - 1)).clip(-(2 ** (bits - 1)), 2 ** (bits - 1) - 1).astype(np.int32)
+    values &= ~1
+    if payload is not None:
+        values |= payload.integers(0, 2, size=values.shape, dtype=np.int32)
+    return (values << shift).astype(dtype)
+
+
+def synthesise_case(case: BenchmarkCase, directory: str | Path) -> Path:
+    """Write ``case`` to ``directory`` one second at a time, reusing an existing file.
+
+    File names carry a digest of the case parameters, so a kept corpus
+    directory is regenerated only when a case changes.
+    """
+
+    if case.artefact is not None and case.artefact not in ARTEFACTS:
+        raise ValueError(f"Unknown artefact '{case.artefact}'. Available: {', '.join(ARTEFACTS)}")
+    if case.content not in CONTENTS:
+        raise ValueError(f"Unknown content '{case.content}'. Available: {', '.join(CONTENTS)}")
+    if case.artefact == "lsb_payload" and case.subtype not in ("PCM_16", "PCM_24"):
+        raise ValueError("LSB payloads need a 16- or 24-bit PCM subtype")
+    digest = hashlib.sha1(json.dumps(asdict(case), sort_keys=True).encode()).hexdigest()[:10]
+    path = Path(directory) / f"{case.name}-{digest}.wav"
+    if path.exists():
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    region = planted_region(case)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with sf.SoundFile(tmp_path, "w", case.sample_rate, case.channels, case.subtype, format="WAV") as f:
+        for index, unit in _units(case):
+            if case.subtype.startswith("PCM"):
+                in_payload = case.artefact == "lsb_payload" and region["start"] <= index < region["end"]
+                unit = _to_pcm(unit, case.subtype, np.random.default_rng([_SEED, index, 1]) if in_payload else None)
+            f.write(unit)
+    tmp_path.replace(path)
+    return path
+
+
+def _stage_metrics(profile: Mapping[str, Mapping[str, float]]) -> Dict[str, Dict[str, float]]:
+    return {
+        name: {"wall_seconds": values["wall_seconds"], "peak_mib": values["peak_bytes"] / 1024**2}
+        for name, values in profile.items()
+    }
+
+
+def time_case(
+    case: BenchmarkCase,
+    path: Path,
+    *,
+    trace_memory: bool = True,
+) -> Tuple[Dict[str, Dict[str, float]], Dict[str, Dict[str, Any]]]:
+    """Time ``load_audio`` and the whole pipeline with per-detector stages; return ``(timings, results)``.
+
+    Detectors run on one worker so each stage's peak allocation is its own.
+    """
+
+    profiler = Profiler(trace_memory=trace_memory)
+    with profiling(profiler), stage("load_audio"):
+        load_audio(path)
+    timings = _stage_metrics(profiler.to_dict())
+
+    profiler = Profiler(trace_memory=trace_memory)
+    if case.stream:
+        _, results = run_streaming_analysis(str(path), profiler=profiler)
+    else:
+        _, results = run_full_analysis(str(path), detector_workers=1, profiler=profiler)
+    timings.update(_stage_metrics(results.pop("profile")))
+    return timings, results
+
+
+def _check(error: float, tolerance: float) -> Dict[str, Any]:
+    return {"error": float(error), "tolerance": tolerance, "passed": bool(error <= tolerance)}
+
+
+def _max_relative_difference(actual: Mapping[str, Any], expected: Mapping[str, Any]) -> float:
+    differences = [
+        abs(value - expected[key]) / max(abs(expected[key]), 1e-6)
+        for key, value in actual.items()
+        if isinstance(value, float)
+    ]
+    return max(differences, default=0.0)
+
+
+def _artefact_error(case: BenchmarkCase, results: Mapping[str, Dict[str, Any]]) -> float:
+    """How far the detector output is from the planted artefact (``inf`` when it is missed)."""
+
+    region = planted_region(case)
+    if case.artefact == "reversed_speech":
+        segments = results["backmask"].get("segments", [])
+        return min(
+            (abs(s["start"] - region["source"]) + abs(s["mirror_start"] - region["start"]) for s in segments),
+            default=math.inf,
+        )
+    if case.artefact == "lsb_payload":
+        flagged = results["steganography"]["bit_planes"]["channel_0"]["window_flagged_ratio"][0]
+        return abs(flagged - (1.0 - (region["end"] - region["start"]) / case.duration))
+    tracks = results["subliminal"]["tracks"]
+    energy = np.asarray(tracks["ultrasound_energy"])
+    loud = np.asarray(tracks["time"])[energy > (energy.min() + energy.max()) / 2]
+    if loud.size == 0:
+        return math.inf
+    half = results["subliminal"]["segment_seconds"] / 2
+    return abs(loud.min() - half - region["start"]) + abs(loud.max() + half - region["end"])
+
+
+def check_case(case: BenchmarkCase, path: Path, results: Mapping[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Compare fast paths with reference computations and planted artefacts with detector output.
+
+    Clean cases are also run through the triage cascade, which must not
+    escalate them.
+
+    Reference comparisons use at most the first ``_EXCERPT_SECONDS`` of audio.
+    """
+
+    from scipy.signal import resample_poly
+
+    checks: Dict[str, Dict[str, Any]] = {}
+    frames = min(case.duration, _EXCERPT_SECONDS) * case.sample_rate
+    mapped = load_audio(path, mono=False).samples[..., :frames]
+    decoded = load_audio(path, mono=False, mmap=False).samples[..., :frames]
+    checks["mmap_ingestion"] = _check(np.max(np.abs(mapped - decoded)), 1e-6)
+
+    excerpt = np.asarray(decoded if decoded.ndim == 1 else decoded.mean(axis=0), dtype=np.float64)
+    target = 22050 if case.sample_rate != 22050 else 16000
+    reference = resample_poly(excerpt, *rational_factors(case.sample_rate, target))
+    checks["polyphase_resample"] = _check(np.max(np.abs(resample(excerpt, case.sample_rate, target) - reference)), 1e-6)
+
+    exact = summarise_array(np.abs(excerpt)).to_dict()
+    approximate = summarise_array(np.abs(excerpt), exact=False).to_dict()
+    quartiles = {key: value for key, value in approximate.items() if key in ("percentile_25", "median", "percentile_75")}
+    checks["approximate_summaries"] = _check(_max_relative_difference(quartiles, exact), 0.02)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        excerpt_path = Path(tmp) / "excerpt.wav"
+        sf.write(excerpt_path, excerpt.astype(np.float32), case.sample_rate, subtype="FLOAT")
+        _, streamed = run_streaming_analysis(str(excerpt_path), only=["backmask", "subliminal"])
+        samples = load_audio(excerpt_path).samples
+    streaming_error = max(
+        _max_relative_difference(streamed["backmask"], detect_backmasking(samples, case.sample_rate)),
+        _max_relative_difference(streamed["subliminal"], detect_subliminal(samples, case.sample_rate)),
+    )
+    checks["streaming_consistency"] = _check(streaming_error, 1e-3)
+
+    if case.artefact is not None:
+        tolerance = 0.05 if case.artefact == "lsb_payload" else 2.0
+        checks[f"{case.artefact}_located"] = _check(_artefact_error(case, results), tolerance)
+    elif case.artefact is None and not case.stream:
+        # Clean material must stay in the first tier of the triage cascade.
+        _, triaged = run_full_analysis(str(path), mono=False, cascade=True)
+        checks["clean_not_escalated"] = _check(len(triaged["metadata"]["cascade"]["triggers"]), 0)
+    return checks
+
+
+def _gated(stage_name: str) -> bool:
+    return stage_name in GATED_STAGES or stage_name.startswith(GATED_PREFIXES)
+
+
+def compare_thresholds(
+    timings: Mapping[str, Mapping[str, Mapping[str, float]]],
+    thresholds: Mapping[str, Mapping[str, Mapping[str, float]]],
+) -> List[str]:
+    """Return a message for every ``case -> stage -> metric`` measurement above its limit."""
+
+    failures = []
+    for case_name, stages in timings.items():
+        for stage_name, metrics in stages.items():
+            limits = thresholds.get(case_name, {}).get(stage_name, {})
+            for metric, limit in limits.items():
+                if metrics.get(metric, 0.0) > limit:
+                    failures.append(f"{case_name}: {stage_name} {metric} {metrics[metric]:.3f} > {limit:.3f}")
+    return failures
+
+
+def thresholds_from(timings: Mapping[str, Mapping[str, Mapping[str, float]]]) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Limits for the gated stages of ``timings``, with headroom for noise."""
+
+    def limit(value: float, headroom: Tuple[float, float]) -> float:
+        return round(value * headroom[0] + headroom[1], 3)
+
+    return {
+        case_name: {
+            stage_name: {
+                "wall_seconds": limit(metrics["wall_seconds"], WALL_HEADROOM),
+                "peak_mib": limit(metrics["peak_mib"], MEMORY_HEADROOM),
+            }
+            for stage_name, metrics in stages.items()
+            if _gated(stage_name)
+        }
+        for case_name, stages in timings.items()
+    }
+
+
+def load_thresholds(path: str | Path = THRESHOLDS_PATH) -> Dict[str, Dict[str, Dict[str, float]]]:
+    path = Path(path)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def update_thresholds(
+    timings: Mapping[str, Mapping[str, Mapping[str, float]]],
+    path: str | Path = THRESHOLDS_PATH,
+) -> None:
+    """Replace the limits of the measured cases in ``path``, keeping the others."""
+
+    thresholds = load_thresholds(path)
+    thresholds.update(thresholds_from(timings))
+    Path(path).write_text(json.dumps(dict(sorted(thresholds.items())), indent=2) + "\n", encoding="utf-8")
+
+
+def _warm_up(directory: Path) -> None:
+    """Run the pipeline once so imports and JIT compilation are not timed as part of the first case."""
+
+    path = synthesise_case(BenchmarkCase("warm-up", 2, 44100), directory)
+    run_full_analysis(str(path), detector_workers=1)
+
+
+def run_benchmarks(
+    suite: str = "smoke",
+    *,
+    corpus_dir: str | Path | None = None,
+    thresholds: Optional[Mapping[str, Mapping[str, Mapping[str, float]]]] = None,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """Synthesise, time and check every case of ``suite``.
+
+    Returns ``{"suite", "cases": {name: {"timings", "checks"}}, "failures"}``
+    where failures list failed checks and, when ``thresholds`` are given,
+    measurements above their limits. Without ``corpus_dir`` the corpus is
+    written to a temporary directory and removed afterwards.
+    """
+
+    if suite not in SUITES:
+        raise ValueError(f"Unknown suite '{suite}'. Available: {', '.join(SUITES)}")
+    report: Dict[str, Any] = {"suite": suite, "cases": {}, "failures": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(corpus_dir) if corpus_dir is not None else Path(tmp)
+        _warm_up(directory)
+        for case in SUITES[suite]:
+            if progress is not None:
+                progress(case.name)
+            path = synthesise_case(case, directory)
+            timings, results = time_case(case, path)
+            checks = check_case(case, path, results)
+            report["cases"][case.name] = {"case": asdict(case), "timings": timings, "checks": checks}
+            report["failures"].extend(
+                f"{case.name}: {name} error {check['error']:.3g} > {check['tolerance']:.3g}"
+                for name, check in checks.items()
+                if not check["passed"]
+            )
+    if thresholds is not None:
+        timings = {name: entry["timings"] for name, entry in report["cases"].items()}
+        report["failures"].extend(compare_thresholds(timings, thresholds))
+    return report
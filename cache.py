@@ -0,0 +1,132 @@
+"""Content-addressed on-disk cache for analysis results."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get("FREQUENCIPHER_CACHE_DIR", Path.home() / ".cache" / "frequencipher")
+)
+DEFAULT_MAX_BYTES = 2 * 1024**3
+_HASH_CHUNK = 1 << 20
+
+
+def hash_file(path: str | Path) -> str:
+    """Return the SHA-256 hex digest of a file's bytes, read in chunks."""
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Results stored under a hash of the audio bytes and analysis parameters.
+
+    Parameters include every detector's ``ALGORITHM_VERSION``, so bumping a
+    version makes old entries unreachable; they are then removed by the
+    size-based LRU eviction. Reads refresh an entry's modification time,
+    which serves as its recency.
+
+    The directory is scanned on the first write only; later writes add to a
+    running size total and evict once it exceeds ``max_bytes``, when a fresh
+    scan also counts entries written by other processes.
+    """
+
+    def __init__(self, directory: str | Path | None = None, *, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory = Path(directory) if directory is not None else DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None
+
+    @staticmethod
+    def key(content_hash: str, params: Mapping[str, Any]) -> str:
+        """Combine a content hash and analysis parameters into a cache key."""
+
+        material = json.dumps(
+            {"format": CACHE_FORMAT_VERSION, "content": content_hash, "params": params},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached payload for ``key`` or ``None`` on a miss."""
+
+        path = self._entry_path(key)
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                payload = json.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable cache entry %s: %s", path, exc)
+            return None
+        return payload
+
+    def put(self, key: str, payload: Mapping[str, Any]) -> None:
+        """Store ``payload`` under ``key`` and evict old entries if over budget."""
+
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        size = tmp_path.stat().st_size
+        try:
+            size -= path.stat().st_size
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+        if self._size is None:
+            self.evict()
+            return
+        self._size += size
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits ``max_bytes``."""
+
+        entries = []
+        total = 0
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        self._size = total
+        return removed
+
+    def clear(self) -> None:
+        """Remove every cache entry."""
+
+        for path in self.directory.glob("*/*.json"):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        self._size = 0
@@ -0,0 +1,158 @@
+"""Per-channel and inter-channel analysis of multi-channel recordings."""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .context import AnalysisContext, ensure_context
+
+ALGORITHM_VERSION = 3
+
+_N_FFT = 2048
+# Incoherent side power is compared with the rest of the band's power plus
+# this share of its mean over bands, so bands empty in both channels do not
+# produce huge ratios.
+_RATIO_FLOOR = 1e-3
+
+
+def _empty(channels: int, bands: int, track_seconds: float) -> Dict[str, Any]:
+    return {
+        "channels": channels,
+        "per_channel": [],
+        "correlation": None,
+        "coherence": None,
+        "phase_difference_mean": None,
+        "side_energy_ratio": None,
+        "side_band_ratio_max": None,
+        "band_edges_hz": [],
+        "side_band_ratio": [],
+        "track_seconds": track_seconds,
+        "tracks": {"time": [], "side_energy_ratio": [], "phase_difference": []},
+    }
+
+
+def compare_channels(
+    samples: np.ndarray,
+    sample_rate: int,
+    *,
+    context: Optional[AnalysisContext] = None,
+    bands: int = 16,
+    track_seconds: float = 1.0,
+    block_frames: int = 256,
+) -> Dict[str, Any]:
+    """Per-channel statistics and the side-channel content a downmix cancels.
+
+    All channels are transformed together, ``block_frames`` STFT frames per
+    batched call (see
+    :meth:`~frequencipher.context.AnalysisContext.stft_blocks`), and every
+    statistic is accumulated block by block. ``per_channel`` lists each
+    channel's RMS, peak, crest factor and spectral centroid.
+
+    The inter-channel metrics compare the first two channels (the stereo
+    pair): time-domain ``correlation``, spectral ``coherence``, the
+    magnitude-weighted mean absolute inter-channel phase difference, and
+    the energy of the side signal ``(L - R) / 2`` relative to the mid
+    signal ``(L + R) / 2``, overall and per ``track_seconds`` step.
+
+    ``side_band_ratio`` measures, per each of ``bands`` equal-width bands,
+    the side energy that is *incoherent* with the mid signal (per bin, the
+    side power a fixed linear filter of the mid cannot explain) relative
+    to the rest of the band's energy. Delays, panning and other wide but
+    correlated mixes, whose side is a filtered copy of the mid, score near
+    0, fully independent channels near 1, and content hidden in the side
+    channel, which the mid lacks, far above 1. Mono input returns ``None``
+    metrics and empty lists, so results stay valid JSON.
+    """
+
+    context = ensure_context(samples, sample_rate, context)
+    channels = context.channels
+    if channels < 2:
+        return _empty(channels, bands, track_seconds)
+
+    samples = context.samples
+    n_fft, hop_length = context.fft_params(_N_FFT, None)
+    bins = n_fft // 2 + 1
+    bands = max(1, min(bands, bins))
+    band_starts = np.arange(bands) * bins // bands
+    frequencies = np.arange(bins) * sample_rate / n_fft
+    total_frames = 1 + samples.shape[-1] // hop_length
+    cell_frames = max(1, int(round(track_seconds * sample_rate / hop_length)))
+    cells = -(-total_frames // cell_frames)
+
+    channel_power = np.zeros((channels, bins))
+    cross_sum = np.zeros(bins, dtype=np.complex128)
+    side_power = np.zeros(bins)
+    mid_power = np.zeros(bins)
+    mid_side = np.zeros(bins, dtype=np.complex128)
+    cell_side = np.zeros(cells)
+    cell_mid = np.zeros(cells)
+    cell_phase = np.zeros(cells)
+    cell_weight = np.zeros(cells)
+    offset = 0
+    for block in context.stft_blocks(n_fft, hop_length, block_frames, channels=True):
+        power = block.real**2 + block.imag**2
+        channel_power += power.sum(axis=-1)
+        left, right = block[0], block[1]
+        cross = left * np.conj(right)
+        cross_sum += cross.sum(axis=-1)
+        mid_spectrum, side_spectrum = (left + right) / 2, (left - right) / 2
+        side = side_spectrum.real**2 + side_spectrum.imag**2
+        mid = mid_spectrum.real**2 + mid_spectrum.imag**2
+        side_power += side.sum(axis=-1)
+        mid_power += mid.sum(axis=-1)
+        mid_side += (mid_spectrum * np.conj(side_spectrum)).sum(axis=-1)
+
+        weight = np.abs(cross)
+        cell = (offset + np.arange(block.shape[-1])) // cell_frames
+        offset += block.shape[-1]
+        cell_side += np.bincount(cell, side.sum(axis=0), cells)
+        cell_mid += np.bincount(cell, mid.sum(axis=0), cells)
+        cell_phase += np.bincount(cell, (weight * np.abs(np.angle(cross))).sum(axis=0), cells)
+        cell_weight += np.bincount(cell, weight.sum(axis=0), cells)
+
+    rms = np.sqrt(np.mean(np.square(samples, dtype=np.float64), axis=-1))
+    peak = np.max(np.abs(samples), axis=-1)
+    totals = channel_power.sum(axis=-1)
+    centroid = np.divide(channel_power @ frequencies, totals, out=np.zeros(channels), where=totals > 0)
+    per_channel = [
+        {
+            "rms": float(rms[index]),
+            "peak": float(peak[index]),
+            "crest_factor": float(peak[index] / rms[index]) if rms[index] > 0 else 0.0,
+            "spectral_centroid": float(centroid[index]),
+        }
+        for index in range(channels)
+    ]
+
+    left, right = samples[0].astype(np.float64), samples[1].astype(np.float64)
+    left, right = left - left.mean(), right - right.mean()
+    norm = np.sqrt(np.dot(left, left) * np.dot(right, right))
+    # Side power minus what a per-bin linear prediction from the mid explains (|E[M S*]|^2 / E[|M|^2]).
+    explained = np.divide(np.abs(mid_side) ** 2, mid_power, out=np.zeros(bins), where=mid_power > 0)
+    explained = np.minimum(explained, side_power)
+    band_side = np.add.reduceat(side_power - explained, band_starts)
+    band_rest = np.add.reduceat(mid_power + explained, band_starts)
+    band_ratio = band_side / (band_rest + _RATIO_FLOOR * band_rest.mean() + 1e-30)
+    pair_power = np.sqrt(channel_power[0].sum() * channel_power[1].sum())
+
+    def ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+    return {
+        "channels": channels,
+        "per_channel": per_channel,
+        "correlation": float(np.dot(left, right) / norm) if norm > 0 else 0.0,
+        "coherence": float(abs(cross_sum.sum()) / pair_power) if pair_power > 0 else 0.0,
+        "phase_difference_mean": float(cell_phase.sum() / cell_weight.sum()) if cell_weight.sum() > 0 else 0.0,
+        "side_energy_ratio": float(side_power.sum() / mid_power.sum()) if mid_power.sum() > 0 else 0.0,
+        "side_band_ratio_max": float(band_ratio.max()),
+        "band_edges_hz": (np.arange(bands + 1) * (sample_rate / 2) / bands).tolist(),
+        "side_band_ratio": band_ratio.tolist(),
+        "track_seconds": cell_frames * hop_length / sample_rate,
+        "tracks": {
+            "time": (np.arange(cells) * cell_frames * hop_length / sample_rate).tolist(),
+            "side_energy_ratio": ratio(cell_side, cell_mid).tolist(),
+            "phase_difference": ratio(cell_phase, cell_weight).tolist(),
+        },
+    }
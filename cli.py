@@ -4,12 +4,25 @@ from __future__ import annotations
 import argparse
 import json
 import logging
+import sys
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict, List, Optional, Sequence
 
-from .analysis import run_full_analysis
+from .analysis import run_full_analysis, run_streaming_analysis
+from .anomaly import load_baseline
+from .baseline import fit_baseline, score_files
+from .batch import FAILURE_LOG, expand_inputs, run_batch
+from .benchmark import SUITES, THRESHOLDS_PATH, load_thresholds, run_benchmarks, update_thresholds
+from .cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, ResultCache
 from .exceptions import FrequenCipherError
+from .export import sidecar_dir_for
+from .fingerprint import DEFAULT_MIN_MATCHES, DEFAULT_SHARDS, FingerprintIndex, fingerprint_file, index_files
+from .profiling import write_prometheus
+from .registry import DETECTORS, PROFILES, select_detectors
+from .server import DEFAULT_HOST, DEFAULT_PORT, DEFAULT_QUEUE_SIZE
 from .report import generate_report
+from .streaming import DEFAULT_BLOCK_SIZE
+from .triage import TRIAGE_THRESHOLDS, check_thresholds
 
 
 def configure_logging(level: str) -> None:
@@ -19,16 +32,150 @@ def configure_logging(level: str) -> None:
     )
 
 
-def parse_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Run FrequenCipher forensic analysis on an audio file.")
-    parser.add_argument("input", help="Path to the input audio file")
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run FrequenCipher forensic analysis on audio files.")
+    parser.add_argument(
+        "input",
+        nargs="+",
+        help="Audio file(s), directories, glob patterns or @filelist files to analyse",
+    )
     parser.add_argument("--report", help="Output PDF report filename", default=None)
     parser.add_argument("--json", help="Optional path to dump raw JSON results", default=None)
     parser.add_argument("--target-sr", type=int, default=44100, help="Target sample rate for analysis")
     parser.add_argument("--stereo", action="store_true", help="Preserve stereo channels instead of down-mixing")
-    parser.add_argument("--include-raw-spectra", action="store_true", help="Include raw spectral matrices in JSON output")
+    parser.add_argument(
+        "--include-raw-spectra",
+        action="store_true",
+        help="Export raw spectral matrices as .npy files referenced from the JSON output",
+    )
+    parser.add_argument(
+        "--spectra-dir",
+        default=None,
+        help="Directory for --include-raw-spectra matrices (default: next to --json, as <name>.spectra)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Analyse in bounded-memory blocks at the native sample rate (streaming detectors only)",
+    )
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="Block size in samples for --stream")
+    parser.add_argument("--baseline", default=None, help="Corpus baseline model used for anomaly scoring")
+    parser.add_argument(
+        "--index",
+        default=None,
+        help="Fingerprint index of known content to match the file against (see 'frequencipher index')",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always recompute instead of using the result cache")
+    parser.add_argument(
+        "--cache-dir",
+        default=str(DEFAULT_CACHE_DIR),
+        help="Directory of the content-addressed result cache",
+    )
+    parser.add_argument(
+        "--cache-size-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // 1024**2,
+        help="Maximum result cache size in MiB before least recently used entries are evicted",
+    )
+    parser.add_argument("--output-dir", default=None, help="Directory for per-file JSON results in batch mode")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes in batch mode")
+    parser.add_argument(
+        "--detector-workers",
+        type=int,
+        default=None,
+        help="Threads running detectors concurrently per file (default: one per CPU, or 1 with --workers > 1)",
+    )
+    parser.add_argument(
+        "--detector-profile",
+        choices=tuple(PROFILES),
+        default=None,
+        help=f"Named detector selection (default: full); detectors: {', '.join(DETECTORS)}",
+    )
+    parser.add_argument("--only", default=None, help="Comma-separated detectors to run instead of the profile's")
+    parser.add_argument("--skip", default=None, help="Comma-separated detectors to leave out")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Run every selected detector instead of gating the expensive ones behind the cheap triage tier",
+    )
+    parser.add_argument(
+        "--triage-threshold",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help=f"Override a triage escalation threshold (repeatable); names: {', '.join(TRIAGE_THRESHOLDS)}",
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Re-analyse files that already have results in --output-dir",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Record wall time, CPU time and peak allocation per stage in a 'profile' JSON section",
+    )
+    parser.add_argument(
+        "--prometheus-file",
+        default=None,
+        help="Also write the --profile measurements to this file in Prometheus text format",
+    )
     parser.add_argument("--log-level", default="INFO", help="Logging level (DEBUG, INFO, WARNING, ERROR)")
-    return parser.parse_args()
+    args = parser.parse_args(argv)
+    args.only = _split_names(args.only)
+    args.skip = _split_names(args.skip)
+    try:
+        select_detectors(profile=args.detector_profile, only=args.only, skip=args.skip)
+    except ValueError as exc:
+        parser.error(str(exc))
+    try:
+        args.triage_thresholds = _parse_thresholds(args.triage_threshold)
+    except ValueError as exc:
+        parser.error(str(exc))
+    # Raw spectra are only produced by the second tier; asking for them forces it.
+    args.cascade = not (args.full or args.include_raw_spectra)
+    args.batch = _is_batch(args)
+    if args.batch:
+        if args.output_dir is None:
+            parser.error("--output-dir is required when analysing several files")
+        if args.report or args.json or args.prometheus_file:
+            parser.error(
+                "--report, --json and --prometheus-file apply to single files; batch results go to --output-dir"
+            )
+        if args.spectra_dir:
+            parser.error("--spectra-dir applies to single files; batch matrices go next to each result file")
+    elif args.include_raw_spectra and args.spectra_dir is None:
+        if args.json is None:
+            parser.error("--include-raw-spectra needs --json or --spectra-dir")
+        args.spectra_dir = str(sidecar_dir_for(args.json))
+    if args.prometheus_file:
+        args.profile = True
+    return args
+
+
+def _split_names(value: Optional[str]) -> Optional[List[str]]:
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def _parse_thresholds(entries: Sequence[str]) -> Dict[str, float]:
+    thresholds: Dict[str, float] = {}
+    for entry in entries:
+        name, _, value = entry.partition("=")
+        try:
+            thresholds[name.strip()] = float(value)
+        except ValueError:
+            raise ValueError(f"--triage-threshold expects NAME=VALUE, got '{entry}'") from None
+    check_thresholds(thresholds)
+    return thresholds
+
+
+def _is_batch(args: argparse.Namespace) -> bool:
+    if args.output_dir is not None or len(args.input) > 1:
+        return True
+    entry = args.input[0]
+    return entry.startswith("@") or any(char in entry for char in "*?[") or Path(entry).is_dir()
 
 
 def _dump_json(path: Path, payload: Any) -> None:
@@ -37,16 +184,293 @@ def _dump_json(path: Path, payload: Any) -> None:
         json.dump(payload, f, indent=2)
 
 
-def main() -> None:
-    args = parse_args()
+def _log_profile(profile: Dict[str, Dict[str, float]]) -> None:
+    for name, values in profile.items():
+        logging.info(
+            "Stage %-28s wall %8.3f s  cpu %8.3f s  peak %8.1f MiB",
+            name,
+            values["wall_seconds"],
+            values["cpu_seconds"],
+            values["peak_bytes"] / 1024**2,
+        )
+
+
+def _analysis_options(args: argparse.Namespace) -> Dict[str, Any]:
+    cache = None if args.no_cache else ResultCache(args.cache_dir, max_bytes=args.cache_size_mb * 1024**2)
+    selection = {"profile": args.detector_profile, "only": args.only, "skip": args.skip, "profiler": args.profile}
+    if args.stream:
+        return {"mono": not args.stereo, "block_size": args.block_size, "cache": cache, **selection}
+    return {
+        **selection,
+        "target_sr": args.target_sr,
+        "mono": not args.stereo,
+        "include_raw_spectra": args.include_raw_spectra,
+        "spectra_dir": args.spectra_dir,
+        "cache": cache,
+        "baseline": args.baseline,
+        "index": args.index,
+        "detector_workers": args.detector_workers,
+        "cascade": args.cascade,
+        "triage_thresholds": args.triage_thresholds or None,
+    }
+
+
+def _run_batch(args: argparse.Namespace) -> None:
+    try:
+        paths = expand_inputs(args.input)
+    except FrequenCipherError as exc:
+        logging.error("Cannot resolve inputs: %s", exc)
+        raise SystemExit(1) from exc
+    if not paths:
+        logging.error("No audio files matched %s", " ".join(args.input))
+        raise SystemExit(1)
+
+    logging.info("Analysing %d file(s) with %d worker(s)", len(paths), args.workers)
+    summary = run_batch(
+        paths,
+        args.output_dir,
+        workers=args.workers,
+        resume=not args.no_resume,
+        stream=args.stream,
+        **_analysis_options(args),
+    )
+    logging.info(
+        "Batch finished: %d analysed, %d skipped, %d failed",
+        len(summary.completed),
+        len(summary.skipped),
+        len(summary.failed),
+    )
+    if summary.failed:
+        logging.error("Failures logged to %s", Path(args.output_dir) / FAILURE_LOG)
+        raise SystemExit(1)
+
+
+def parse_baseline_args(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="frequencipher baseline",
+        description="Fit or apply a corpus anomaly baseline.",
+    )
+    parser.add_argument("action", choices=("fit", "score"), help="Fit/update a model or score files against it")
+    parser.add_argument("input", nargs="+", help="Audio files, result JSON files, directories, globs or @filelists")
+    parser.add_argument("--model", required=True, help="Path of the baseline model file")
+    parser.add_argument("--update", action="store_true", help="Extend an existing model instead of replacing it")
+    parser.add_argument("--json", default=None, help="Write scores to this JSON file (score action)")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes for feature extraction")
+    parser.add_argument("--target-sr", type=int, default=44100, help="Target sample rate for analysis")
+    parser.add_argument("--stereo", action="store_true", help="Preserve stereo channels instead of down-mixing")
+    parser.add_argument("--log-level", default="INFO", help="Logging level (DEBUG, INFO, WARNING, ERROR)")
+    return parser.parse_args(argv)
+
+
+def _run_baseline(argv: Sequence[str]) -> None:
+    args = parse_baseline_args(argv)
     configure_logging(args.log_level)
+    options = {"target_sr": args.target_sr, "mono": not args.stereo, "workers": args.workers}
     try:
-        audio, results = run_full_analysis(
-            args.input,
-            target_sr=args.target_sr,
-            mono=not args.stereo,
-            include_raw_spectra=args.include_raw_spectra,
-        )
+        paths = expand_inputs(args.input, extra_suffixes=(".json",))
+        if args.action == "fit":
+            model = fit_baseline(paths, args.model, update=args.update, **options)
+            logging.info("Saved baseline (%d reference files) to %s", model.n_samples, args.model)
+            return
+        scores = score_files(load_baseline(args.model), paths, **options)
+    except (FrequenCipherError, OSError, ValueError) as exc:
+        logging.error("Baseline %s failed: %s", args.action, exc)
+        raise SystemExit(1) from exc
+
+    if args.json:
+        _dump_json(Path(args.json), scores)
+        logging.info("Wrote scores to %s", args.json)
+    else:
+        for entry in scores:
+            print(f"{entry['anomaly_score']:.4f}\t{entry['baseline_percentile']:.3f}\t{entry['path']}")
+
+
+def parse_index_args(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="frequencipher index",
+        description="Build or query a fingerprint index of known content.",
+    )
+    parser.add_argument("action", choices=("add", "query"), help="Add files to the index or look them up in it")
+    parser.add_argument("input", nargs="+", help="Audio files, directories, glob patterns or @filelist files")
+    parser.add_argument("--index", required=True, help="Directory of the fingerprint index")
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=DEFAULT_SHARDS,
+        help=f"Shards of a new index, a power of two (default: {DEFAULT_SHARDS})",
+    )
+    parser.add_argument("--compact", action="store_true", help="Merge each shard's segments after adding (add action)")
+    parser.add_argument(
+        "--min-matches",
+        type=int,
+        default=DEFAULT_MIN_MATCHES,
+        help=f"Time-consistent hashes needed to report a match (default: {DEFAULT_MIN_MATCHES})",
+    )
+    parser.add_argument("--json", default=None, help="Write matches to this JSON file (query action)")
+    parser.add_argument("--log-level", default="INFO", help="Logging level (DEBUG, INFO, WARNING, ERROR)")
+    return parser.parse_args(argv)
+
+
+def _run_index(argv: Sequence[str]) -> None:
+    args = parse_index_args(argv)
+    configure_logging(args.log_level)
+    try:
+        paths = expand_inputs(args.input)
+        index = FingerprintIndex(args.index, shards=args.shards)
+        if args.action == "add":
+            index_files(index, paths)
+            if args.compact:
+                index.compact()
+            logging.info("Indexed %d file(s); %s now holds %d hashes", len(paths), args.index, len(index))
+            return
+        matches = [
+            {"path": str(path), "matches": index.query(*fingerprint_file(path), min_matches=args.min_matches)}
+            for path in paths
+        ]
+    except (FrequenCipherError, OSError, ValueError) as exc:
+        logging.error("Index %s failed: %s", args.action, exc)
+        raise SystemExit(1) from exc
+
+    if args.json:
+        _dump_json(Path(args.json), matches)
+        logging.info("Wrote matches to %s", args.json)
+    else:
+        for entry in matches:
+            for match in entry["matches"]:
+                print(f"{match['matches']}\t{match['offset_seconds']:.2f}\t{entry['path']}\t{match['name']}")
+
+
+def parse_benchmark_args(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="frequencipher benchmark",
+        description="Time and check the pipeline on synthetic recordings with planted artefacts.",
+    )
+    parser.add_argument("--suite", choices=tuple(SUITES), default="smoke", help="Corpus to run (default: smoke)")
+    parser.add_argument("--corpus-dir", default=None, help="Keep generated recordings here and reuse them")
+    parser.add_argument("--thresholds", default=str(THRESHOLDS_PATH), help="JSON file of time and memory limits")
+    parser.add_argument(
+        "--update-thresholds",
+        action="store_true",
+        help="Record this run's measurements (with headroom) as the limits instead of checking them",
+    )
+    parser.add_argument("--json", default=None, help="Write the full benchmark report to this JSON file")
+    parser.add_argument("--log-level", default="INFO", help="Logging level (DEBUG, INFO, WARNING, ERROR)")
+    return parser.parse_args(argv)
+
+
+def _run_benchmark(argv: Sequence[str]) -> None:
+    args = parse_benchmark_args(argv)
+    configure_logging(args.log_level)
+    thresholds = None if args.update_thresholds else load_thresholds(args.thresholds)
+    report = run_benchmarks(
+        args.suite,
+        corpus_dir=args.corpus_dir,
+        thresholds=thresholds,
+        progress=lambda name: logging.info("Benchmarking %s", name),
+    )
+    for name, entry in report["cases"].items():
+        for stage_name in ("load_audio", "analysis"):
+            metrics = entry["timings"][stage_name]
+            logging.info(
+                "%-28s %-10s wall %8.3f s  peak %8.1f MiB",
+                name,
+                stage_name,
+                metrics["wall_seconds"],
+                metrics["peak_mib"],
+            )
+    if args.json:
+        _dump_json(Path(args.json), report)
+        logging.info("Wrote benchmark report to %s", args.json)
+    if args.update_thresholds:
+        update_thresholds({name: entry["timings"] for name, entry in report["cases"].items()}, args.thresholds)
+        logging.info("Updated limits in %s", args.thresholds)
+    for failure in report["failures"]:
+        logging.error("%s", failure)
+    if report["failures"]:
+        raise SystemExit(1)
+
+
+def parse_serve_args(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="frequencipher serve",
+        description="Run a warm analysis service answering HTTP/JSON job requests.",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Address to bind (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"TCP port (default: {DEFAULT_PORT})")
+    parser.add_argument("--unix-socket", default=None, help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=1, help="Jobs analysed concurrently (default: 1)")
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help="Jobs allowed to wait for a worker before requests are refused with 503",
+    )
+    parser.add_argument(
+        "--detector-workers",
+        type=int,
+        default=None,
+        help="Detector threads per job (default: the CPUs divided among --workers)",
+    )
+    parser.add_argument("--baseline", default=None, help="Corpus baseline model, loaded once at startup")
+    parser.add_argument("--index", default=None, help="Fingerprint index of known content, opened once at startup")
+    parser.add_argument("--no-cache", action="store_true", help="Always recompute instead of using the result cache")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="Directory of the result cache")
+    parser.add_argument(
+        "--cache-size-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // 1024**2,
+        help="Maximum result cache size in MiB",
+    )
+    parser.add_argument("--log-level", default="INFO", help="Logging level (DEBUG, INFO, WARNING, ERROR)")
+    return parser.parse_args(argv)
+
+
+def _run_serve(argv: Sequence[str]) -> None:
+    import asyncio
+
+    from .server import AnalysisService, serve
+
+    args = parse_serve_args(argv)
+    configure_logging(args.log_level)
+    cache = None if args.no_cache else ResultCache(args.cache_dir, max_bytes=args.cache_size_mb * 1024**2)
+    service = AnalysisService(
+        workers=args.workers,
+        queue_size=args.queue_size,
+        cache=cache,
+        baseline=args.baseline,
+        index=args.index,
+        detector_workers=args.detector_workers,
+    )
+    try:
+        asyncio.run(serve(service, host=args.host, port=args.port, unix_socket=args.unix_socket))
+    except KeyboardInterrupt:
+        logging.info("Service stopped")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] == "baseline":
+        _run_baseline(argv[1:])
+        return
+    if argv and argv[0] == "index":
+        _run_index(argv[1:])
+        return
+    if argv and argv[0] == "benchmark":
+        _run_benchmark(argv[1:])
+        return
+    if argv and argv[0] == "serve":
+        _run_serve(argv[1:])
+        return
+
+    args = parse_args(argv)
+    configure_logging(args.log_level)
+    if args.batch:
+        _run_batch(args)
+        return
+
+    analyse = run_streaming_analysis if args.stream else run_full_analysis
+    try:
+        audio, results = analyse(args.input[0], **_analysis_options(args))
     except FrequenCipherError as exc:
         logging.error("Analysis failed: %s", exc)
         raise SystemExit(1) from exc
@@ -58,6 +482,12 @@ def main() -> None:
         audio.sample_rate,
     )
 
+    if "profile" in results:
+        _log_profile(results["profile"])
+        if args.prometheus_file:
+            write_prometheus(results["profile"], args.prometheus_file)
+            logging.info("Wrote profile metrics to %s", args.prometheus_file)
+
     if args.json:
         _dump_json(Path(args.json), results)
         logging.info("Wrote JSON results to %s", args.json)
@@ -0,0 +1,226 @@
+"""Shared, lazily populated spectral context for a single signal."""
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+import librosa
+import numpy as np
+
+from .profiling import stage
+from .resample import resample
+
+DEFAULT_N_FFT = 2048
+DEFAULT_HOP_LENGTH = 512
+DEFAULT_MEL_BANDS = 128
+
+
+def resolve_fft_params(
+    size: int,
+    n_fft: int = DEFAULT_N_FFT,
+    hop_length: Optional[int] = DEFAULT_HOP_LENGTH,
+) -> Tuple[int, int]:
+    """Clamp FFT and hop sizes so short signals still produce a valid STFT."""
+
+    effective_fft = min(n_fft, size) if size else n_fft
+    if effective_fft < 2:
+        effective_fft = 2
+    quarter = max(1, effective_fft // 4)
+    effective_hop = quarter if hop_length is None else min(hop_length, quarter)
+    return effective_fft, effective_hop
+
+
+class AnalysisContext:
+    """Memoised spectral representations shared between detectors.
+
+    Every representation is computed on first access and cached under its
+    parameters (``n_fft``, ``hop_length`` and, where relevant, ``n_mels``), so
+    detectors that agree on parameters share one STFT instead of each running
+    their own. Access is thread-safe: detectors running concurrently that ask
+    for the same representation wait for a single computation of it.
+    """
+
+    def __init__(self, samples: np.ndarray, sample_rate: int) -> None:
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self._cache: Dict[Hashable, Any] = {}
+        self._locks: Dict[Hashable, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _memoise(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        with self._locks_guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in self._cache:
+                self._cache[key] = factory()
+        return self._cache[key]
+
+    @property
+    def mono(self) -> np.ndarray:
+        """Mono downmix of the samples (the samples themselves if already mono)."""
+
+        if self.samples.ndim == 1:
+            return self.samples
+        return self._memoise("mono", lambda: np.mean(self.samples, axis=0))
+
+    def at_rate(self, sample_rate: Optional[int]) -> "AnalysisContext":
+        """Context for the samples resampled to ``sample_rate`` (``self`` if unchanged).
+
+        Each rate is resampled once, with the cached polyphase filters of
+        :mod:`frequencipher.resample`, and its context is memoised alongside
+        this one's representations.
+        """
+
+        if sample_rate is None or sample_rate == self.sample_rate:
+            return self
+
+        def build() -> AnalysisContext:
+            with stage(f"resample.{sample_rate}"):
+                return AnalysisContext(resample(self.samples, self.sample_rate, sample_rate), sample_rate)
+
+        return self._memoise(("rate", sample_rate), build)
+
+    def fft_params(self, n_fft: int = DEFAULT_N_FFT, hop_length: Optional[int] = DEFAULT_HOP_LENGTH) -> Tuple[int, int]:
+        """Return the effective ``(n_fft, hop_length)`` for this signal."""
+
+        return resolve_fft_params(self.mono.size, n_fft, hop_length)
+
+    def stft(self, n_fft: int = DEFAULT_N_FFT, hop_length: Optional[int] = DEFAULT_HOP_LENGTH) -> np.ndarray:
+        """Complex STFT of the mono signal."""
+
+        n_fft, hop_length = self.fft_params(n_fft, hop_length)
+        return self._memoise(
+            ("stft", n_fft, hop_length),
+            lambda: librosa.stft(self.mono, n_fft=n_fft, hop_length=hop_length),
+        )
+
+    @property
+    def channels(self) -> int:
+        """Number of channels; the channel axis comes first in multi-channel samples."""
+
+        return 1 if self.samples.ndim == 1 else self.samples.shape[0]
+
+    @property
+    def side(self) -> Optional[np.ndarray]:
+        """Side signal ``(L - R) / 2`` of the first two channels, which :attr:`mono` cancels; ``None`` for mono."""
+
+        if self.channels < 2:
+            return None
+        return self._memoise("side", lambda: (self.samples[0] - self.samples[1]) / 2)
+
+    def stft_blocks(
+        self,
+        n_fft: int = DEFAULT_N_FFT,
+        hop_length: Optional[int] = DEFAULT_HOP_LENGTH,
+        block_frames: int = 256,
+        *,
+        channels: bool = False,
+    ) -> Iterator[np.ndarray]:
+        """Yield the complex64 STFT in consecutive blocks of ``block_frames`` frames.
+
+        The memoised STFT is sliced when another consumer already computed
+        it; otherwise each block is transformed on its own and nothing is
+        cached, so only one block is held at a time. Blocks concatenate to
+        :meth:`stft`. With ``channels=True`` every channel is transformed in
+        the same batched call and blocks have shape ``(channels, bins, frames)``.
+        """
+
+        n_fft, hop_length = self.fft_params(n_fft, hop_length)
+        cached = None if channels else self._cache.get(("stft", n_fft, hop_length))
+        if cached is not None:
+            for start in range(0, cached.shape[1], block_frames):
+                yield cached[:, start : start + block_frames].astype(np.complex64, copy=False)
+            return
+        signal = self.mono
+        if channels:
+            signal = self.samples if self.samples.ndim > 1 else self.samples[np.newaxis]
+        # Same framing as librosa's centred, zero-padded STFT.
+        padding = [(0, 0)] * (signal.ndim - 1) + [(n_fft // 2, n_fft // 2)]
+        padded = np.pad(signal.astype(np.float32, copy=False), padding)
+        frames = 1 + (padded.shape[-1] - n_fft) // hop_length
+        for start in range(0, frames, block_frames):
+            stop = min(frames, start + block_frames)
+            segment = padded[..., start * hop_length : (stop - 1) * hop_length + n_fft]
+            yield librosa.stft(segment, n_fft=n_fft, hop_length=hop_length, center=False).astype(
+                np.complex64, copy=False
+            )
+
+    def magnitude(self, n_fft: int = DEFAULT_N_FFT, hop_length: Optional[int] = DEFAULT_HOP_LENGTH) -> np.ndarray:
+        """Magnitude spectrogram ``|STFT|``."""
+
+        n_fft, hop_length = self.fft_params(n_fft, hop_length)
+        return self._memoise(
+            ("magnitude", n_fft, hop_length),
+            lambda: np.abs(self.stft(n_fft, hop_length)),
+        )
+
+    def power(self, n_fft: int = DEFAULT_N_FFT, hop_length: Optional[int] = DEFAULT_HOP_LENGTH) -> np.ndarray:
+        """Power spectrogram ``|STFT|**2``."""
+
+        n_fft, hop_length = self.fft_params(n_fft, hop_length)
+        return self._memoise(
+            ("power", n_fft, hop_length),
+            lambda: self.magnitude(n_fft, hop_length) ** 2,
+        )
+
+    def mel(
+        self,
+        n_fft: int = DEFAULT_N_FFT,
+        hop_length: Optional[int] = DEFAULT_HOP_LENGTH,
+        n_mels: int = DEFAULT_MEL_BANDS,
+    ) -> np.ndarray:
+        """Mel power spectrogram derived from the cached power spectrogram."""
+
+        n_fft, hop_length = self.fft_params(n_fft, hop_length)
+        return self._memoise(
+            ("mel", n_fft, hop_length, n_mels),
+            lambda: librosa.feature.melspectrogram(
+                S=self.power(n_fft, hop_length),
+                sr=self.sample_rate,
+                n_fft=n_fft,
+                hop_length=hop_length,
+                n_mels=n_mels,
+            ),
+        )
+
+    def onset_envelope(
+        self,
+        n_fft: int = DEFAULT_N_FFT,
+        hop_length: Optional[int] = DEFAULT_HOP_LENGTH,
+        n_mels: int = DEFAULT_MEL_BANDS,
+    ) -> np.ndarray:
+        """Spectral-flux onset strength envelope computed from the cached mel spectrogram."""
+
+        n_fft, hop_length = self.fft_params(n_fft, hop_length)
+        return self._memoise(
+            ("onset", n_fft, hop_length, n_mels),
+            lambda: librosa.onset.onset_strength(
+                S=librosa.power_to_db(self.mel(n_fft, hop_length, n_mels)),
+                sr=self.sample_rate,
+                n_fft=n_fft,
+                hop_length=hop_length,
+            ),
+        )
+
+    def clear(self) -> None:
+        """Drop every cached representation."""
+
+        self._cache.clear()
+        with self._locks_guard:
+            self._locks.clear()
+
+
+def ensure_context(
+    samples: np.ndarray,
+    sample_rate: int,
+    context: Optional[AnalysisContext] = None,
+) -> AnalysisContext:
+    """Return ``context`` if supplied, otherwise a fresh context for ``samples``."""
+
+    if context is not None:
+        return context
+    return AnalysisContext(samples, sample_rate)
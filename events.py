@@ -0,0 +1,24 @@
+"""Helpers for locating events in per-frame score tracks."""
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+
+def local_peaks(scores: np.ndarray, threshold: float, radius: int) -> np.ndarray:
+    """Indices of scores at or above ``threshold`` that are the maximum within ``radius``."""
+
+    from scipy.ndimage import maximum_filter1d
+
+    if not scores.size:
+        return np.array([], dtype=int)
+    local_max = maximum_filter1d(scores, size=2 * radius + 1, mode="constant")
+    return np.flatnonzero((scores >= threshold) & (scores == local_max))
+
+
+def runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """``(starts, stops)`` of the runs of ``True`` in ``mask``, ``stops`` exclusive."""
+
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], mask, [False])).astype(np.int8)))
+    return edges[::2], edges[1::2]
@@ -16,3 +16,11 @@ class UnsupportedFormatError(AudioLoadingError):
 
 class AnalysisError(FrequenCipherError):
     """Raised when an analysis step fails unexpectedly."""
+
+
+class ServiceBusyError(FrequenCipherError):
+    """Raised when the analysis service's job queue is full."""
+
+
+class FingerprintIndexError(FrequenCipherError):
+    """Raised when a fingerprint index is unreadable or was built by an incompatible version."""
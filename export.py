@@ -0,0 +1,71 @@
+"""Binary sidecar export of raw spectral matrices, referenced by path from JSON results."""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+import numpy as np
+
+SIDECAR_SUFFIX = ".spectra"
+
+
+def sidecar_dir_for(json_path: str | Path) -> Path:
+    """Default sidecar directory for a JSON results file: ``results.json`` -> ``results.spectra``."""
+
+    return Path(json_path).with_suffix(SIDECAR_SUFFIX)
+
+
+def write_matrices(matrices: Mapping[str, np.ndarray], directory: str | Path) -> Dict[str, Dict[str, Any]]:
+    """Save each matrix as ``<name>.npy`` in ``directory`` and return JSON references to them.
+
+    ``.npy`` keeps dtype and shape and can be opened with memory-mapping
+    (see :func:`open_matrix`), unlike an ``.npz`` archive. Each file is
+    written to a temporary name and renamed, so readers never see a partial
+    matrix. References hold ``path``, ``dtype`` and ``shape``.
+    """
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    references: Dict[str, Dict[str, Any]] = {}
+    for name, matrix in matrices.items():
+        matrix = np.ascontiguousarray(matrix)
+        path = directory / f"{name}.npy"
+        tmp_path = directory / f"{name}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, matrix, allow_pickle=False)
+        os.replace(tmp_path, path)
+        references[name] = {"path": str(path), "dtype": matrix.dtype.str, "shape": list(matrix.shape)}
+    return references
+
+
+def open_matrix(
+    reference: Mapping[str, Any],
+    *,
+    base: str | Path | None = None,
+    mmap_mode: Optional[str] = "r",
+) -> np.ndarray:
+    """Open a matrix written by :func:`write_matrices`, memory-mapped by default.
+
+    Relative paths are resolved against ``base`` (e.g. the directory of the
+    JSON file) when given, otherwise against the working directory.
+    """
+
+    path = Path(reference["path"])
+    if base is not None and not path.is_absolute():
+        path = Path(base) / path
+    matrix = np.load(path, mmap_mode=mmap_mode, allow_pickle=False)
+    if list(matrix.shape) != list(reference["shape"]) or matrix.dtype.str != reference["dtype"]:
+        raise ValueError(f"'{path}' does not match its reference ({reference['dtype']} {reference['shape']})")
+    return matrix
+
+
+def open_matrices(
+    results: Mapping[str, Any],
+    *,
+    base: str | Path | None = None,
+    mmap_mode: Optional[str] = "r",
+) -> Dict[str, np.ndarray]:
+    """Open every raw spectral matrix referenced by analysis ``results``."""
+
+    references = results.get("spectral", {}).get("matrices", {})
+    return {name: open_matrix(reference, base=base, mmap_mode=mmap_mode) for name, reference in references.items()}
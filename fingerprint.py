@@ -0,0 +1,372 @@
+"""Landmark fingerprints and an on-disk inverted index for matching known content."""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .context import AnalysisContext, ensure_context
+from .exceptions import FingerprintIndexError
+
+ALGORITHM_VERSION = 1
+
+# Landmarks live below 4 kHz, where lossy codecs and playback chains keep the most energy.
+ANALYSIS_RATE: Optional[int] = 8000
+
+INDEX_FORMAT_VERSION = 1
+DEFAULT_SHARDS = 16
+DEFAULT_MIN_MATCHES = 8
+
+_N_FFT = 1024
+_HOP_LENGTH = 256
+# Peak neighbourhood in frequency bins and frames.
+_PEAK_BINS = 21
+_PEAK_FRAMES = 11
+# Hash layout: anchor bin (9 bits), target bin (9 bits), frame gap (6 bits).
+_BIN_BITS = 9
+_GAP_BITS = 6
+_MAX_GAP = (1 << _GAP_BITS) - 1
+_MAX_BIN = (1 << _BIN_BITS) - 1
+_MANIFEST = "manifest.json"
+_POSTING = np.dtype([("track", "<u4"), ("offset", "<u4")])
+
+
+def _spectral_peaks(magnitude: np.ndarray, frame_rate: float, peaks_per_second: int) -> Tuple[np.ndarray, np.ndarray]:
+    """``(frames, bins)`` of the strongest local maxima, at most ``peaks_per_second`` per second.
+
+    Peaks must exceed the spectrogram's median, so silence yields none.
+    """
+
+    from scipy.ndimage import maximum_filter
+
+    level = np.log(magnitude + 1e-10)
+    local_max = maximum_filter(level, size=(_PEAK_BINS, _PEAK_FRAMES), mode="constant", cval=-np.inf)
+    bins, frames = np.nonzero((level == local_max) & (level > np.median(level)))
+    strength = level[bins, frames]
+    second = (frames / frame_rate).astype(np.int64)
+    order = np.lexsort((-strength, second))
+    second = second[order]
+    # Rank of each peak within its second, strongest first.
+    first = np.searchsorted(second, second, side="left")
+    keep = order[np.arange(order.size) - first < peaks_per_second]
+    keep = keep[np.lexsort((bins[keep], frames[keep]))]
+    return frames[keep], bins[keep]
+
+
+def _landmarks(frames: np.ndarray, bins: np.ndarray, fan_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Hash each peak with up to ``fan_out`` later peaks at most 63 frames ahead."""
+
+    hashes: List[np.ndarray] = []
+    offsets: List[np.ndarray] = []
+    paired = np.zeros(frames.size, dtype=np.int64)
+    for step in range(1, 3 * fan_out + 1):
+        anchor = np.arange(frames.size - step)
+        gap = frames[step:] - frames[:-step]
+        valid = (gap >= 1) & (gap <= _MAX_GAP) & (paired[anchor] < fan_out)
+        anchor = anchor[valid]
+        if not anchor.size:
+            continue
+        paired[anchor] += 1
+        anchor_bin = np.minimum(bins[anchor], _MAX_BIN).astype(np.uint32)
+        target_bin = np.minimum(bins[anchor + step], _MAX_BIN).astype(np.uint32)
+        hashes.append(
+            (anchor_bin << (_BIN_BITS + _GAP_BITS)) | (target_bin << _GAP_BITS) | gap[valid].astype(np.uint32)
+        )
+        offsets.append(frames[anchor].astype(np.uint32))
+    if not hashes:
+        return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.uint32)
+    return np.concatenate(hashes), np.concatenate(offsets)
+
+
+def extract_fingerprints(
+    samples: np.ndarray,
+    sample_rate: int,
+    *,
+    context: Optional[AnalysisContext] = None,
+    peaks_per_second: int = 30,
+    fan_out: int = 5,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Landmark hashes of the signal and the frame at which each one starts.
+
+    Spectrogram peaks (local maxima of a 1024-point STFT) are paired with
+    the next peaks up to 63 frames later; each pair hashes to a ``uint32``
+    of both frequency bins and their frame gap, which survives noise, gain
+    changes and lossy coding. The signal is analysed at
+    :data:`ANALYSIS_RATE` (resampled through the context if needed), where a
+    frame lasts 32 ms, so fingerprints of any sample rate are comparable.
+    """
+
+    context = ensure_context(samples, sample_rate, context).at_rate(ANALYSIS_RATE)
+    if context.mono.size < _N_FFT:
+        return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.uint32)
+    magnitude = context.magnitude(_N_FFT, _HOP_LENGTH)
+    frames, bins = _spectral_peaks(magnitude, context.sample_rate / _HOP_LENGTH, peaks_per_second)
+    return _landmarks(frames, bins, fan_out)
+
+
+def fingerprint_file(path: str | Path) -> Tuple[np.ndarray, np.ndarray]:
+    """Decode ``path`` as the pipeline does and return its :func:`extract_fingerprints`."""
+
+    from .ingestion import load_audio
+
+    audio = load_audio(path, mono=True)
+    return extract_fingerprints(audio.samples, audio.sample_rate)
+
+
+def _write_array(path: Path, array: np.ndarray) -> None:
+    tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+    np.save(tmp_path, array, allow_pickle=False)
+    os.replace(tmp_path, path)
+
+
+class FingerprintIndex:
+    """Inverted index from landmark hash to ``(track, frame)`` postings, stored on disk.
+
+    Hashes are spread over ``shards`` (a power of two) by a multiplicative
+    hash. Every :meth:`add` writes, per shard, one immutable segment: a
+    sorted ``uint32`` key array and the matching postings, as ``.npy`` files
+    opened memory-mapped, so lookups are binary searches that touch only
+    the pages they need. :meth:`compact` merges each shard's segments into
+    one. ``manifest.json`` lists the tracks and segments and is replaced
+    last, so readers never see a partial insert; ``shards`` only applies
+    when the index is created.
+    """
+
+    def __init__(self, directory: str | Path, *, shards: int = DEFAULT_SHARDS) -> None:
+        self.directory = Path(directory)
+        manifest_path = self.directory / _MANIFEST
+        if manifest_path.exists():
+            try:
+                with manifest_path.open("r", encoding="utf-8") as f:
+                    self._manifest = json.load(f)
+            except (OSError, ValueError) as exc:
+                raise FingerprintIndexError(f"Cannot read fingerprint index '{self.directory}': {exc}") from exc
+            expected = {"format": INDEX_FORMAT_VERSION, "fingerprint": ALGORITHM_VERSION}
+            found = {key: self._manifest.get(key) for key in expected}
+            if found != expected:
+                raise FingerprintIndexError(
+                    f"Fingerprint index '{self.directory}' has format {found}, expected {expected}; rebuild it"
+                )
+        else:
+            if shards < 1 or shards & (shards - 1):
+                raise ValueError(f"shards must be a power of two, got {shards}")
+            self._manifest = {
+                "format": INDEX_FORMAT_VERSION,
+                "fingerprint": ALGORITHM_VERSION,
+                "frame_seconds": _HOP_LENGTH / ANALYSIS_RATE,
+                "generation": 0,
+                "tracks": [],
+                "segments": [[] for _ in range(shards)],
+            }
+        self._segments: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @property
+    def shards(self) -> int:
+        return len(self._manifest["segments"])
+
+    @property
+    def tracks(self) -> List[Dict[str, Any]]:
+        """Indexed tracks: ``name`` and number of ``hashes``, by track id."""
+
+        return self._manifest["tracks"]
+
+    @property
+    def identifier(self) -> str:
+        """Changes whenever the indexed content does (for cache keys)."""
+
+        return f"{self.directory.resolve()}@{self._manifest['generation']}"
+
+    def __len__(self) -> int:
+        return sum(track["hashes"] for track in self.tracks)
+
+    def _shard_of(self, hashes: np.ndarray) -> np.ndarray:
+        bits = self.shards.bit_length() - 1
+        if not bits:
+            return np.zeros(hashes.size, dtype=np.int64)
+        mixed = (hashes.astype(np.uint64) * np.uint64(0x9E3779B1)) & np.uint64(0xFFFFFFFF)
+        return (mixed >> np.uint64(32 - bits)).astype(np.int64)
+
+    def _save_manifest(self) -> None:
+        path = self.directory / _MANIFEST
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(self._manifest, f)
+        os.replace(tmp_path, path)
+
+    def _write_segments(self, keys: np.ndarray, postings: np.ndarray, shard: np.ndarray, tag: str) -> None:
+        """Write the sorted ``keys``/``postings`` of every shard as segment ``tag``."""
+
+        bounds = np.searchsorted(shard, np.arange(self.shards + 1))
+        for index in range(self.shards):
+            lo, hi = bounds[index], bounds[index + 1]
+            if lo == hi:
+                continue
+            name = f"{index:04d}-{tag}"
+            _write_array(self.directory / f"{name}.keys.npy", keys[lo:hi])
+            _write_array(self.directory / f"{name}.postings.npy", postings[lo:hi])
+            self._manifest["segments"][index].append(name)
+
+    def add(self, entries: Iterable[Tuple[str, np.ndarray, np.ndarray]]) -> List[int]:
+        """Insert ``(name, hashes, offsets)`` entries in one batch and return their track ids."""
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        ids: List[int] = []
+        keys: List[np.ndarray] = []
+        postings: List[np.ndarray] = []
+        for name, hashes, offsets in entries:
+            track = len(self.tracks)
+            self.tracks.append({"name": str(name), "hashes": int(hashes.size)})
+            ids.append(track)
+            posting = np.empty(hashes.size, dtype=_POSTING)
+            posting["track"] = track
+            posting["offset"] = offsets
+            keys.append(np.asarray(hashes, dtype=np.uint32))
+            postings.append(posting)
+        if keys:
+            all_keys = np.concatenate(keys)
+            shard = self._shard_of(all_keys)
+            order = np.lexsort((all_keys, shard))
+            self._write_segments(
+                all_keys[order], np.concatenate(postings)[order], shard[order], f"{self._manifest['generation']:06d}"
+            )
+        self._manifest["generation"] += 1
+        self._save_manifest()
+        return ids
+
+    def compact(self) -> None:
+        """Merge every shard's segments into one and delete the files no longer listed."""
+
+        tag = f"{self._manifest['generation']:06d}c"
+        for index, names in enumerate(self._manifest["segments"]):
+            if len(names) < 2:
+                continue
+            keys = np.concatenate([self._open(name)[0] for name in names])
+            postings = np.concatenate([self._open(name)[1] for name in names])
+            order = np.argsort(keys, kind="stable")
+            self._manifest["segments"][index] = []
+            self._write_segments(keys[order], postings[order], np.full(keys.size, index), tag)
+        self._manifest["generation"] += 1
+        self._save_manifest()
+        live = {name for names in self._manifest["segments"] for name in names}
+        for path in self.directory.glob("*.keys.npy"):
+            name = path.name[: -len(".keys.npy")]
+            if name not in live:
+                self._segments.pop(name, None)
+                path.unlink(missing_ok=True)
+                (self.directory / f"{name}.postings.npy").unlink(missing_ok=True)
+
+    def _open(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        if name not in self._segments:
+            self._segments[name] = (
+                np.load(self.directory / f"{name}.keys.npy", mmap_mode="r"),
+                np.load(self.directory / f"{name}.postings.npy", mmap_mode="r"),
+            )
+        return self._segments[name]
+
+    def lookup(self, hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Every posting of ``hashes``: ``(track, offset, query_index)`` arrays."""
+
+        hashes = np.asarray(hashes, dtype=np.uint32)
+        shard = self._shard_of(hashes)
+        found: List[Tuple[np.ndarray, np.ndarray]] = []
+        for index, names in enumerate(self._manifest["segments"]):
+            positions = np.flatnonzero(shard == index)
+            if not positions.size or not names:
+                continue
+            wanted = hashes[positions]
+            for name in names:
+                keys, postings = self._open(name)
+                lo = np.searchsorted(keys, wanted, side="left")
+                counts = np.searchsorted(keys, wanted, side="right") - lo
+                total = int(counts.sum())
+                if not total:
+                    continue
+                starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+                found.append((postings[starts + np.arange(total)], np.repeat(positions, counts)))
+        if not found:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty
+        postings = np.concatenate([entry[0] for entry in found])
+        query_index = np.concatenate([entry[1] for entry in found])
+        return postings["track"].astype(np.int64), postings["offset"].astype(np.int64), query_index
+
+    def query(
+        self,
+        hashes: np.ndarray,
+        offsets: np.ndarray,
+        *,
+        min_matches: int = DEFAULT_MIN_MATCHES,
+        top: int = 5,
+    ) -> List[Dict[str, Any]]:
+        """Indexed tracks sharing at least ``min_matches`` time-consistent hashes with the query.
+
+        A true match lines its hashes up at one offset between query and
+        reference, while chance collisions scatter; each track scores the
+        count at its best offset. Results, best first, give the track id
+        and ``name``, ``matches``, the share of the query's hashes that
+        matched (``coverage``) and ``offset_seconds``, where the query's
+        start falls in the reference.
+        """
+
+        track, reference_offset, query_index = self.lookup(hashes)
+        if not track.size:
+            return []
+        delta = reference_offset - np.asarray(offsets, dtype=np.int64)[query_index]
+        pairs, counts = np.unique(track << 32 | (delta + (1 << 31)), return_counts=True)
+        order = np.lexsort((-counts, pairs >> 32))
+        pairs, counts = pairs[order], counts[order]
+        best = np.flatnonzero(np.diff(np.concatenate(([-1], pairs >> 32))) != 0)
+        best = best[counts[best] >= min_matches]
+        best = best[np.argsort(-counts[best], kind="stable")][:top]
+        frame_seconds = self._manifest["frame_seconds"]
+        return [
+            {
+                "track": int(pairs[index] >> 32),
+                "name": self.tracks[int(pairs[index] >> 32)]["name"],
+                "matches": int(counts[index]),
+                "coverage": float(counts[index] / max(len(hashes), 1)),
+                "offset_seconds": float(((pairs[index] & 0xFFFFFFFF) - (1 << 31)) * frame_seconds),
+            }
+            for index in best
+        ]
+
+
+def match_fingerprints(
+    samples: np.ndarray,
+    sample_rate: int,
+    index: FingerprintIndex,
+    *,
+    context: Optional[AnalysisContext] = None,
+    min_matches: int = DEFAULT_MIN_MATCHES,
+) -> Dict[str, Any]:
+    """Known content from ``index`` found in the signal (see :meth:`FingerprintIndex.query`)."""
+
+    hashes, offsets = extract_fingerprints(samples, sample_rate, context=context)
+    matches = index.query(hashes, offsets, min_matches=min_matches)
+    return {
+        "hashes": int(hashes.size),
+        "indexed_tracks": len(index.tracks),
+        "best_matches": matches[0]["matches"] if matches else 0,
+        "matches": matches,
+    }
+
+
+def open_index(index: FingerprintIndex | str | Path) -> FingerprintIndex:
+    """``index`` itself, or the index stored in that directory."""
+
+    return index if isinstance(index, FingerprintIndex) else FingerprintIndex(index)
+
+
+def index_files(
+    index: FingerprintIndex | str | Path,
+    paths: Sequence[str | Path],
+    *,
+    shards: int = DEFAULT_SHARDS,
+) -> List[int]:
+    """Fingerprint ``paths`` and add them to ``index`` in one batch; returns their track ids."""
+
+    index = index if isinstance(index, FingerprintIndex) else FingerprintIndex(index, shards=shards)
+    return index.add((str(path), *fingerprint_file(path)) for path in paths)
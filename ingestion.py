@@ -2,17 +2,20 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Iterable, Optional, Tuple
+from typing import Optional, Tuple
 
 import numpy as np
 import soundfile as sf
-from scipy.signal import resample_poly
 import numpy.typing as npt
 
 from .exceptions import AudioLoadingError, UnsupportedFormatError
 from .models import AudioSignal
+from .profiling import stage
+from .resample import resample
+from .wavmap import decode_frames, map_frames, read_wav_layout
 
 SUPPORTED_FORMATS = {"wav", "mp3", "flac", "ogg"}
+_MAPPED_BLOCK_FRAMES = 1 << 18
 
 
 def _validate_path(path: Path) -> None:
@@ -46,13 +49,96 @@ def _normalise(samples: np.ndarray) -> np.ndarray:
 def _resample_if_needed(samples: np.ndarray, sr: int, target_sr: Optional[int]) -> Tuple[np.ndarray, int]:
     if target_sr is None or target_sr == sr:
         return samples, sr
-    gcd = np.gcd(sr, target_sr)
-    up = target_sr // gcd
-    down = sr // gcd
-    resampled = resample_poly(samples, up, down).astype(np.float32)
+    with stage(f"resample.{target_sr}"):
+        resampled = resample(samples, sr, target_sr).astype(np.float32, copy=False)
     return resampled, target_sr
 
 
+def _read_chunked(f: sf.SoundFile, chunk_size: int) -> np.ndarray:
+    """Read ``f`` block by block straight into one preallocated buffer."""
+
+    buffer = np.empty((max(f.frames, 0), f.channels), dtype=np.float32)
+    filled = 0
+    while True:
+        if filled < buffer.shape[0]:
+            count = min(chunk_size, buffer.shape[0] - filled)
+            read = f.read(count, dtype="float32", always_2d=True, out=buffer[filled : filled + count]).shape[0]
+            if read == 0:
+                break
+            filled += read
+            continue
+        # Frame counts can be underestimated for compressed formats; keep reading past them.
+        block = f.read(chunk_size, dtype="float32", always_2d=True)
+        if block.shape[0] == 0:
+            break
+        grown = np.empty((max(buffer.shape[0] * 2, filled + block.shape[0]), f.channels), dtype=np.float32)
+        grown[:filled] = buffer[:filled]
+        grown[filled : filled + block.shape[0]] = block
+        buffer = grown
+        filled += block.shape[0]
+    return buffer[:filled]
+
+
+def _centre_and_normalise(samples: np.ndarray, block: int, stats: Optional[Tuple[float, float, float]] = None) -> None:
+    """In-place equivalent of ``_normalise(_remove_dc_offset(samples))`` for contiguous arrays."""
+
+    flat = samples.reshape(-1)
+    if flat.size == 0:
+        return
+    if stats is None:
+        total, low, high = 0.0, np.inf, -np.inf
+        for start in range(0, flat.size, block):
+            chunk = flat[start : start + block]
+            total += float(np.sum(chunk, dtype=np.float64))
+            low, high = min(low, float(chunk.min())), max(high, float(chunk.max()))
+    else:
+        total, low, high = stats
+    mean = total / flat.size
+    peak = np.float32(max(high - mean, mean - low))
+    for start in range(0, flat.size, block):
+        chunk = flat[start : start + block]
+        chunk -= np.float32(mean)
+        if peak > 0:
+            chunk /= peak
+
+
+def _load_mapped(path: Path, mono: bool, block: int) -> Optional[Tuple[np.ndarray, int, int]]:
+    """Load PCM/float WAV or RF64 through a memory map, without intermediate copies.
+
+    Mono float32 files are preprocessed in place on a copy-on-write map, so
+    the only memory used is the pages the preprocessing rewrites. Other
+    layouts are decoded block by block into a single output array, with the
+    downmix applied per block and DC offset and peak gathered on the way.
+    Returns ``None`` when the file is not a layout the map supports.
+    """
+
+    layout = read_wav_layout(path)
+    if layout is None or layout.frames == 0:
+        return None
+
+    if layout.is_float32 and layout.channels == 1:
+        frames = map_frames(path, layout, mode="c")
+        samples = frames[:, 0] if mono else frames.T
+        _centre_and_normalise(samples, block)
+        return samples, layout.sample_rate, layout.channels
+
+    mapped = map_frames(path, layout)
+    samples = np.empty((layout.frames,) if mono else (layout.channels, layout.frames), dtype=np.float32)
+    total, low, high = 0.0, np.inf, -np.inf
+    for start in range(0, layout.frames, block):
+        decoded = decode_frames(mapped[start : start + block])
+        if mono:
+            target = samples[start : start + decoded.shape[0]]
+            np.mean(decoded, axis=1, out=target)
+        else:
+            target = samples[:, start : start + decoded.shape[0]]
+            target[...] = decoded.T
+        total += float(np.sum(target, dtype=np.float64))
+        low, high = min(low, float(target.min())), max(high, float(target.max()))
+    _centre_and_normalise(samples, block, (total, low, high))
+    return samples, layout.sample_rate, layout.channels
+
+
 def load_audio(
     path: str | Path,
     *,
@@ -60,6 +146,7 @@ def load_audio(
     mono: bool = True,
     dtype: npt.DTypeLike = np.float32,
     chunk_size: Optional[int] = None,
+    mmap: bool = True,
 ) -> AudioSignal:
     """Load an audio file, returning an :class:`AudioSignal` instance.
 
@@ -75,31 +162,37 @@ def load_audio(
         Floating point dtype for the returned samples.
     chunk_size:
         Optional chunk size (in samples) to stream from disk. If provided, the
-        function will load the file in blocks and concatenate them to minimise
-        memory spikes for very large recordings.
+        function will load the file in blocks into a single preallocated
+        buffer, avoiding the transient second copy of a concatenation. Use
+        :func:`frequencipher.analysis.run_streaming_analysis` when the
+        recording does not fit in memory at all.
+    mmap:
+        If ``True`` (default), PCM and float WAV/RF64 files are memory-mapped
+        and preprocessed block by block (in place for mono float32 files,
+        whose samples are then a copy-on-write ``np.memmap``), so memory
+        stays close to the size of the decoded signal.
     """
 
     audio_path = Path(path)
     _validate_path(audio_path)
 
-    data_iter: Iterable[np.ndarray]
+    mapped = None
+    if mmap and audio_path.suffix.lower() == ".wav":
+        mapped = _load_mapped(audio_path, mono, chunk_size or _MAPPED_BLOCK_FRAMES)
+    if mapped is not None:
+        samples, sr, channels = mapped
+        samples, sr = _resample_if_needed(samples, sr, target_sr)
+        return _finish(samples, sr, 1 if mono else channels, dtype, audio_path)
+
     if chunk_size is None:
-        samples, sr = sf.read(audio_path, always_2d=True, dtype="float32")
-        data_iter = (samples,)
+        stacked, sr = sf.read(audio_path, always_2d=True, dtype="float32")
     else:
         with sf.SoundFile(audio_path, "r") as f:
             sr = f.samplerate
-            frames = []
-            while True:
-                block = f.read(chunk_size, dtype="float32", always_2d=True)
-                if block.size == 0:
-                    break
-                frames.append(block)
-            data_iter = frames
-        if not data_iter:
+            stacked = _read_chunked(f, chunk_size)
+        if stacked.size == 0:
             raise AudioLoadingError(f"Audio file '{audio_path}' is empty.")
 
-    stacked = np.vstack(tuple(data_iter))
     channels = stacked.shape[1]
     if mono:
         samples = _to_mono(stacked).astype(np.float32)
@@ -111,7 +204,10 @@ def load_audio(
     samples = _remove_dc_offset(samples)
     samples = _normalise(samples)
     samples, sr = _resample_if_needed(samples, sr, target_sr)
+    return _finish(samples, sr, channel_count, dtype, audio_path)
+
 
+def _finish(samples: np.ndarray, sr: int, channel_count: int, dtype: npt.DTypeLike, audio_path: Path) -> AudioSignal:
     if dtype != np.float32:
         samples = samples.astype(dtype, copy=False)
 
@@ -10,7 +10,11 @@ import numpy as np
 
 @dataclass(slots=True)
 class AudioSignal:
-    """Container for audio samples and associated metadata."""
+    """Container for audio samples and associated metadata.
+
+    ``samples`` may be a (copy-on-write) ``np.memmap`` view of the source
+    file, as produced by the memory-mapped WAV ingestion path.
+    """
 
     samples: np.ndarray
     sample_rate: int
@@ -18,6 +22,12 @@ class AudioSignal:
     duration: float
     path: Optional[Path] = None
 
+    @property
+    def memory_mapped(self) -> bool:
+        """Whether ``samples`` is backed by a memory map of the source file."""
+
+        return isinstance(self.samples, np.memmap)
+
     def to_dict(self) -> Dict[str, object]:
         """Serialize the metadata (excluding raw samples) into a dictionary."""
 
@@ -26,6 +36,7 @@ class AudioSignal:
         metadata["samples"] = {
             "shape": tuple(self.samples.shape),
             "dtype": str(self.samples.dtype),
+            "memory_mapped": self.memory_mapped,
         }
         return metadata
 
@@ -1,40 +1,146 @@
 """Phase-based hidden message detection."""
 from __future__ import annotations
 
-from typing import Dict
+from typing import Any, Dict, Iterator, Optional
 
-import librosa
 import numpy as np
-from scipy.stats import entropy
 
-from .statistics import summarise_array
+from .context import AnalysisContext, ensure_context
+from .statistics import SummaryAccumulator
 
+ALGORITHM_VERSION = 2
 
-def detect_phase_anomalies(samples: np.ndarray, sample_rate: int) -> Dict[str, float]:
-    """Analyse phase coherence to surface potential hidden encodings."""
+_HISTOGRAM_BINS = 64
+_MAP_HISTOGRAM_BINS = 16
 
-    effective_fft = min(2048, samples.size if samples.size else 2048)
-    if effective_fft < 2:
-        effective_fft = 2
-    stft = librosa.stft(samples, n_fft=effective_fft)
-    phase = np.unwrap(np.angle(stft))
-    phase_diff = np.diff(phase, axis=1)
 
-    variance = float(np.var(phase_diff))
-    mean_deviation = float(np.mean(np.abs(phase_diff)))
-    coherence = float(np.abs(np.mean(np.exp(1j * phase_diff))))
+def _unit_phasors(block: np.ndarray) -> np.ndarray:
+    """``exp(1j * angle(block))`` in complex64, ``1`` where a bin is silent (``angle(0) == 0``)."""
 
-    hist, _ = np.histogram(phase_diff.flatten(), bins=64, density=True)
-    phase_entropy = float(entropy(hist + 1e-8))
+    magnitude = np.abs(block)
+    return np.divide(block, magnitude, out=np.ones_like(block), where=magnitude > 0)
 
-    summary = summarise_array(phase_diff.flatten()).to_dict()
+
+def _phase_advances(blocks: Iterator[np.ndarray], cell_frames: int) -> Iterator[np.ndarray]:
+    """Frame-to-frame unit phasor advances of consecutive STFT ``blocks``.
+
+    Each yielded array spans whole cells of ``cell_frames`` advances (the
+    last one may be shorter), so cells never straddle two arrays.
+    """
+
+    carry: Optional[np.ndarray] = None
+    for block in blocks:
+        phasors = _unit_phasors(block)
+        if carry is not None:
+            phasors = np.concatenate([carry, phasors], axis=1)
+        whole = (phasors.shape[1] - 1) // cell_frames * cell_frames
+        carry = phasors[:, whole:]
+        if whole:
+            yield phasors[:, 1 : whole + 1] * np.conj(phasors[:, :whole])
+    if carry is not None and carry.shape[1] > 1:
+        yield carry[:, 1:] * np.conj(carry[:, :-1])
+
+
+def _histogram_index(phase_diff: np.ndarray, bins: int) -> np.ndarray:
+    index = ((phase_diff + np.pi) * (bins / (2 * np.pi))).astype(np.int64)
+    return np.clip(index, 0, bins - 1)
+
+
+def _entropy(counts: np.ndarray) -> np.ndarray:
+    """Shannon entropy (nats) of histograms along the last axis; 0 for empty ones."""
+
+    totals = counts.sum(axis=-1, keepdims=True)
+    probabilities = np.divide(counts, totals, out=np.zeros(counts.shape), where=totals > 0)
+    logs = np.log(probabilities, out=np.zeros_like(probabilities), where=probabilities > 0)
+    return -(probabilities * logs).sum(axis=-1)
+
+
+def detect_phase_anomalies(
+    samples: np.ndarray,
+    sample_rate: int,
+    *,
+    context: Optional[AnalysisContext] = None,
+    block_frames: int = 256,
+    map_seconds: float = 1.0,
+    bands: int = 16,
+) -> Dict[str, Any]:
+    """Analyse phase coherence to surface potential hidden encodings.
+
+    The frame-to-frame phase advance of every STFT bin is processed in
+    complex64 blocks of ``block_frames`` frames (see
+    :meth:`~frequencipher.context.AnalysisContext.stft_blocks`) and its
+    global statistics are accumulated block by block, so no full-size phase
+    matrix is ever built; quartiles are approximate (see
+    :class:`~frequencipher.statistics.SummaryAccumulator`).
+
+    ``map`` holds the coherence (length of the mean phasor) and normalised
+    entropy (0 to 1) of each bin's phase advances over a time cell of about
+    ``map_seconds``, averaged over each of ``bands`` equal-width frequency
+    bands: phase-encoded data shows up as cells whose phase is unusually
+    ordered or disordered compared with their neighbours.
+    """
+
+    context = ensure_context(samples, sample_rate, context)
+    n_fft, hop_length = context.fft_params(2048, None)
+    bins = n_fft // 2 + 1
+    bands = max(1, min(bands, bins))
+    band_starts = np.arange(bands) * bins // bands
+    band_sizes = np.diff(np.append(band_starts, bins))[:, np.newaxis]
+    cell_frames = max(1, int(round(map_seconds * sample_rate / hop_length)))
+
+    summary = SummaryAccumulator(exact=False)
+    absolute_sum = 0.0
+    phasor_sum = 0j
+    histogram = np.zeros(_HISTOGRAM_BINS, dtype=np.int64)
+    coherence_cells = []
+    entropy_cells = []
+    for advance in _phase_advances(context.stft_blocks(n_fft, hop_length, block_frames), cell_frames):
+        # The angle of each advance equals the difference of the time-unwrapped phase.
+        phase_diff = np.angle(advance)
+
+        summary.update(phase_diff)
+        absolute_sum += float(np.abs(phase_diff).sum(dtype=np.float64))
+        phasor_sum += complex(advance.sum(dtype=np.complex128))
+        histogram += np.bincount(_histogram_index(phase_diff, _HISTOGRAM_BINS).ravel(), minlength=_HISTOGRAM_BINS)
+
+        # Per bin and cell first: pooling a band's phasors directly would let bins at different
+        # frequencies cancel each other out.
+        frames = phase_diff.shape[1]
+        starts = np.arange(0, frames, cell_frames)
+        cells = starts.size
+        sizes = np.diff(np.append(starts, frames))
+        coherence = np.abs(np.add.reduceat(advance, starts, axis=1)) / sizes
+        cell_of_frame = np.arange(frames) // cell_frames
+        group = (np.arange(bins)[:, np.newaxis] * cells + cell_of_frame[np.newaxis, :]) * _MAP_HISTOGRAM_BINS
+        counts = np.bincount(
+            (group + _histogram_index(phase_diff, _MAP_HISTOGRAM_BINS)).ravel(),
+            minlength=bins * cells * _MAP_HISTOGRAM_BINS,
+        )
+        entropy = _entropy(counts.reshape(bins, cells, _MAP_HISTOGRAM_BINS)) / np.log(_MAP_HISTOGRAM_BINS)
+        coherence_cells.append((np.add.reduceat(coherence, band_starts, axis=0) / band_sizes).T)
+        entropy_cells.append((np.add.reduceat(entropy, band_starts, axis=0) / band_sizes).T)
+
+    result = summary.result()
+    count = max(summary.count, 1)
+    coherence_map = np.concatenate(coherence_cells) if coherence_cells else np.zeros((0, bands))
+    entropy_map = np.concatenate(entropy_cells) if entropy_cells else np.zeros((0, bands))
+    # Matches ``scipy.stats.entropy`` of the density histogram, which normalises it first.
+    density = histogram + 1e-8 * histogram.sum() / count
+    phase_entropy = float(_entropy(density[np.newaxis, :].astype(np.float64))[0])
 
     return {
-        "phase_variance": variance,
-        "phase_mean_deviation": mean_deviation,
-        "phase_coherence": coherence,
+        "phase_variance": result.std**2,
+        "phase_mean_deviation": absolute_sum / count,
+        "phase_coherence": abs(phasor_sum) / count,
         "phase_entropy": phase_entropy,
-        "phase_diff_mean": summary["mean"],
-        "phase_diff_std": summary["std"],
-        "phase_diff_percentile_75": summary["percentile_75"],
+        "phase_diff_mean": result.mean,
+        "phase_diff_std": result.std,
+        "phase_diff_percentile_75": result.percentile_75,
+        "map": {
+            "cell_seconds": cell_frames * hop_length / sample_rate,
+            "band_edges_hz": (np.arange(bands + 1) * (sample_rate / 2) / bands).tolist(),
+            "time": (np.arange(coherence_map.shape[0]) * cell_frames * hop_length / sample_rate).tolist(),
+            "coherence": coherence_map.tolist(),
+            "entropy": entropy_map.tolist(),
+        },
     }
@@ -0,0 +1,197 @@
+"""Opt-in per-stage wall time, CPU time and peak allocation measurements."""
+from __future__ import annotations
+
+import contextvars
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence
+
+_ACTIVE: contextvars.ContextVar[Optional["Profiler"]] = contextvars.ContextVar("frequencipher_profiler", default=None)
+
+
+@dataclass(frozen=True, slots=True)
+class StageRecord:
+    """Measurements of one completed stage.
+
+    ``cpu_seconds`` is the CPU time of the thread that ran the stage.
+    ``peak_bytes`` is the peak of Python and NumPy allocations traced by
+    :mod:`tracemalloc` above the level at which the stage started; stages
+    running concurrently on other threads contribute to it, so run detectors
+    on one worker for exact attribution.
+    """
+
+    name: str
+    wall_seconds: float
+    cpu_seconds: float
+    peak_bytes: int
+
+
+StageHook = Callable[[StageRecord], None]
+
+
+@dataclass(slots=True)
+class _OpenStage:
+    start_bytes: int
+    peak_bytes: int
+
+
+class Profiler:
+    """Collect :class:`StageRecord` entries for stages run while it is active.
+
+    Stages nest (a detector stage includes the resampling and spectral
+    feature stages it triggers) and repeated stages of the same name are
+    aggregated. ``hooks`` are called with every record as its stage ends.
+    Memory tracing starts with the first stage and stops when the profiler
+    is deactivated; pass ``trace_memory=False`` to avoid its overhead.
+    """
+
+    def __init__(self, *, trace_memory: bool = True, hooks: Sequence[StageHook] = ()) -> None:
+        self.trace_memory = trace_memory
+        self.hooks: List[StageHook] = list(hooks)
+        self.records: List[StageRecord] = []
+        self._open: List[_OpenStage] = []
+        self._lock = threading.Lock()
+        self._started_tracing = False
+
+    def add_hook(self, hook: StageHook) -> None:
+        self.hooks.append(hook)
+
+    def _traced(self) -> bool:
+        if not self.trace_memory:
+            return False
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return True
+
+    def _enter(self) -> Optional[_OpenStage]:
+        if not self._traced():
+            return None
+        with self._lock:
+            current, peak = tracemalloc.get_traced_memory()
+            for stage in self._open:
+                stage.peak_bytes = max(stage.peak_bytes, peak)
+            tracemalloc.reset_peak()
+            opened = _OpenStage(current, current)
+            self._open.append(opened)
+            return opened
+
+    def _exit(self, opened: Optional[_OpenStage]) -> int:
+        if opened is None:
+            return 0
+        with self._lock:
+            _, peak = tracemalloc.get_traced_memory()
+            for stage in self._open:
+                stage.peak_bytes = max(stage.peak_bytes, peak)
+            self._open.remove(opened)
+            return opened.peak_bytes - opened.start_bytes
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Measure the enclosed block as stage ``name``."""
+
+        opened = self._enter()
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            record = StageRecord(
+                name,
+                time.perf_counter() - wall,
+                time.thread_time() - cpu,
+                self._exit(opened),
+            )
+            with self._lock:
+                self.records.append(record)
+            for hook in self.hooks:
+                hook(record)
+
+    def stop(self) -> None:
+        """Stop memory tracing if this profiler started it."""
+
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """Aggregate records by stage name, in order of first completion."""
+
+        summary: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            entry = summary.setdefault(
+                record.name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "peak_bytes": 0}
+            )
+            entry["calls"] += 1
+            entry["wall_seconds"] += record.wall_seconds
+            entry["cpu_seconds"] += record.cpu_seconds
+            entry["peak_bytes"] = max(entry["peak_bytes"], record.peak_bytes)
+        return summary
+
+
+@contextmanager
+def profiling(profiler: Profiler) -> Iterator[Profiler]:
+    """Make ``profiler`` the active one for :func:`stage` calls in this context."""
+
+    token = _ACTIVE.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _ACTIVE.reset(token)
+        profiler.stop()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Measure the enclosed block on the active profiler, if there is one."""
+
+    profiler = _ACTIVE.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name):
+        yield
+
+
+_PROMETHEUS_METRICS = (
+    ("wall_seconds", "Wall-clock time spent in an analysis stage."),
+    ("cpu_seconds", "CPU time spent in an analysis stage."),
+    ("peak_bytes", "Peak traced allocation of an analysis stage."),
+    ("calls", "Number of times an analysis stage ran."),
+)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def write_prometheus(
+    profile: Mapping[str, Mapping[str, float]],
+    path: str | Path,
+    *,
+    labels: Optional[Mapping[str, str]] = None,
+) -> None:
+    """Write a profile section in Prometheus text format, e.g. for node_exporter's textfile collector.
+
+    The file is replaced atomically so scrapers never see a partial write.
+    """
+
+    extra = "".join(f',{key}="{_label(str(value))}"' for key, value in (labels or {}).items())
+    lines = []
+    for metric, help_text in _PROMETHEUS_METRICS:
+        name = f"frequencipher_stage_{metric}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for stage_name, values in profile.items():
+            lines.append(f'{name}{{stage="{_label(stage_name)}"{extra}}} {float(values[metric])!r}')
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    os.replace(tmp_path, path)
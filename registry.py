@@ -0,0 +1,111 @@
+"""Registry of the analysis detectors, their inputs and cost, and named selections."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class DetectorSpec:
+    """Static description of one detector in the pipeline.
+
+    ``inputs`` names the shared representations the detector reads (an
+    ``@rate`` suffix marks a resampled copy), ``cost`` is a coarse relative
+    runtime (``"low"``, ``"medium"`` or ``"high"``), ``depends_on`` lists
+    detectors whose results it consumes, and ``streaming`` tells whether
+    :func:`~frequencipher.analysis.run_streaming_analysis` implements it.
+    ``tier`` places it in the triage cascade: tier 1 detectors always run
+    and produce the cheap first-pass scores, tier 2 detectors run only when
+    those scores escalate the file.
+    """
+
+    name: str
+    description: str
+    inputs: Tuple[str, ...]
+    cost: str
+    depends_on: Tuple[str, ...] = ()
+    streaming: bool = False
+    tier: int = 2
+
+
+DETECTORS: Dict[str, DetectorSpec] = {
+    spec.name: spec
+    for spec in (
+        DetectorSpec(
+            "fingerprint", "Landmark hashes matched against an index of known content", ("stft@8000",), "low", tier=1
+        ),
+        DetectorSpec("spectral", "Spectral feature matrices and summaries", ("stft", "mel"), "high"),
+        DetectorSpec("phase", "Phase coherence and entropy", ("stft",), "medium"),
+        DetectorSpec(
+            "backmask", "Reversed-audio symmetry and segment scan", ("samples",), "medium", streaming=True, tier=1
+        ),
+        DetectorSpec(
+            "subliminal", "Infra/ultrasound energy and AM/FM", ("samples@native",), "medium", streaming=True, tier=1
+        ),
+        DetectorSpec("steganography", "LSB and bit-plane statistics", ("pcm",), "low", streaming=True, tier=1),
+        DetectorSpec("temporal", "Windowed tempo, zero-crossing drift and splices", ("onset@22050",), "medium"),
+        DetectorSpec("watermark", "Spectral flatness and tonal centroid track", ("stft@22050",), "medium"),
+        DetectorSpec(
+            "enf", "Mains hum (ENF) trace and edit discontinuities", ("samples@1000",), "low", tier=1
+        ),
+        DetectorSpec(
+            "channels",
+            "Per-channel statistics, inter-channel phase and side-channel energy",
+            ("stft@channels",),
+            "medium",
+            tier=1,
+        ),
+        DetectorSpec("anomaly", "Anomaly score of the spectral summaries", ("spectral",), "low", ("spectral",)),
+    )
+}
+
+PROFILES: Dict[str, Tuple[str, ...]] = {
+    "full": tuple(DETECTORS),
+    "triage": ("backmask", "subliminal", "steganography", "temporal"),
+    "stego-only": ("steganography",),
+}
+
+
+def _check_names(names: Iterable[str]) -> List[str]:
+    names = list(names)
+    unknown = [name for name in names if name not in DETECTORS]
+    if unknown:
+        raise ValueError(f"Unknown detector(s): {', '.join(unknown)}. Available: {', '.join(DETECTORS)}")
+    return names
+
+
+def requested_detectors(
+    *,
+    profile: Optional[str] = None,
+    only: Optional[Iterable[str]] = None,
+    skip: Optional[Iterable[str]] = None,
+) -> Set[str]:
+    """Detectors named by a profile and ``only``/``skip``, before dependencies are added."""
+
+    if profile is not None and profile not in PROFILES:
+        raise ValueError(f"Unknown profile '{profile}'. Available: {', '.join(PROFILES)}")
+    selected = set(_check_names(only) if only is not None else PROFILES[profile or "full"])
+    return selected - set(_check_names(skip or ()))
+
+
+def select_detectors(
+    *,
+    profile: Optional[str] = None,
+    only: Optional[Iterable[str]] = None,
+    skip: Optional[Iterable[str]] = None,
+) -> List[str]:
+    """Resolve a profile and ``only``/``skip`` lists into detector names in pipeline order.
+
+    ``only`` replaces the profile's selection (default ``"full"``) and
+    ``skip`` removes names from it. Dependencies of the remaining detectors
+    are added back, since their results are needed.
+    """
+
+    selected = requested_detectors(profile=profile, only=only, skip=skip)
+    pending = list(selected)
+    while pending:
+        for dependency in DETECTORS[pending.pop()].depends_on:
+            if dependency not in selected:
+                selected.add(dependency)
+                pending.append(dependency)
+    return [name for name in DETECTORS if name in selected]
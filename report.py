@@ -1,9 +1,10 @@
 """Automated forensic report generation."""
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict
 
-from fpdf import FPDF
+if TYPE_CHECKING:
+    from fpdf import FPDF
 
 
 def _render_value(pdf: FPDF, key: str, value: Any, indent: int = 0) -> None:
@@ -25,6 +26,8 @@ def _render_value(pdf: FPDF, key: str, value: Any, indent: int = 0) -> None:
 def generate_report(results: Dict[str, Dict[str, Any]], output_path: str) -> None:
     """Generate a structured PDF report from analysis results."""
 
+    from fpdf import FPDF
+
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.add_page()
@@ -0,0 +1,139 @@
+"""Block-wise polyphase resampling with cached filter designs."""
+from __future__ import annotations
+
+import functools
+from math import gcd
+from typing import Tuple
+
+import numpy as np
+
+DEFAULT_BLOCK_SIZE = 1 << 18
+
+
+def rational_factors(source_rate: int, target_rate: int) -> Tuple[int, int]:
+    """Return the reduced ``(up, down)`` factors converting ``source_rate`` to ``target_rate``."""
+
+    divisor = gcd(int(source_rate), int(target_rate))
+    return int(target_rate) // divisor, int(source_rate) // divisor
+
+
+@functools.lru_cache(maxsize=32)
+def polyphase_filter(up: int, down: int) -> Tuple[np.ndarray, int]:
+    """Anti-aliasing filter for ``up/down`` split into time-reversed phases.
+
+    The prototype is the Kaiser-windowed FIR :func:`scipy.signal.resample_poly`
+    designs by default, so results match it. Returns the ``(up, taps)`` phase
+    matrix and the prototype's half length. Designs are cached, so repeated
+    conversions between the same rates skip ``firwin`` entirely.
+    """
+
+    from scipy.signal import firwin
+
+    max_rate = max(up, down)
+    half_length = 10 * max_rate
+    prototype = firwin(2 * half_length + 1, 1.0 / max_rate, window=("kaiser", 5.0)) * up
+    taps = -(-prototype.size // up)
+    padded = np.zeros(taps * up)
+    padded[: prototype.size] = prototype
+    phases = padded.reshape(taps, up).T[:, ::-1].copy()
+    phases.setflags(write=False)
+    return phases, half_length
+
+
+class PolyphaseResampler:
+    """Stateful resampler fed one block at a time along the last axis.
+
+    Output sample ``m`` is the dot product of the input samples around
+    ``m * down / up`` with one phase of the cached filter. Only the input
+    history the filter still needs is kept between blocks, so memory is
+    bounded by the block size and concatenating the outputs of
+    :meth:`process` and :meth:`flush` equals a one-shot ``resample_poly``.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int) -> None:
+        self.source_rate = int(source_rate)
+        self.target_rate = int(target_rate)
+        self.up, self.down = rational_factors(source_rate, target_rate)
+        self._phases, self._half_length = polyphase_filter(self.up, self.down)
+        self._taps = self._phases.shape[1]
+        self._history: np.ndarray | None = None
+        self._base = 0  # input index of the first sample in the history
+        self._consumed = 0
+        self._produced = 0
+
+    def _available(self, last_input: int) -> int:
+        """Number of outputs whose newest input sample is at most ``last_input``."""
+
+        return max(0, -(-((last_input + 1) * self.up - self._half_length) // self.down))
+
+    def _emit(self, count: int) -> np.ndarray:
+        history = self._history
+        assert history is not None
+        phases = self._phases.astype(history.dtype, copy=False)
+        windows = np.lib.stride_tricks.sliding_window_view(history, self._taps, axis=-1)
+        total = count - self._produced
+        output = np.empty(history.shape[:-1] + (total,), dtype=history.dtype)
+        # Outputs ``up`` apart share a filter phase and have inputs ``down``
+        # apart, so each phase is one strided matrix-vector product.
+        for offset in range(min(self.up, total)):
+            newest, phase = divmod((self._produced + offset) * self.down + self._half_length, self.up)
+            first = newest - self._taps + 1 - self._base
+            outputs = len(range(offset, total, self.up))
+            rows = windows[..., first : first + (outputs - 1) * self.down + 1 : self.down, :]
+            output[..., offset :: self.up] = rows @ phases[phase]
+        self._produced = count
+        oldest_needed = (count * self.down + self._half_length) // self.up - self._taps + 1
+        drop = max(0, oldest_needed - self._base)
+        self._history = history[..., drop:]
+        self._base += drop
+        return output
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Feed the next input block and return every output it completes."""
+
+        block = np.asarray(block)
+        if not np.issubdtype(block.dtype, np.floating):
+            block = block.astype(np.float64)
+        if self._history is None:
+            # Samples before the start of the signal are zeros.
+            lead = np.zeros(block.shape[:-1] + (self._taps - 1,), dtype=block.dtype)
+            self._history = lead
+            self._base = -(self._taps - 1)
+        self._history = np.concatenate([self._history, block], axis=-1)
+        self._consumed += block.shape[-1]
+        return self._emit(self._available(self._consumed - 1))
+
+    def flush(self) -> np.ndarray:
+        """Return the remaining outputs, treating samples past the end as zeros."""
+
+        if self._history is None:
+            return np.zeros(0)
+        total = -(-self._consumed * self.up // self.down)
+        tail = np.zeros(self._history.shape[:-1] + (self._taps,), dtype=self._history.dtype)
+        self._history = np.concatenate([self._history, tail], axis=-1)
+        return self._emit(total)
+
+
+def resample(
+    samples: np.ndarray,
+    source_rate: int,
+    target_rate: int,
+    *,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> np.ndarray:
+    """Resample along the last axis in blocks, keeping temporaries block-sized."""
+
+    if int(source_rate) == int(target_rate):
+        return samples
+    resampler = PolyphaseResampler(source_rate, target_rate)
+    dtype = samples.dtype if np.issubdtype(samples.dtype, np.floating) else np.float64
+    total = -(-samples.shape[-1] * resampler.up // resampler.down)
+    output = np.empty(samples.shape[:-1] + (total,), dtype=dtype)
+    filled = 0
+    for start in range(0, samples.shape[-1], block_size):
+        chunk = resampler.process(samples[..., start : start + block_size])
+        output[..., filled : filled + chunk.shape[-1]] = chunk
+        filled += chunk.shape[-1]
+    chunk = resampler.flush()
+    output[..., filled : filled + chunk.shape[-1]] = chunk
+    return output
@@ -0,0 +1,99 @@
+"""Dependency-aware, thread-pooled execution of independent analysis tasks."""
+from __future__ import annotations
+
+import contextvars
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class Task:
+    """A named unit of work; ``func`` receives the results of ``depends_on`` by name."""
+
+    name: str
+    func: Callable[[Mapping[str, Any]], Any]
+    depends_on: Tuple[str, ...] = ()
+
+
+def _describe(exc: BaseException) -> str:
+    return f"{type(exc).__name__}: {exc}"
+
+
+def run_tasks(tasks: Sequence[Task], *, workers: int = 1) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Run ``tasks`` as soon as their dependencies finish, on up to ``workers`` threads.
+
+    Detectors spend most of their time in NumPy, SciPy and FFT code that
+    releases the GIL, so threads give real parallelism while sharing one
+    :class:`~frequencipher.context.AnalysisContext`. Returns ``(results,
+    errors)``, both keyed in the order of ``tasks`` whatever order they
+    complete in. A failing task is logged and recorded in ``errors``; tasks
+    depending on it are not run and are recorded as failed too, while every
+    other task still runs.
+    """
+
+    names = [task.name for task in tasks]
+    unknown = {dep for task in tasks for dep in task.depends_on} - set(names)
+    if unknown:
+        raise ValueError(f"Unknown task dependencies: {', '.join(sorted(unknown))}")
+
+    results: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+
+    def finish(task: Task, outcome: Callable[[], Any]) -> None:
+        try:
+            results[task.name] = outcome()
+        except Exception as exc:  # isolated per task; the others keep their results
+            logger.exception("Task '%s' failed", task.name)
+            errors[task.name] = _describe(exc)
+
+    def ready(task: Task) -> bool:
+        return all(dep in results or dep in errors for dep in task.depends_on)
+
+    def take_ready(pending: List[Task]) -> List[Task]:
+        """Remove and return runnable tasks, failing those whose dependencies failed."""
+
+        runnable = []
+        for task in [task for task in pending if ready(task)]:
+            pending.remove(task)
+            failed = [dep for dep in task.depends_on if dep in errors]
+            if failed:
+                errors[task.name] = f"dependency {failed[0]!r} failed"
+            else:
+                runnable.append(task)
+        return runnable
+
+    def inputs(task: Task) -> Dict[str, Any]:
+        return {dep: results[dep] for dep in task.depends_on}
+
+    pending = list(tasks)
+    if workers <= 1:
+        while pending:
+            runnable = take_ready(pending)
+            if not runnable and pending:
+                raise ValueError("Task dependencies form a cycle")
+            for task in runnable:
+                finish(task, lambda task=task: task.func(inputs(task)))
+        return _ordered(names, results), _ordered(names, errors)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="detector") as executor:
+        running: Dict[Future, Task] = {}
+        while pending or running:
+            for task in take_ready(pending):
+                # Run in a copy of the caller's context so context variables (e.g. the active profiler) carry over.
+                running[executor.submit(contextvars.copy_context().run, task.func, inputs(task))] = task
+            if not running:
+                if pending:
+                    raise ValueError("Task dependencies form a cycle")
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                finish(running.pop(future), future.result)
+    return _ordered(names, results), _ordered(names, errors)
+
+
+def _ordered(names: Sequence[str], values: Mapping[str, Any]) -> Dict[str, Any]:
+    return {name: values[name] for name in names if name in values}
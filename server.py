@@ -0,0 +1,367 @@
+"""Long-running local analysis service with a bounded job queue and an HTTP/JSON API.
+
+The service keeps the scientific stack imported, librosa's JIT-compiled
+kernels warm and any baseline model and fingerprint index loaded, and runs
+jobs on a fixed pool of threads. Endpoints:
+
+* ``POST /jobs`` with ``{"path": ..., "options": {...}}`` queues a job and
+  answers ``202`` with its id, or ``503`` when the queue is full.
+* ``POST /analyse`` queues a job and answers with its results when done.
+* ``GET /jobs/<id>`` returns the job status (and results once done).
+* ``GET /jobs/<id>/events`` streams status changes as newline-delimited
+  JSON, ending with the final status and results.
+* ``GET /health`` reports pool and queue occupancy.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .analysis import AnalysisResult, run_full_analysis, run_streaming_analysis
+from .anomaly import BaselineModel, load_baseline
+from .cache import ResultCache
+from .exceptions import FrequenCipherError, ServiceBusyError
+from .fingerprint import FingerprintIndex, open_index
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_MAX_FINISHED = 1024
+JOB_OPTIONS = frozenset(
+    {"target_sr", "mono", "profile", "only", "skip", "stream", "block_size", "cascade", "triage_thresholds"}
+)
+# Options only one of the two analysis modes accepts.
+_STREAM_OPTIONS = frozenset({"block_size"})
+_IN_MEMORY_OPTIONS = frozenset({"target_sr"})
+_MAX_BODY_BYTES = 1 << 20
+_REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+}
+
+
+@dataclass(slots=True)
+class Job:
+    """One analysis request and its progress."""
+
+    id: str
+    path: str
+    options: Dict[str, Any]
+    status: str = "queued"
+    results: Optional[AnalysisResult] = None
+    error: Optional[str] = None
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def update(self, status: str) -> None:
+        self.status = status
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def to_dict(self, *, include_results: bool = True) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"id": self.id, "path": self.path, "status": self.status}
+        for key in ("submitted", "started", "finished", "error"):
+            if getattr(self, key) is not None:
+                payload[key] = getattr(self, key)
+        if include_results and self.results is not None:
+            payload["results"] = self.results
+        return payload
+
+
+class AnalysisService:
+    """Queue and run analysis jobs on ``workers`` threads of one warm process.
+
+    At most ``queue_size`` jobs wait for a worker; further submissions raise
+    :class:`~frequencipher.exceptions.ServiceBusyError` so clients back off
+    instead of piling work up. Each job's detectors share
+    ``detector_workers`` threads (default: the CPUs divided among the
+    workers), so concurrent jobs do not oversubscribe the machine. The last
+    ``max_finished`` finished jobs are kept for status queries.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int = 1,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        cache: Optional[ResultCache] = None,
+        baseline: BaselineModel | str | Path | None = None,
+        index: FingerprintIndex | str | Path | None = None,
+        detector_workers: Optional[int] = None,
+        max_finished: int = DEFAULT_MAX_FINISHED,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.cache = cache
+        self.baseline = load_baseline(baseline) if isinstance(baseline, (str, Path)) else baseline
+        self.index = open_index(index) if index is not None else None
+        self.detector_workers = detector_workers or max(1, (os.cpu_count() or 1) // self.workers)
+        self.max_finished = max_finished
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue[Job]] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self, *, warm_up: bool = True) -> None:
+        """Start the worker pool, after running one analysis to warm the libraries up."""
+
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="analysis")
+        if warm_up:
+            started = time.perf_counter()
+            await asyncio.get_running_loop().run_in_executor(self._executor, _warm_up)
+            logger.info("Warmed up in %.2f s", time.perf_counter() - started)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def submit(self, path: str, options: Optional[Dict[str, Any]] = None) -> Job:
+        """Queue a job; raises :class:`ValueError` for bad options and ``ServiceBusyError`` when full."""
+
+        if self._queue is None:
+            raise RuntimeError("The service has not been started")
+        options = dict(options or {})
+        unknown = set(options) - JOB_OPTIONS
+        if unknown:
+            raise ValueError(f"Unknown option(s): {', '.join(sorted(unknown))}")
+        stream = bool(options.get("stream", False))
+        misplaced = set(options) & (_IN_MEMORY_OPTIONS if stream else _STREAM_OPTIONS)
+        if misplaced:
+            requirement = "cannot be used with" if stream else "require"
+            raise ValueError(f"Option(s) {', '.join(sorted(misplaced))} {requirement} stream")
+        job = Job(uuid.uuid4().hex, str(path), options)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise ServiceBusyError(f"Job queue is full ({self.queue_size} waiting)") from None
+        self.jobs[job.id] = job
+        self._forget_finished()
+        return job
+
+    def _forget_finished(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[: max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job_id]
+
+    def stats(self) -> Dict[str, int]:
+        queued = self._queue.qsize() if self._queue is not None else 0
+        running = sum(job.status == "running" for job in self.jobs.values())
+        return {"workers": self.workers, "queue_size": self.queue_size, "queued": queued, "running": running}
+
+    async def _work(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            job.started = time.time()
+            job.update("running")
+            try:
+                job.results = await loop.run_in_executor(self._executor, self._analyse, job)
+            except Exception as exc:  # reported to the client; the worker keeps serving
+                logger.exception("Job %s failed", job.id)
+                job.error = f"{type(exc).__name__}: {exc}"
+            job.finished = time.time()
+            job.update("failed" if job.error is not None else "done")
+            self._queue.task_done()
+
+    def _analyse(self, job: Job) -> AnalysisResult:
+        options = dict(job.options)
+        if options.pop("stream", False):
+            # Streaming runs only first-tier detectors, so there is nothing to gate.
+            options.pop("cascade", None)
+            options.pop("triage_thresholds", None)
+            _, results = run_streaming_analysis(job.path, cache=self.cache, **options)
+        else:
+            _, results = run_full_analysis(
+                job.path,
+                cache=self.cache,
+                baseline=self.baseline,
+                index=self.index,
+                detector_workers=self.detector_workers,
+                **options,
+            )
+        return results
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one HTTP request on ``reader``/``writer`` and close the connection."""
+
+        try:
+            method, target, body = await _read_request(reader)
+            await self._route(method, target, body, writer)
+        except _HttpError as exc:
+            _write_response(writer, exc.status, {"error": str(exc)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            return
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, target: str, body: bytes, writer: asyncio.StreamWriter) -> None:
+        parts = [part for part in target.split("?", 1)[0].split("/") if part]
+        if parts == ["health"]:
+            _write_response(writer, 200, {"status": "ok", **self.stats()})
+        elif parts in (["jobs"], ["analyse"]):
+            if method != "POST":
+                raise _HttpError(405, f"{method} not allowed")
+            job = self._submit_request(body)
+            if parts == ["jobs"]:
+                _write_response(writer, 202, job.to_dict(), headers={"Location": f"/jobs/{job.id}"})
+                return
+            while not job.done:
+                await job.changed.wait()
+            _write_response(writer, 200, job.to_dict())
+        elif len(parts) in (2, 3) and parts[0] == "jobs" and parts[2:] in ([], ["events"]):
+            job = self.jobs.get(parts[1])
+            if job is None:
+                raise _HttpError(404, f"No job '{parts[1]}'")
+            if len(parts) == 2:
+                _write_response(writer, 200, job.to_dict())
+            else:
+                await _stream_events(job, writer)
+        else:
+            raise _HttpError(404, f"No route for {target}")
+
+    def _submit_request(self, body: bytes) -> Job:
+        try:
+            request = json.loads(body or b"{}")
+            path = request["path"]
+        except (ValueError, KeyError, TypeError):
+            raise _HttpError(400, 'Expected a JSON body with a "path"') from None
+        try:
+            return self.submit(path, request.get("options"))
+        except ServiceBusyError as exc:
+            raise _HttpError(503, str(exc)) from None
+        except (ValueError, TypeError) as exc:
+            raise _HttpError(400, str(exc)) from None
+
+
+class _HttpError(FrequenCipherError):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+    request_line = (await reader.readline()).decode("latin-1").split()
+    if len(request_line) != 3:
+        raise _HttpError(400, "Malformed request line")
+    headers: Dict[str, str] = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", "0") or 0)
+    except ValueError:
+        raise _HttpError(400, "Invalid Content-Length") from None
+    if length < 0:
+        raise _HttpError(400, "Invalid Content-Length")
+    if length > _MAX_BODY_BYTES:
+        raise _HttpError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return request_line[0].upper(), request_line[1], body
+
+
+def _write_response(
+    writer: asyncio.StreamWriter,
+    status: int,
+    payload: Any,
+    *,
+    headers: Optional[Dict[str, str]] = None,
+) -> None:
+    body = json.dumps(payload).encode("utf-8")
+    extra = {"Retry-After": "1"} if status == 503 else {}
+    lines = [
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+        "Content-Type: application/json",
+        f"Content-Length: {len(body)}",
+        "Connection: close",
+        *(f"{name}: {value}" for name, value in {**extra, **(headers or {})}.items()),
+    ]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+
+
+async def _stream_events(job: Job, writer: asyncio.StreamWriter) -> None:
+    """Send the job's status on every change as chunked NDJSON until it finishes."""
+
+    writer.write(
+        b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+        b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n"
+    )
+    while True:
+        changed = job.changed
+        line = json.dumps(job.to_dict(include_results=job.done)).encode("utf-8") + b"\n"
+        writer.write(f"{len(line):x}\r\n".encode("latin-1") + line + b"\r\n")
+        await writer.drain()
+        if job.done:
+            break
+        await changed.wait()
+    writer.write(b"0\r\n\r\n")
+
+
+def _warm_up() -> None:
+    """Analyse a short synthetic clip so imports and librosa's JIT compilation happen before the first job."""
+
+    import numpy as np
+    import soundfile as sf
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "warm-up.wav"
+        t = np.arange(22050) / 22050
+        noise = 0.01 * np.random.default_rng(0).standard_normal(t.size)
+        sf.write(path, 0.3 * np.sin(2 * np.pi * 440 * t) + noise, 22050)
+        run_full_analysis(str(path), target_sr=22050, detector_workers=1)
+
+
+async def serve(
+    service: AnalysisService,
+    *,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    unix_socket: Optional[str] = None,
+) -> None:
+    """Start ``service`` and answer requests on ``host:port`` (or ``unix_socket``) until cancelled."""
+
+    await service.start()
+    if unix_socket is not None:
+        server = await asyncio.start_unix_server(service.handle, path=unix_socket)
+        logger.info("Serving on %s", unix_socket)
+    else:
+        server = await asyncio.start_server(service.handle, host=host, port=port)
+        logger.info("Serving on http://%s:%d", host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
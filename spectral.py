@@ -1,16 +1,22 @@
 """Spectral and frequency-domain analysis utilities."""
 from __future__ import annotations
 
-from typing import Dict
+from typing import Callable, Dict, Optional, Sequence
 
 import librosa
 import numpy as np
 
+from .context import AnalysisContext, ensure_context
+from .profiling import stage
 from .statistics import summarise_array
 
+ALGORITHM_VERSION = 1
 
-def _compute_summary(matrix: np.ndarray) -> Dict[str, float]:
-    return summarise_array(matrix.flatten()).to_dict()
+SPECTRAL_FEATURES = ("stft", "mel", "mfcc", "chroma", "centroid", "bandwidth", "contrast", "rolloff")
+
+
+def _compute_summary(matrix: np.ndarray, exact: bool = True) -> Dict[str, float]:
+    return summarise_array(matrix, exact=exact).to_dict()
 
 
 def compute_spectral_features(
@@ -21,79 +27,78 @@ def compute_spectral_features(
     hop_length: int = 512,
     mel_bands: int = 128,
     include_wavelet: bool = False,
+    exact_summaries: bool = True,
+    features: Optional[Sequence[str]] = None,
+    context: Optional[AnalysisContext] = None,
 ) -> Dict[str, Dict[str, Dict[str, float] | np.ndarray]]:
-    """Compute a suite of spectral representations and their summaries."""
+    """Compute a suite of spectral representations and their summaries.
+
+    When ``context`` is given, the STFT, power and mel spectrograms are taken
+    from (and stored in) it so other detectors can reuse them. Set
+    ``exact_summaries=False`` to summarise with bounded-memory approximate
+    quantiles, which is cheaper on very long recordings. ``features`` limits
+    the computation to the named entries of :data:`SPECTRAL_FEATURES` (plus
+    ``"wavelet_coefficients"``); by default all of them are built.
+    """
 
     if samples.size == 0:
         raise ValueError("Input samples must be non-empty")
 
-    effective_fft = min(n_fft, samples.size)
-    if effective_fft < 2:
-        effective_fft = 2
-    effective_hop = min(hop_length, max(1, effective_fft // 4))
-
-    stft = np.abs(librosa.stft(samples, n_fft=effective_fft, hop_length=effective_hop))
-    mel = librosa.feature.melspectrogram(
-        y=samples,
-        sr=sample_rate,
-        n_fft=effective_fft,
-        hop_length=effective_hop,
-        n_mels=mel_bands,
-    )
-    mfcc = librosa.feature.mfcc(S=librosa.power_to_db(mel, ref=np.max), sr=sample_rate)
-    chroma = librosa.feature.chroma_stft(
-        y=samples,
-        sr=sample_rate,
-        n_fft=effective_fft,
-        hop_length=effective_hop,
-    )
-    centroid = librosa.feature.spectral_centroid(
-        y=samples,
-        sr=sample_rate,
-        n_fft=effective_fft,
-        hop_length=effective_hop,
-    )
-    bandwidth = librosa.feature.spectral_bandwidth(
-        y=samples,
-        sr=sample_rate,
-        n_fft=effective_fft,
-        hop_length=effective_hop,
-    )
-    contrast = librosa.feature.spectral_contrast(
-        y=samples,
-        sr=sample_rate,
-        n_fft=effective_fft,
-        hop_length=effective_hop,
-    )
-    rolloff = librosa.feature.spectral_rolloff(
-        y=samples,
-        sr=sample_rate,
-        n_fft=effective_fft,
-        hop_length=effective_hop,
-    )
-
-    matrices: Dict[str, np.ndarray] = {
-        "stft": stft,
-        "mel": mel,
-        "mfcc": mfcc,
-        "chroma": chroma,
-        "centroid": centroid,
-        "bandwidth": bandwidth,
-        "contrast": contrast,
-        "rolloff": rolloff,
+    context = ensure_context(samples, sample_rate, context)
+    samples = context.mono
+    effective_fft, effective_hop = context.fft_params(n_fft, hop_length)
+
+    def shape_feature(feature: Callable[..., np.ndarray]) -> Callable[[], np.ndarray]:
+        return lambda: feature(
+            S=context.magnitude(effective_fft, effective_hop),
+            sr=sample_rate,
+            n_fft=effective_fft,
+            hop_length=effective_hop,
+        )
+
+    factories: Dict[str, Callable[[], np.ndarray]] = {
+        "stft": lambda: context.magnitude(effective_fft, effective_hop),
+        "mel": lambda: context.mel(effective_fft, effective_hop, mel_bands),
+        "mfcc": lambda: librosa.feature.mfcc(
+            S=librosa.power_to_db(context.mel(effective_fft, effective_hop, mel_bands), ref=np.max),
+            sr=sample_rate,
+        ),
+        "chroma": lambda: librosa.feature.chroma_stft(
+            S=context.power(effective_fft, effective_hop),
+            sr=sample_rate,
+            n_fft=effective_fft,
+            hop_length=effective_hop,
+        ),
+        "centroid": shape_feature(librosa.feature.spectral_centroid),
+        "bandwidth": shape_feature(librosa.feature.spectral_bandwidth),
+        "contrast": shape_feature(librosa.feature.spectral_contrast),
+        "rolloff": shape_feature(librosa.feature.spectral_rolloff),
     }
+    requested = SPECTRAL_FEATURES if features is None else features
+    unknown = [name for name in requested if name not in factories and name != "wavelet_coefficients"]
+    if unknown:
+        raise ValueError(f"Unknown spectral feature(s): {', '.join(unknown)}")
+    matrices: Dict[str, np.ndarray] = {}
+    summaries: Dict[str, Dict[str, float]] = {}
+    for name in requested:
+        if name in factories:
+            with stage(f"spectral.{name}"):
+                matrices[name] = factories[name]()
+                summaries[name] = _compute_summary(matrices[name], exact_summaries)
 
-    if include_wavelet:
+    if include_wavelet or (features is not None and "wavelet_coefficients" in features):
         try:
             import pywt  # type: ignore
 
-            coeffs = pywt.wavedec(samples, "db4", level=4)
-            matrices["wavelet_coefficients"] = np.concatenate([c.flatten() for c in coeffs])
+            with stage("spectral.wavelet_coefficients"):
+                coeffs = pywt.wavedec(samples, "db4", level=4)
+                matrices["wavelet_coefficients"] = np.concatenate([c.flatten() for c in coeffs])
+                summaries["wavelet_coefficients"] = _compute_summary(
+                    matrices["wavelet_coefficients"], exact_summaries
+                )
         except Exception:  # pragma: no cover - optional dependency
             pass
 
-    summaries = {name: _compute_summary(matrix) for name, matrix in matrices.items()}
-
     return {
         "matrices": matrices,
         "summaries": summaries,
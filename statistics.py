@@ -1,12 +1,16 @@
 """Utility helpers for computing descriptive statistics."""
 from __future__ import annotations
 
-from typing import Iterable
+import math
+from typing import Iterable, List, Optional
 
 import numpy as np
 
 from .models import SummaryStatistics
 
+_CHUNK_SIZE = 1 << 20
+_QUARTILES = (0.25, 0.5, 0.75)
+
 
 def _empty_statistics() -> SummaryStatistics:
     nan = float("nan")
@@ -21,23 +25,215 @@ def _empty_statistics() -> SummaryStatistics:
     )
 
 
-def summarise_array(values: np.ndarray | Iterable[float]) -> SummaryStatistics:
-    """Compute robust summary statistics for an array-like object."""
+class _Buckets:
+    """Dense, offset-indexed bucket counts for one sign of a quantile sketch."""
 
-    array = np.asarray(list(values) if not isinstance(values, np.ndarray) else values, dtype=float)
-    if array.size == 0:
-        return _empty_statistics()
+    def __init__(self, max_buckets: int) -> None:
+        self.max_buckets = max_buckets
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
 
-    finite = array[np.isfinite(array)]
-    if finite.size == 0:
-        return _empty_statistics()
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
 
-    return SummaryStatistics(
-        mean=float(np.mean(finite)),
-        std=float(np.std(finite)),
-        median=float(np.median(finite)),
-        min=float(np.min(finite)),
-        max=float(np.max(finite)),
-        percentile_25=float(np.percentile(finite, 25)),
-        percentile_75=float(np.percentile(finite, 75)),
-    )
+    def _extend(self, low: int, high: int) -> None:
+        if self.counts.size == 0:
+            self.offset = low
+            self.counts = np.zeros(high - low + 1, dtype=np.int64)
+            return
+        new_low = min(low, self.offset)
+        new_high = max(high, self.offset + self.counts.size - 1)
+        if new_low == self.offset and new_high == self.offset + self.counts.size - 1:
+            return
+        grown = np.zeros(new_high - new_low + 1, dtype=np.int64)
+        start = self.offset - new_low
+        grown[start : start + self.counts.size] = self.counts
+        self.offset = new_low
+        self.counts = grown
+
+    def _collapse(self) -> None:
+        # Fold the lowest-magnitude buckets together; accuracy is kept where
+        # the bulk of the magnitude lies.
+        excess = self.counts.size - self.max_buckets
+        if excess > 0:
+            folded = int(self.counts[: excess + 1].sum())
+            self.counts = self.counts[excess:].copy()
+            self.counts[0] = folded
+            self.offset += excess
+
+    def add(self, indices: np.ndarray) -> None:
+        if indices.size == 0:
+            return
+        self._extend(int(indices.min()), int(indices.max()))
+        self.counts += np.bincount(indices - self.offset, minlength=self.counts.size)
+        self._collapse()
+
+    def merge(self, other: "_Buckets") -> None:
+        if other.counts.size == 0:
+            return
+        self._extend(other.offset, other.offset + other.counts.size - 1)
+        start = other.offset - self.offset
+        self.counts[start : start + other.counts.size] += other.counts
+        self._collapse()
+
+
+class _QuantileSketch:
+    """Mergeable log-bucket sketch with bounded relative quantile error."""
+
+    def __init__(self, relative_accuracy: float, max_buckets: int) -> None:
+        self.gamma = (1.0 + relative_accuracy) / (1.0 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self._positive = _Buckets(max_buckets)
+        self._negative = _Buckets(max_buckets)
+        self._zeros = 0
+
+    def _indices(self, magnitudes: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+
+    def update(self, values: np.ndarray) -> None:
+        tiny = np.finfo(values.dtype).tiny
+        positive = values[values > tiny]
+        negative = values[values < -tiny]
+        self._zeros += values.size - positive.size - negative.size
+        self._positive.add(self._indices(positive))
+        self._negative.add(self._indices(-negative))
+
+    def merge(self, other: "_QuantileSketch") -> None:
+        self._positive.merge(other._positive)
+        self._negative.merge(other._negative)
+        self._zeros += other._zeros
+
+    def _value(self, index: int) -> float:
+        return 2.0 * self.gamma**index / (self.gamma + 1.0)
+
+    def quantiles(self, qs: Iterable[float], low: float, high: float) -> List[float]:
+        negative_counts = self._negative.counts[::-1]
+        counts = np.concatenate([negative_counts, [self._zeros], self._positive.counts])
+        cumulative = np.cumsum(counts)
+        total = int(cumulative[-1])
+        results = []
+        for q in qs:
+            position = int(np.searchsorted(cumulative, q * (total - 1), side="right"))
+            if position < negative_counts.size:
+                index = self._negative.offset + self._negative.counts.size - 1 - position
+                value = -self._value(index)
+            elif position == negative_counts.size:
+                value = 0.0
+            else:
+                value = self._value(self._positive.offset + position - negative_counts.size - 1)
+            results.append(min(max(value, low), high))
+        return results
+
+
+class SummaryAccumulator:
+    """Single-pass, mergeable builder for :class:`SummaryStatistics`.
+
+    Values are consumed in fixed-size chunks in their own floating dtype (no
+    float64 copy of the input); moments are combined with Chan's parallel
+    update, so partial accumulators from chunks, streams or workers can be
+    combined with :meth:`merge`. In exact mode the finite values are retained
+    and the three quartiles come from a single partition; with
+    ``exact=False`` a log-bucket sketch keeps memory bounded and quantiles
+    within ``relative_accuracy`` of the true value.
+    """
+
+    def __init__(
+        self,
+        *,
+        exact: bool = True,
+        relative_accuracy: float = 0.01,
+        max_buckets: int = 2048,
+    ) -> None:
+        self.exact = exact
+        self.count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+        self._parts: List[np.ndarray] = []
+        self._sketch: Optional[_QuantileSketch] = (
+            None if exact else _QuantileSketch(relative_accuracy, max_buckets)
+        )
+
+    def _combine_moments(self, count: int, mean: float, m2: float) -> None:
+        total = self.count + count
+        delta = mean - self._mean
+        self._mean += delta * count / total
+        self._m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def update(self, values: np.ndarray | Iterable[float]) -> "SummaryAccumulator":
+        """Add ``values`` (any shape) to the summary and return ``self``."""
+
+        array = np.asarray(list(values) if not isinstance(values, np.ndarray) else values)
+        if not np.issubdtype(array.dtype, np.floating):
+            array = array.astype(np.float64)
+        array = array.reshape(-1)
+        for start in range(0, array.size, _CHUNK_SIZE):
+            chunk = array[start : start + _CHUNK_SIZE]
+            finite = np.isfinite(chunk)
+            if not finite.all():
+                chunk = chunk[finite]
+            if chunk.size == 0:
+                continue
+            mean = float(np.mean(chunk, dtype=np.float64))
+            centred = chunk - chunk.dtype.type(mean)
+            m2 = float(np.sum(np.square(centred), dtype=np.float64))
+            self._combine_moments(chunk.size, mean, m2)
+            self._min = min(self._min, float(chunk.min()))
+            self._max = max(self._max, float(chunk.max()))
+            if self._sketch is not None:
+                self._sketch.update(chunk)
+            else:
+                self._parts.append(chunk)
+        return self
+
+    def merge(self, other: "SummaryAccumulator") -> "SummaryAccumulator":
+        """Fold another accumulator of the same mode into this one and return ``self``."""
+
+        if other.exact != self.exact:
+            raise ValueError("Cannot merge exact and approximate summary accumulators")
+        if other.count == 0:
+            return self
+        self._combine_moments(other.count, other._mean, other._m2)
+        self._min = min(self._min, other._min)
+        self._max = max(self._max, other._max)
+        if self._sketch is not None and other._sketch is not None:
+            self._sketch.merge(other._sketch)
+        else:
+            self._parts.extend(other._parts)
+        return self
+
+    def result(self) -> SummaryStatistics:
+        """Return the statistics of everything seen so far."""
+
+        if self.count == 0:
+            return _empty_statistics()
+        if self._sketch is not None:
+            p25, median, p75 = self._sketch.quantiles(_QUARTILES, self._min, self._max)
+        else:
+            if len(self._parts) == 1:
+                quartiles = np.quantile(self._parts[0], _QUARTILES)
+            else:
+                quartiles = np.quantile(np.concatenate(self._parts), _QUARTILES, overwrite_input=True)
+            p25, median, p75 = (float(v) for v in quartiles)
+        return SummaryStatistics(
+            mean=float(self._mean),
+            std=float(math.sqrt(max(self._m2, 0.0) / self.count)),
+            median=float(median),
+            min=float(self._min),
+            max=float(self._max),
+            percentile_25=float(p25),
+            percentile_75=float(p75),
+        )
+
+
+def summarise_array(values: np.ndarray | Iterable[float], *, exact: bool = True) -> SummaryStatistics:
+    """Compute robust summary statistics for an array-like object.
+
+    Non-finite values are ignored. See :class:`SummaryAccumulator` for the
+    meaning of ``exact``.
+    """
+
+    return SummaryAccumulator(exact=exact).update(values).result()
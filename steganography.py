@@ -1,19 +1,35 @@
 """Steganography pattern recognition."""
 from __future__ import annotations
 
-from typing import Dict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
 
 import numpy as np
-from scipy.stats import chisquare
 
+from .context import AnalysisContext, ensure_context
 from .statistics import summarise_array
+from .streaming import AudioBlock, mono_block
 
+ALGORITHM_VERSION = 2
 
-def detect_steganography(samples: np.ndarray, sample_rate: int) -> Dict[str, float]:
+PCM_BIT_DEPTHS = {"PCM_S8": 8, "PCM_U8": 8, "PCM_16": 16, "PCM_24": 24, "PCM_32": 32}
+# Chi-square critical value for one degree of freedom at p = 0.05.
+_CHI_SQUARE_CRITICAL = 3.841
+_PCM_BLOCK_WINDOWS = 32
+
+
+def detect_steganography(
+    samples: np.ndarray,
+    sample_rate: int,
+    *,
+    context: Optional[AnalysisContext] = None,
+) -> Dict[str, float]:
     """Search for low-complexity steganographic alterations in the waveform."""
 
-    if samples.ndim > 1:
-        samples = np.mean(samples, axis=0)
+    from scipy.stats import chisquare
+
+    context = ensure_context(samples, sample_rate, context)
+    samples = context.mono
 
     scaled = np.clip(samples * 32767, -32768, 32767).astype(np.int16)
     lsb = scaled & 1
@@ -47,3 +63,219 @@ def detect_steganography(samples: np.ndarray, sample_rate: int) -> Dict[str, flo
         "lsb_second_bit_correlation": correlation,
         "lsb_window_std": float(window_var),
     }
+
+
+def pcm_bit_depth(path: Union[str, Path]) -> Optional[int]:
+    """Return the integer PCM bit depth of ``path``, or ``None`` for float or lossy encodings."""
+
+    import soundfile as sf
+
+    return PCM_BIT_DEPTHS.get(sf.info(str(path)).subtype)
+
+
+def _unpack_planes(block: np.ndarray, depth: int) -> np.ndarray:
+    """Unpack ``(frames, channels)`` integers into ``(frames, channels, depth)`` bits, LSB first.
+
+    soundfile left-justifies narrower PCM in its integer container, so the
+    padding bytes below the real LSB are dropped before unpacking.
+    """
+
+    container = block.dtype.itemsize
+    as_bytes = block.astype(block.dtype.newbyteorder("<"), copy=False).view(np.uint8)
+    as_bytes = as_bytes.reshape(block.shape[0], block.shape[1], container)
+    return np.unpackbits(as_bytes[..., container - depth // 8 :], axis=-1, bitorder="little")
+
+
+def detect_pcm_steganography(
+    path: Union[str, Path],
+    *,
+    window_size: int = 2048,
+    block_windows: int = _PCM_BLOCK_WINDOWS,
+) -> Dict[str, Any]:
+    """Bit-plane steganalysis on the file's original integer PCM samples.
+
+    Samples are read straight from ``soundfile`` as int16 (or int32 for 24-
+    and 32-bit files) in blocks of ``block_windows`` windows, so the LSBs are
+    the recorded ones rather than bits of a DC-shifted, normalised or
+    resampled float signal. Every bit plane of every channel is unpacked at
+    once; ``bit_planes`` holds per-channel lists indexed by plane (``0`` is
+    the LSB) of ones ratio, chi-square, transition rate and statistics of
+    the per-window chi-square and transition rate. The top-level ``lsb_*``
+    keys pool the LSB plane over channels and match
+    :func:`detect_steganography`'s keys.
+    """
+
+    import soundfile as sf
+
+    depth = pcm_bit_depth(path)
+    if depth is None:
+        raise ValueError(f"'{path}' is not integer PCM")
+    dtype = "int16" if depth <= 16 else "int32"
+
+    with sf.SoundFile(str(path)) as f:
+        channels = f.channels
+        block_frames = window_size * block_windows
+        ones = np.zeros((channels, depth), dtype=np.int64)
+        transitions = np.zeros((channels, depth), dtype=np.int64)
+        both_ones = 0
+        window_chi = np.zeros((3, channels, depth))  # sum, sum of squares, flagged count
+        window_chi_max = np.zeros((channels, depth))
+        window_transitions = np.zeros((2, channels, depth))
+        window_ratio = np.zeros((2, channels, depth))
+        windows = 0
+        frames = 0
+        previous: Optional[np.ndarray] = None
+        for block in f.blocks(blocksize=block_frames, dtype=dtype, always_2d=True):
+            if block.shape[0] == 0:
+                continue
+            bits = _unpack_planes(block, depth)
+            frames += bits.shape[0]
+            ones += bits.sum(axis=0, dtype=np.int64)
+            transitions += np.count_nonzero(bits[1:] != bits[:-1], axis=0)
+            if previous is not None:
+                transitions += bits[0] != previous
+            previous = bits[-1]
+            if depth > 1:
+                both_ones += int(np.count_nonzero(bits[..., 0] & bits[..., 1]))
+
+            count = bits.shape[0] // window_size
+            if count == 0:
+                continue
+            windowed = bits[: count * window_size].reshape(count, window_size, channels, depth)
+            window_ones = windowed.sum(axis=1, dtype=np.int64)
+            chi = (2.0 * window_ones - window_size) ** 2 / window_size
+            rates = np.count_nonzero(windowed[:, 1:] != windowed[:, :-1], axis=1) / (window_size - 1)
+            ratios = window_ones / window_size
+            window_chi += (chi.sum(axis=0), (chi**2).sum(axis=0), (chi > _CHI_SQUARE_CRITICAL).sum(axis=0))
+            window_chi_max = np.maximum(window_chi_max, chi.max(axis=0))
+            window_transitions += (rates.sum(axis=0), (rates**2).sum(axis=0))
+            window_ratio += (ratios.sum(axis=0), (ratios**2).sum(axis=0))
+            windows += count
+
+    def spread(sums: np.ndarray) -> np.ndarray:
+        mean = sums[0] / max(windows, 1)
+        return np.sqrt(np.maximum(sums[1] / max(windows, 1) - mean**2, 0.0))
+
+    n = max(frames, 1)
+    plane_chi = (2.0 * ones - frames) ** 2 / n
+    plane_transitions = transitions / max(frames - 1, 1)
+    bit_planes: Dict[str, Dict[str, List[float]]] = {}
+    for channel in range(channels):
+        bit_planes[f"channel_{channel}"] = {
+            "ones_ratio": (ones[channel] / n).tolist(),
+            "chi_square": plane_chi[channel].tolist(),
+            "transition_rate": plane_transitions[channel].tolist(),
+            "window_chi_square_mean": (window_chi[0, channel] / max(windows, 1)).tolist(),
+            "window_chi_square_max": window_chi_max[channel].tolist(),
+            "window_flagged_ratio": (window_chi[2, channel] / max(windows, 1)).tolist(),
+            "window_transition_std": spread(window_transitions)[channel].tolist(),
+        }
+
+    total = frames * channels
+    lsb_ones = float(ones[:, 0].sum())
+    lsb_chi = (2.0 * lsb_ones - total) ** 2 / total if total else 0.0
+    lsb_transitions = float(transitions[:, 0].sum()) / max(channels * (frames - 1), 1)
+    correlation = 0.0
+    if total > 1 and depth > 1:
+        second = float(ones[:, 1].sum())
+        covariance = total * both_ones - lsb_ones * second
+        denominator = np.sqrt((total * lsb_ones - lsb_ones**2) * (total * second - second**2))
+        if denominator > 0:
+            correlation = float(covariance / denominator)
+    pooled_ratio = window_ratio[:, :, 0].sum(axis=1)
+    lsb_mean = pooled_ratio[0] / max(windows * channels, 1)
+    lsb_window_std = float(np.sqrt(max(pooled_ratio[1] / max(windows * channels, 1) - lsb_mean**2, 0.0)))
+
+    return {
+        "lsb_chi_square": float(lsb_chi),
+        "lsb_transition_rate": float(lsb_transitions),
+        "lsb_second_bit_correlation": correlation,
+        "lsb_window_std": lsb_window_std,
+        "bit_depth": depth,
+        "channels": channels,
+        "window_size": window_size,
+        "windows": windows,
+        "bit_planes": bit_planes,
+    }
+
+
+class StreamingSteganographyDetector:
+    """Block-wise counterpart of :func:`detect_steganography`.
+
+    Bit counts, transitions, the LSB/second-bit correlation and the window
+    statistics are kept as running sums, so the final metrics equal the
+    in-memory detector's while only one block is held at a time.
+    """
+
+    window_size = 2048
+
+    def __init__(self, sample_rate: int) -> None:
+        self.sample_rate = sample_rate
+        self._counts = np.zeros(2, dtype=np.int64)
+        self._transitions = 0
+        self._last_lsb: Optional[int] = None
+        self._second_ones = 0
+        self._both_ones = 0
+        self._carry = np.empty(0, dtype=np.int16)
+        self._window_count = 0
+        self._window_sum = 0.0
+        self._window_sq_sum = 0.0
+
+    def update(self, block: AudioBlock) -> None:
+        samples = mono_block(block)[block.lead:]
+        if samples.size == 0:
+            return
+        scaled = np.clip(samples * 32767, -32768, 32767).astype(np.int16)
+        lsb = scaled & 1
+        second_lsb = (scaled >> 1) & 1
+
+        self._counts += np.bincount(lsb, minlength=2)
+        self._transitions += int(np.count_nonzero(lsb[:-1] != lsb[1:]))
+        if self._last_lsb is not None:
+            self._transitions += int(lsb[0] != self._last_lsb)
+        self._last_lsb = int(lsb[-1])
+        self._second_ones += int(np.count_nonzero(second_lsb))
+        self._both_ones += int(np.count_nonzero(lsb & second_lsb))
+
+        pending = np.concatenate([self._carry, lsb])
+        num_windows = pending.size // self.window_size
+        if num_windows:
+            window_means = np.mean(pending[: num_windows * self.window_size].reshape(num_windows, self.window_size), axis=1)
+            self._window_count += num_windows
+            self._window_sum += float(np.sum(window_means))
+            self._window_sq_sum += float(np.sum(window_means**2))
+        self._carry = pending[num_windows * self.window_size :]
+
+    def finalize(self) -> Dict[str, float]:
+        from scipy.stats import chisquare
+
+        total = int(self._counts.sum())
+        if total:
+            expected = np.array([total / 2, total / 2])
+            chi2, _ = chisquare(self._counts, expected)
+            chi2 = float(chi2)
+        else:
+            chi2 = 0.0
+        transitions = self._transitions / (total - 1) if total > 1 else 0.0
+
+        correlation = 0.0
+        if total > 1:
+            ones = float(self._counts[1])
+            second = float(self._second_ones)
+            covariance = total * self._both_ones - ones * second
+            denominator = np.sqrt((total * ones - ones**2) * (total * second - second**2))
+            if denominator > 0:
+                correlation = float(covariance / denominator)
+
+        if self._window_count:
+            mean = self._window_sum / self._window_count
+            window_var = float(np.sqrt(max(self._window_sq_sum / self._window_count - mean**2, 0.0)))
+        else:
+            window_var = 0.0
+
+        return {
+            "lsb_chi_square": chi2,
+            "lsb_transition_rate": float(transitions),
+            "lsb_second_bit_correlation": correlation,
+            "lsb_window_std": window_var,
+        }
@@ -0,0 +1,171 @@
+"""Bounded-memory block streaming for recordings larger than RAM."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, Protocol
+
+import numpy as np
+import soundfile as sf
+
+from .exceptions import AudioLoadingError
+from .ingestion import _validate_path
+from .profiling import stage
+
+DEFAULT_BLOCK_SIZE = 1 << 18
+DEFAULT_OVERLAP = 4096
+
+
+@dataclass(slots=True)
+class AudioBlock:
+    """A preprocessed block of samples taken from a :class:`StreamReader`.
+
+    ``samples`` starts with ``lead`` samples repeated from the previous block
+    so detectors that need left context (e.g. analytic-signal envelopes) can
+    use it; accumulators should only count :attr:`fresh` samples.
+    """
+
+    samples: np.ndarray
+    offset: int
+    lead: int
+
+    @property
+    def fresh(self) -> np.ndarray:
+        """Samples not seen in any earlier block."""
+
+        return self.samples[..., self.lead:]
+
+    @property
+    def start(self) -> int:
+        """Absolute index of the first fresh sample."""
+
+        return self.offset + self.lead
+
+
+class StreamingDetector(Protocol):
+    """Interface implemented by detectors that consume :class:`AudioBlock` objects."""
+
+    def update(self, block: AudioBlock) -> None:
+        ...
+
+    def finalize(self) -> Dict[str, float]:
+        ...
+
+
+class StreamReader:
+    """Random-access, preprocessed view over an audio file.
+
+    Opening a reader makes one pass over the file to find the DC offset and
+    peak used by :func:`frequencipher.ingestion.load_audio`, so blocks returned
+    by :meth:`read` and :meth:`blocks` match the samples a full load would
+    produce at the native sample rate, while only one block is resident.
+    """
+
+    def __init__(self, path: str | Path, *, mono: bool = True, scan_block_size: int = DEFAULT_BLOCK_SIZE) -> None:
+        self.path = Path(path)
+        _validate_path(self.path)
+        self.mono = mono
+        self._file = sf.SoundFile(self.path, "r")
+        self.sample_rate = int(self._file.samplerate)
+        self.frames = int(self._file.frames)
+        self.channels = 1 if mono else int(self._file.channels)
+        if self.frames <= 0:
+            self._file.close()
+            raise AudioLoadingError(f"Audio file '{self.path}' is empty.")
+        self._offset = 0.0
+        self._scale = 1.0
+        self._scan(scan_block_size)
+
+    def _raw(self, start: int, length: int) -> np.ndarray:
+        self._file.seek(start)
+        block = self._file.read(length, dtype="float32", always_2d=True)
+        if self.mono:
+            return np.mean(block, axis=1)
+        return np.ascontiguousarray(block.T)
+
+    def _scan(self, block_size: int) -> None:
+        total = 0.0
+        count = 0
+        low = np.inf
+        high = -np.inf
+        for start in range(0, self.frames, block_size):
+            block = self._raw(start, block_size)
+            total += float(np.sum(block, dtype=np.float64))
+            count += block.size
+            low = min(low, float(np.min(block)))
+            high = max(high, float(np.max(block)))
+        self._offset = total / count if count else 0.0
+        peak = max(high - self._offset, self._offset - low)
+        self._scale = 1.0 / peak if peak > 0 else 1.0
+
+    @property
+    def duration(self) -> float:
+        return float(self.frames / self.sample_rate) if self.sample_rate > 0 else 0.0
+
+    def read(self, start: int, length: int) -> np.ndarray:
+        """Return preprocessed samples ``[start, start + length)`` clipped to the file."""
+
+        start = max(0, start)
+        length = max(0, min(length, self.frames - start))
+        if length == 0:
+            shape = (0,) if self.mono else (self.channels, 0)
+            return np.empty(shape, dtype=np.float32)
+        block = self._raw(start, length)
+        block -= np.float32(self._offset)
+        block *= np.float32(self._scale)
+        return block
+
+    def blocks(self, block_size: int = DEFAULT_BLOCK_SIZE, overlap: int = DEFAULT_OVERLAP) -> Iterator[AudioBlock]:
+        """Yield :class:`AudioBlock` objects of ``block_size`` samples overlapping by ``overlap``."""
+
+        if block_size <= overlap:
+            raise ValueError("block_size must be larger than overlap")
+        position = 0
+        while position < self.frames:
+            lead = min(overlap, position)
+            offset = position - lead
+            block = self.read(offset, block_size)
+            yield AudioBlock(samples=block, offset=offset, lead=lead)
+            position = offset + block.shape[-1]
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "StreamReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def run_streaming_detectors(
+    reader: StreamReader,
+    detectors: Dict[str, StreamingDetector],
+    *,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+) -> Dict[str, Dict[str, float]]:
+    """Feed every block of ``reader`` to ``detectors`` and collect their final results."""
+
+    for block in reader.blocks(block_size, overlap):
+        for name, detector in detectors.items():
+            with stage(f"detector.{name}"):
+                detector.update(block)
+    results: Dict[str, Dict[str, float]] = {}
+    for name, detector in detectors.items():
+        with stage(f"detector.{name}"):
+            results[name] = detector.finalize()
+    return results
+
+
+def mono_block(block: AudioBlock) -> np.ndarray:
+    """Return the block samples downmixed to mono when they carry channels."""
+
+    samples = block.samples
+    return samples if samples.ndim == 1 else np.mean(samples, axis=0)
+
+
+def empty_samples(channels: int) -> np.ndarray:
+    """Placeholder sample array for signals analysed without being held in memory."""
+
+    return np.empty((0,) if channels == 1 else (channels, 0), dtype=np.float32)
@@ -1,54 +1,347 @@
 """Detect subliminal frequency and psychoacoustic content."""
 from __future__ import annotations
 
-from typing import Dict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import numpy as np
-from scipy.signal import hilbert
 
-from .statistics import summarise_array
+from .context import AnalysisContext, ensure_context
+from .statistics import SummaryAccumulator, summarise_array
+from .streaming import AudioBlock, mono_block
 
+ALGORITHM_VERSION = 3
 
-def detect_subliminal(samples: np.ndarray, sample_rate: int) -> Dict[str, float]:
-    """Identify subliminal content via spectral and modulation cues."""
+# Ultrasound sits above what the pipeline rate can represent, so analyse
+# the native rate.
+ANALYSIS_RATE: Optional[int] = None
 
-    if samples.ndim > 1:
-        samples = np.mean(samples, axis=0)
+DEFAULT_SEGMENT_SECONDS = 1.0
+_BATCH_SAMPLES = 1 << 20
+_ENVELOPE_BLOCK = 1 << 18
+_ENVELOPE_CONTEXT = 4096
+_EMPTY_SUMMARY = {
+    "mean": 0.0,
+    "std": 0.0,
+    "median": 0.0,
+    "min": 0.0,
+    "max": 0.0,
+    "percentile_25": 0.0,
+    "percentile_75": 0.0,
+}
 
-    spectrum = np.fft.rfft(samples)
-    freqs = np.fft.rfftfreq(samples.size, 1 / sample_rate)
 
+def _band_masks(freqs: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     infra_mask = freqs < 20
     ultra_mask = freqs > 20000
     audible_mask = (~infra_mask) & (~ultra_mask)
+    return infra_mask, ultra_mask, audible_mask
+
+
+def _band_means(magnitudes: np.ndarray, masks: Sequence[np.ndarray]) -> np.ndarray:
+    """Mean magnitude per band for every row of ``magnitudes``; ``0`` for empty bands.
+
+    Leading axes (signals) are kept: ``(..., rows, bins)`` gives ``(..., bands, rows)``.
+    """
+
+    means = np.zeros(magnitudes.shape[:-2] + (len(masks), magnitudes.shape[-2]), dtype=np.float64)
+    for index, mask in enumerate(masks):
+        if np.any(mask):
+            means[..., index, :] = magnitudes[..., mask].mean(axis=-1)
+    return means
+
+
+def _segment_band_energies(samples: np.ndarray, sample_rate: int, length: int, hop: int) -> np.ndarray:
+    """Welch-style band energies: Hann-windowed segments on a fast FFT size.
+
+    Segments are transformed a batch at a time from a strided view of
+    ``samples``, so memory is bounded by the batch rather than the file.
+    Returns a ``(3, n_segments)`` array of infrasound, ultrasound and audible
+    mean magnitudes; ``(n_signals, n_samples)`` input is transformed in the
+    same batches and gives ``(n_signals, 3, n_segments)``.
+    """
+
+    from scipy.fft import next_fast_len, rfft
+    from scipy.signal import get_window
+
+    if samples.shape[-1] < length:
+        samples = np.pad(samples, [(0, 0)] * (samples.ndim - 1) + [(0, length - samples.shape[-1])])
+    frames = np.lib.stride_tricks.sliding_window_view(samples, length, axis=-1)[..., ::hop, :]
+    nfft = next_fast_len(length, real=True)
+    window = get_window("hann", length).astype(samples.dtype)
+    masks = _band_masks(np.fft.rfftfreq(nfft, 1 / sample_rate))
+
+    segments = frames.shape[-2]
+    energies = np.empty(samples.shape[:-1] + (3, segments), dtype=np.float64)
+    batch = max(1, _BATCH_SAMPLES // (nfft * int(np.prod(samples.shape[:-1]))))
+    for first in range(0, segments, batch):
+        spectrum = np.abs(rfft(frames[..., first : first + batch, :] * window, nfft, axis=-1))
+        energies[..., first : first + batch] = _band_means(spectrum, masks)
+    return energies
+
+
+def _envelope_blocks(samples: np.ndarray, sample_rate: int) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """Yield ``(start, amplitude, frequency)`` of the analytic signal block by block.
+
+    Each block is extended with neighbouring samples on both sides before the
+    Hilbert transform (padded to a fast FFT size) and trimmed afterwards, so
+    edge effects stay in the discarded context. ``frequency[..., k]`` is the
+    instantaneous frequency between samples ``start + k`` and ``start + k + 1``;
+    ``(n_signals, n_samples)`` input is transformed in one batched call per block.
+    """
 
-    infra_energy = float(np.mean(np.abs(spectrum[infra_mask])) if np.any(infra_mask) else 0.0)
-    ultra_energy = float(np.mean(np.abs(spectrum[ultra_mask])) if np.any(ultra_mask) else 0.0)
-    audible_energy = float(np.mean(np.abs(spectrum[audible_mask])) if np.any(audible_mask) else 0.0)
-    energy_ratio = float((infra_energy + ultra_energy) / (audible_energy + 1e-8))
+    from scipy.fft import next_fast_len
+    from scipy.signal import hilbert
+
+    size = samples.shape[-1]
+    for start in range(0, size, _ENVELOPE_BLOCK):
+        stop = min(size, start + _ENVELOPE_BLOCK)
+        left = max(0, start - _ENVELOPE_CONTEXT)
+        right = min(size, stop + _ENVELOPE_CONTEXT)
+        extended = samples[..., left:right]
+        width = extended.shape[-1]
+        analytic = hilbert(extended, next_fast_len(width), axis=-1)[..., :width].astype(np.complex64)
+        core = analytic[..., start - left : stop - left + (1 if stop < size else 0)]
+        amplitude = np.abs(core[..., : stop - start])
+        frequency = np.angle(core[..., 1:] * np.conj(core[..., :-1])) / (2.0 * np.pi) * sample_rate
+        yield start, amplitude, frequency
+
+
+def _chunk_moments(values: np.ndarray, offset: int, hop: int, chunks: int) -> np.ndarray:
+    """Count, sum and sum of squares of ``values`` (starting at ``offset``) per ``hop`` chunk."""
+
+    index = (offset + np.arange(values.size)) // hop
+    keep = index < chunks
+    index, values = index[keep], values[keep].astype(np.float64)
+    return np.stack(
+        [
+            np.bincount(index, minlength=chunks),
+            np.bincount(index, weights=values, minlength=chunks),
+            np.bincount(index, weights=values * values, minlength=chunks),
+        ]
+    )
+
+
+def _segment_std(moments: np.ndarray, segments: int) -> np.ndarray:
+    """Standard deviation per segment of two consecutive hop chunks."""
+
+    count, total, squares = moments[:, :segments] + moments[:, 1 : segments + 1]
+    mean = np.divide(total, count, out=np.zeros(segments), where=count > 0)
+    variance = np.divide(squares, count, out=np.zeros(segments), where=count > 0) - mean**2
+    return np.sqrt(np.maximum(variance, 0.0))
+
+
+def _whole_signal(samples: np.ndarray, sample_rate: int) -> Dict[str, Any]:
+    from scipy.signal import hilbert
+
+    spectrum = np.fft.rfft(samples)
+    freqs = np.fft.rfftfreq(samples.size, 1 / sample_rate)
+    infra_energy, ultra_energy, audible_energy = (
+        float(value) for value in _band_means(np.abs(spectrum)[np.newaxis], _band_masks(freqs))[:, 0]
+    )
 
     analytic = hilbert(samples)
-    amplitude_envelope = np.abs(analytic)
-    amplitude_summary = summarise_array(amplitude_envelope).to_dict()
+    amplitude_summary = summarise_array(np.abs(analytic)).to_dict()
     instantaneous_phase = np.unwrap(np.angle(analytic))
     instantaneous_freq = np.diff(instantaneous_phase) / (2.0 * np.pi) * sample_rate
-    freq_summary = summarise_array(instantaneous_freq).to_dict() if instantaneous_freq.size else {
-        "mean": 0.0,
-        "std": 0.0,
-        "median": 0.0,
-        "min": 0.0,
-        "max": 0.0,
-        "percentile_25": 0.0,
-        "percentile_75": 0.0,
+    freq_summary = summarise_array(instantaneous_freq).to_dict() if instantaneous_freq.size else _EMPTY_SUMMARY
+    return {
+        "infrasound_energy": infra_energy,
+        "ultrasound_energy": ultra_energy,
+        "audible_energy": audible_energy,
+        "subliminal_energy_ratio": float((infra_energy + ultra_energy) / (audible_energy + 1e-8)),
+        "amplitude_modulation_std": amplitude_summary["std"],
+        "amplitude_modulation_percentile_75": amplitude_summary["percentile_75"],
+        "frequency_modulation_std": freq_summary["std"],
+        "frequency_modulation_percentile_75": freq_summary["percentile_75"],
     }
 
+
+def _segmented_result(
+    energies: np.ndarray,
+    amplitude: SummaryAccumulator,
+    frequency: SummaryAccumulator,
+    amplitude_moments: np.ndarray,
+    frequency_moments: np.ndarray,
+    hop: int,
+    sample_rate: int,
+) -> Dict[str, Any]:
+    segments = energies.shape[1]
+    infra_track, ultra_track, audible_track = energies
+    infra_energy, ultra_energy, audible_energy = (float(value) for value in energies.mean(axis=1))
+    amplitude_summary = amplitude.result().to_dict()
+    freq_summary = frequency.result().to_dict() if frequency.count else _EMPTY_SUMMARY
     return {
         "infrasound_energy": infra_energy,
         "ultrasound_energy": ultra_energy,
         "audible_energy": audible_energy,
-        "subliminal_energy_ratio": energy_ratio,
+        "subliminal_energy_ratio": float((infra_energy + ultra_energy) / (audible_energy + 1e-8)),
         "amplitude_modulation_std": amplitude_summary["std"],
         "amplitude_modulation_percentile_75": amplitude_summary["percentile_75"],
         "frequency_modulation_std": freq_summary["std"],
         "frequency_modulation_percentile_75": freq_summary["percentile_75"],
+        "segment_seconds": 2 * hop / sample_rate,
+        "tracks": {
+            "time": (np.arange(segments) * hop / sample_rate).tolist(),
+            "infrasound_energy": infra_track.tolist(),
+            "ultrasound_energy": ultra_track.tolist(),
+            "audible_energy": audible_track.tolist(),
+            "subliminal_energy_ratio": ((infra_track + ultra_track) / (audible_track + 1e-8)).tolist(),
+            "amplitude_modulation_std": _segment_std(amplitude_moments, segments).tolist(),
+            "frequency_modulation_std": _segment_std(frequency_moments, segments).tolist(),
+        },
     }
+
+
+def _segment_hop(sample_rate: int, segment_seconds: float) -> int:
+    return max(1, int(round(segment_seconds * sample_rate)) // 2)
+
+
+def _segmented(signals: np.ndarray, sample_rate: int, segment_seconds: float) -> List[Dict[str, Any]]:
+    """Segmented results for each row of ``(n_signals, n_samples)`` ``signals``, transformed together."""
+
+    hop = _segment_hop(sample_rate, segment_seconds)
+    energies = _segment_band_energies(signals, sample_rate, 2 * hop, hop)
+    chunks = energies.shape[-1] + 1
+    count = signals.shape[0]
+
+    amplitude = [SummaryAccumulator(exact=False) for _ in range(count)]
+    frequency = [SummaryAccumulator(exact=False) for _ in range(count)]
+    amplitude_moments = np.zeros((count, 3, chunks))
+    frequency_moments = np.zeros((count, 3, chunks))
+    for start, block_amplitude, block_frequency in _envelope_blocks(signals, sample_rate):
+        for index in range(count):
+            amplitude[index].update(block_amplitude[index])
+            frequency[index].update(block_frequency[index])
+            amplitude_moments[index] += _chunk_moments(block_amplitude[index], start, hop, chunks)
+            frequency_moments[index] += _chunk_moments(block_frequency[index], start, hop, chunks)
+    return [
+        _segmented_result(
+            energies[index],
+            amplitude[index],
+            frequency[index],
+            amplitude_moments[index],
+            frequency_moments[index],
+            hop,
+            sample_rate,
+        )
+        for index in range(count)
+    ]
+
+
+def detect_subliminal(
+    samples: np.ndarray,
+    sample_rate: int,
+    *,
+    context: Optional[AnalysisContext] = None,
+    segment_seconds: Optional[float] = DEFAULT_SEGMENT_SECONDS,
+) -> Dict[str, Any]:
+    """Identify subliminal content via spectral and modulation cues.
+
+    By default the signal is analysed Welch-style in half-overlapping
+    segments of ``segment_seconds`` on fast FFT sizes, and the analytic
+    envelope is computed block by block, so memory is bounded and runtime
+    does not depend on awkward signal lengths. Band energies are then means
+    over segments, and ``tracks`` holds per-segment band energies, energy
+    ratio and AM/FM spread with segment start ``time`` in seconds.
+    ``segment_seconds=None`` restores the single whole-signal transform,
+    without tracks.
+
+    Multi-channel input is analysed as its mono downmix and, under ``side``
+    with the same keys, as its side signal (see
+    :attr:`~frequencipher.context.AnalysisContext.side`), which keeps
+    carriers planted in antiphase that the downmix cancels; both signals go
+    through the same batched transforms.
+    """
+
+    context = ensure_context(samples, sample_rate, context)
+    signals = [context.mono] if context.side is None else [context.mono, context.side]
+
+    if segment_seconds is None:
+        results = [_whole_signal(signal, sample_rate) for signal in signals]
+    else:
+        stacked = np.stack(signals) if len(signals) > 1 else signals[0][np.newaxis]
+        results = _segmented(stacked, sample_rate, segment_seconds)
+    result = results[0]
+    if len(results) > 1:
+        result["side"] = results[1]
+    return result
+
+
+class StreamingSubliminalDetector:
+    """Block-wise counterpart of :func:`detect_subliminal`.
+
+    Segments follow the same Welch-style grid as the in-memory detector, with
+    the samples of a segment that straddles two blocks carried over, so band
+    energies and their tracks match it. The analytic-signal envelope is
+    computed per block using the overlap as left context, so memory depends
+    on the block size rather than the recording length.
+    """
+
+    def __init__(self, sample_rate: int, *, segment_seconds: float = DEFAULT_SEGMENT_SECONDS) -> None:
+        self.sample_rate = sample_rate
+        self.hop = _segment_hop(sample_rate, segment_seconds)
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._energies: List[np.ndarray] = []
+        self._amplitude = SummaryAccumulator(exact=False)
+        self._frequency = SummaryAccumulator(exact=False)
+        self._amplitude_moments = np.zeros((3, 0))
+        self._frequency_moments = np.zeros((3, 0))
+
+    @staticmethod
+    def _accumulate(moments: np.ndarray, values: np.ndarray, offset: int, hop: int) -> np.ndarray:
+        chunks = (offset + values.size - 1) // hop + 1
+        if chunks > moments.shape[1]:
+            moments = np.pad(moments, ((0, 0), (0, chunks - moments.shape[1])))
+        moments[:, :chunks] += _chunk_moments(values, offset, hop, chunks)
+        return moments
+
+    def update(self, block: AudioBlock) -> None:
+        from scipy.signal import hilbert
+
+        samples = mono_block(block)
+        fresh = samples[block.lead:]
+        if fresh.size == 0:
+            return
+
+        length = 2 * self.hop
+        buffer = np.concatenate([self._pending, fresh])
+        usable = (buffer.size - length) // self.hop + 1 if buffer.size >= length else 0
+        if usable:
+            segment_span = (usable - 1) * self.hop + length
+            self._energies.append(_segment_band_energies(buffer[:segment_span], self.sample_rate, length, self.hop))
+            buffer = buffer[usable * self.hop :]
+        self._pending = buffer.copy()
+
+        analytic = hilbert(samples)
+        amplitude = np.abs(analytic[block.lead:])
+        instantaneous_phase = np.unwrap(np.angle(analytic))
+        instantaneous_freq = np.diff(instantaneous_phase) / (2.0 * np.pi) * self.sample_rate
+        frequency = instantaneous_freq[max(block.lead - 1, 0):]
+        self._amplitude.update(amplitude)
+        self._frequency.update(frequency)
+        self._amplitude_moments = self._accumulate(self._amplitude_moments, amplitude, block.start, self.hop)
+        if frequency.size:
+            frequency_start = block.start - 1 if block.lead else block.start
+            self._frequency_moments = self._accumulate(
+                self._frequency_moments, frequency, frequency_start, self.hop
+            )
+
+    def finalize(self) -> Dict[str, Any]:
+        if self._energies:
+            energies = np.concatenate(self._energies, axis=1)
+        else:
+            energies = _segment_band_energies(self._pending, self.sample_rate, 2 * self.hop, self.hop)
+        chunks = energies.shape[1] + 1
+
+        def fit(moments: np.ndarray) -> np.ndarray:
+            return np.pad(moments, ((0, 0), (0, max(0, chunks - moments.shape[1]))))[:, :chunks]
+
+        return _segmented_result(
+            energies,
+            self._amplitude,
+            self._frequency,
+            fit(self._amplitude_moments),
+            fit(self._frequency_moments),
+            self.hop,
+            self.sample_rate,
+        )
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from frequencipher.anomaly import BaselineModel, load_baseline, score_anomalies
+from frequencipher.baseline import fit_baseline, score_files
+
+
+def _results(values: np.ndarray) -> dict:
+    return {"spectral": {"summaries": {"mfcc": {"mean": float(values[0]), "std": float(values[1])}}}}
+
+
+def test_baseline_scores_outliers_and_refits_incrementally(tmp_path: Path) -> None:
+    rng = np.random.default_rng(0)
+    clean = rng.normal(0.0, 1.0, size=(200, 4))
+    model = BaselineModel(["a", "b", "c", "d"], n_estimators=20).fit(clean)
+    scores = model.score(np.vstack([np.zeros(4), np.full(4, 8.0)]))
+    assert scores[1] > scores[0]
+
+    path = tmp_path / "baseline.pkl"
+    model.save(path)
+    loaded = load_baseline(path)
+    assert loaded is not load_baseline(path)
+    np.testing.assert_allclose(loaded.score(clean[:5]), model.score(clean[:5]))
+
+    identifier = loaded.identifier
+    probes = rng.normal(0.0, 1.0, size=(200, 4))
+    before = np.median(loaded.percentile(loaded.score(probes)))
+    loaded.partial_fit(rng.normal(0.0, 1.0, size=(4, 4)))
+    loaded.partial_fit(rng.normal(0.0, 1.0, size=(50, 4)))
+    assert loaded.n_samples == 254
+    assert loaded.identifier != identifier
+    # Updating one loaded copy leaves the cached model untouched.
+    assert load_baseline(path).n_samples == 200 and load_baseline(path).identifier == identifier
+    np.testing.assert_allclose(load_baseline(path).score(clean[:5]), model.score(clean[:5]))
+    result = score_anomalies(np.full((1, 4), 8.0), baseline=loaded)
+    assert result["baseline_percentile"] > 0.9
+    # Small updates must not shift clean material away from the middle of the reference distribution.
+    after = np.median(loaded.percentile(loaded.score(probes)))
+    assert 0.2 < before < 0.8
+    assert 0.2 < after < 0.8
+
+
+def test_fit_baseline_from_exported_results(tmp_path: Path) -> None:
+    rng = np.random.default_rng(1)
+    paths = []
+    for index in range(30):
+        path = tmp_path / f"clean{index}.json"
+        path.write_text(json.dumps(_results(rng.normal(0.0, 1.0, size=2))))
+        paths.append(path)
+    model_path = tmp_path / "model.pkl"
+
+    model = fit_baseline(paths[:20], model_path)
+    updated = fit_baseline(paths[20:], model_path, update=True)
+    assert model.feature_names == ["mfcc_mean", "mfcc_std"]
+    assert updated.n_samples == 30
+
+    suspect = tmp_path / "suspect.json"
+    suspect.write_text(json.dumps(_results(np.array([9.0, -9.0]))))
+    scored = score_files(updated, [paths[0], suspect])
+    assert scored[1]["anomaly_score"] > scored[0]["anomaly_score"]
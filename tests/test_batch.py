@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+from frequencipher.batch import FAILURE_LOG, expand_inputs, result_path_for, run_batch
+
+
+def _write_tone(path: Path, sr: int = 8000) -> Path:
+    t = np.arange(sr) / sr
+    sf.write(path, 0.5 * np.sin(2 * np.pi * 440 * t), sr)
+    return path
+
+
+def test_expand_inputs_handles_dirs_globs_and_file_lists(tmp_path: Path) -> None:
+    nested = tmp_path / "case" / "nested"
+    nested.mkdir(parents=True)
+    a = _write_tone(tmp_path / "case" / "a.wav")
+    b = _write_tone(nested / "b.wav")
+    (tmp_path / "case" / "notes.txt").write_text("not audio")
+    file_list = tmp_path / "list.txt"
+    file_list.write_text(f"# evidence\n{a}\n\n{b}\n")
+
+    assert expand_inputs([str(tmp_path / "case")]) == [a, b]
+    assert expand_inputs([str(tmp_path / "case" / "**" / "*.wav")]) == [a, b]
+    assert expand_inputs([f"@{file_list}", str(a)]) == [a, b]
+
+
+def test_run_batch_logs_failures_and_resumes(tmp_path: Path) -> None:
+    good = [_write_tone(tmp_path / f"tone{i}.wav") for i in range(2)]
+    bad = tmp_path / "missing.wav"
+    out = tmp_path / "results"
+
+    summary = run_batch(good + [bad], out, workers=2, stream=True, block_size=2048, overlap=256)
+    assert summary.to_dict() == {"completed": 2, "skipped": 0, "failed": 1}
+    payload = json.loads(result_path_for(good[0], out).read_text())
+    assert payload["metadata"]["source"] == str(good[0])
+    failures = [json.loads(line) for line in (out / FAILURE_LOG).read_text().splitlines()]
+    assert failures[0]["path"] == str(bad)
+
+    resumed = run_batch(good, out, workers=1, stream=True, block_size=2048, overlap=256)
+    assert resumed.to_dict() == {"completed": 0, "skipped": 2, "failed": 0}
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from frequencipher.benchmark import (
+    SUITES,
+    BenchmarkCase,
+    check_case,
+    compare_thresholds,
+    load_thresholds,
+    synthesise_case,
+    thresholds_from,
+    time_case,
+)
+
+
+def test_planted_artefacts_pass_checks(tmp_path: Path) -> None:
+    for case in (
+        BenchmarkCase("reversed", 5, 16000, artefact="reversed_speech"),
+        BenchmarkCase("lsb", 5, 16000, 2, artefact="lsb_payload"),
+    ):
+        path = synthesise_case(case, tmp_path)
+        assert synthesise_case(case, tmp_path) == path
+        timings, results = time_case(case, path, trace_memory=False)
+        assert {"load_audio", "analysis", "detector.backmask"} <= set(timings)
+        checks = check_case(case, path, results)
+        assert f"{case.artefact}_located" in checks
+        assert all(check["passed"] for check in checks.values()), checks
+
+
+def test_clean_music_is_not_escalated(tmp_path: Path) -> None:
+    case = BenchmarkCase("music", 6, 16000, 2, content="music")
+    path = synthesise_case(case, tmp_path)
+    _, results = time_case(case, path, trace_memory=False)
+    checks = check_case(case, path, results)
+    assert checks["clean_not_escalated"]["passed"], checks
+    assert all(check["passed"] for check in checks.values()), checks
+
+
+def test_threshold_gate() -> None:
+    timings = {"case": {"analysis": {"wall_seconds": 1.0, "peak_mib": 10.0}, "spectral.mel": {"wall_seconds": 0.1}}}
+    limits = thresholds_from(timings)
+    assert set(limits["case"]) == {"analysis"}
+    assert compare_thresholds(timings, limits) == []
+    slower = {"case": {"analysis": {"wall_seconds": 5.0, "peak_mib": 10.0}}}
+    assert compare_thresholds(slower, limits) == ["case: analysis wall_seconds 5.000 > 2.050"]
+
+
+def test_repository_thresholds_cover_default_suites() -> None:
+    thresholds = load_thresholds()
+    for suite in ("smoke", "standard"):
+        for case in SUITES[suite]:
+            assert {"load_audio", "analysis"} <= set(thresholds[case.name])
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+from frequencipher import analysis
+from frequencipher.analysis import run_streaming_analysis
+from frequencipher.cache import ResultCache
+
+
+def test_cache_hits_and_goes_stale_on_version_bump(tmp_path: Path, monkeypatch) -> None:
+    sr = 8000
+    path = tmp_path / "clip.wav"
+    sf.write(path, 0.5 * np.sin(2 * np.pi * 440 * np.arange(sr) / sr), sr)
+    cache = ResultCache(tmp_path / "cache")
+    options = {"block_size": 2048, "overlap": 256, "cache": cache}
+
+    audio, first = run_streaming_analysis(str(path), **options)
+    assert audio.samples.shape == (0,)
+    cached_audio, second = run_streaming_analysis(str(path), **options)
+    assert second == first
+    assert cached_audio.duration == audio.duration
+    assert len(list(cache.directory.glob("*/*.json"))) == 1
+
+    monkeypatch.setitem(analysis.DETECTOR_VERSIONS, "steganography", 99)
+    run_streaming_analysis(str(path), **options)
+    assert len(list(cache.directory.glob("*/*.json"))) == 2
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path, max_bytes=10**6)
+    for index, key in enumerate(["aa1", "bb2", "cc3"]):
+        cache.put(key, {"results": {"value": index}})
+        os.utime(cache._entry_path(key), (index, index))
+    cache.get("aa1")
+    cache.max_bytes = 2 * cache._entry_path("aa1").stat().st_size
+    assert cache.evict() == 1
+    assert cache.get("bb2") is None
+    assert cache.get("aa1") == {"results": {"value": 0}}
+
+
+def test_cache_scans_only_when_over_budget(tmp_path: Path, monkeypatch) -> None:
+    cache = ResultCache(tmp_path, max_bytes=10**6)
+    scans = []
+    evict = cache.evict
+
+    def counting_evict() -> int:
+        scans.append(1)
+        return evict()
+
+    monkeypatch.setattr(cache, "evict", counting_evict)
+    for index in range(5):
+        cache.put(f"k{index:02d}", {"results": {"value": index}})
+    assert len(scans) == 1
+
+    cache.max_bytes = 3 * cache._entry_path("k00").stat().st_size
+    cache.put("k05", {"results": {"value": 5}})
+    assert len(scans) == 2
+    assert len(list(tmp_path.glob("*/*.json"))) == 3
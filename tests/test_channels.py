@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+from frequencipher.channels import compare_channels
+from frequencipher.context import AnalysisContext
+from frequencipher.triage import TRIAGE_THRESHOLDS
+
+SR = 44100
+
+
+def _music(seconds: float, seed: int = 0) -> np.ndarray:
+    """Low-passed noise: nothing above 8 kHz in either channel."""
+
+    from scipy.signal import butter, sosfilt
+
+    noise = np.random.default_rng(seed).standard_normal(int(seconds * SR))
+    return (0.2 * sosfilt(butter(8, 8000, fs=SR, output="sos"), noise)).astype(np.float32)
+
+
+def test_side_channel_tone_is_located() -> None:
+    music = _music(10.0)
+    t = np.arange(music.size) / SR
+    stereo = np.stack([music, music])
+    # A tone in antiphase cancels in the downmix and survives only in the side channel.
+    tone = (0.01 * np.sin(2 * np.pi * 15000 * t) * ((t >= 4) & (t < 7))).astype(np.float32)
+    stereo[0] += tone
+    stereo[1] -= tone
+    context = AnalysisContext(stereo, SR)
+    assert np.abs(context.mono - music).max() < 1e-6
+
+    result = compare_channels(stereo, SR, context=context)
+    band = int(np.searchsorted(result["band_edges_hz"], 15000)) - 1
+    assert result["side_band_ratio_max"] == result["side_band_ratio"][band] > TRIAGE_THRESHOLDS["side_band_ratio"]
+    assert result["correlation"] > 0.99 and result["phase_difference_mean"] < 0.1
+    track = np.array(result["tracks"]["side_energy_ratio"])
+    time = np.array(result["tracks"]["time"])
+    assert track[(time > 4.5) & (time < 6)].min() > 100 * track[time < 3].max()
+    assert result["per_channel"][0]["rms"] == pytest.approx(result["per_channel"][1]["rms"], rel=1e-3)
+
+
+def test_identical_channels_have_no_side_energy_and_mono_is_empty() -> None:
+    music = _music(3.0)
+    result = compare_channels(np.stack([music, music]), SR)
+    assert result["side_energy_ratio"] == 0.0 and result["coherence"] == pytest.approx(1.0)
+    mono = compare_channels(music, SR)
+    assert mono["channels"] == 1 and mono["per_channel"] == [] and mono["side_energy_ratio"] is None
+    json.dumps(mono, allow_nan=False)
+
+
+def test_channel_blocks_batch_every_channel() -> None:
+    stereo = np.stack([_music(1.3, 1), _music(1.3, 2)])
+    context = AnalysisContext(stereo, SR)
+    blocks = np.concatenate(list(context.stft_blocks(2048, None, 16, channels=True)), axis=-1)
+    for index in range(2):
+        expected = AnalysisContext(stereo[index], SR).stft(2048, None)
+        np.testing.assert_allclose(blocks[index], expected, atol=1e-4)
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import librosa
+import numpy as np
+
+from frequencipher.context import AnalysisContext
+from frequencipher.spectral import compute_spectral_features
+from frequencipher.temporal import check_temporal_manipulation
+
+
+def _tone(sr: int = 22050, seconds: float = 1.0) -> np.ndarray:
+    t = np.linspace(0, seconds, int(sr * seconds), endpoint=False)
+    return (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def test_context_memoises_shared_stft() -> None:
+    context = AnalysisContext(_tone(), 22050)
+    assert context.stft(2048, 512) is context.stft(2048, None)
+    assert context.magnitude() is context.magnitude()
+    context.clear()
+    assert not context._cache
+
+
+def test_context_features_match_direct_librosa_calls() -> None:
+    samples = _tone()
+    sr = 22050
+    context = AnalysisContext(samples, sr)
+    features = compute_spectral_features(samples, sr, context=context)
+    direct_mel = librosa.feature.melspectrogram(y=samples, sr=sr, n_fft=2048, hop_length=512)
+    direct_centroid = librosa.feature.spectral_centroid(y=samples, sr=sr, n_fft=2048, hop_length=512)
+    np.testing.assert_allclose(features["matrices"]["mel"], direct_mel, rtol=1e-4, atol=1e-6)
+    np.testing.assert_allclose(features["matrices"]["centroid"], direct_centroid, rtol=1e-4)
+
+    direct_onset = librosa.onset.onset_strength(y=samples, sr=sr)
+    np.testing.assert_allclose(context.onset_envelope(), direct_onset, rtol=1e-4, atol=1e-5)
+    assert "tempo_bpm" in check_temporal_manipulation(samples, sr, context=context)
+
+
+def test_stft_blocks_concatenate_to_stft() -> None:
+    samples = _tone(seconds=1.3)
+    blocks = list(AnalysisContext(samples, 22050).stft_blocks(2048, None, block_frames=10))
+    assert all(block.dtype == np.complex64 for block in blocks) and blocks[0].shape[1] == 10
+    expected = AnalysisContext(samples, 22050).stft(2048, None)
+    np.testing.assert_allclose(np.concatenate(blocks, axis=1), expected, atol=1e-4)
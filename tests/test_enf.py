@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+from frequencipher.enf import detect_enf
+
+SR = 1000
+
+
+def _hum(seconds: float, f0: float = 50.0, phase: float = 0.0) -> np.ndarray:
+    t = np.arange(int(seconds * SR)) / SR
+    frequency = f0 + 0.02 * np.sin(2 * np.pi * t / 120)
+    angle = phase + 2 * np.pi * np.cumsum(frequency) / SR
+    return 0.05 * np.sin(angle) + 0.02 * np.sin(2 * angle + 0.3)
+
+
+def _noisy(samples: np.ndarray, seed: int = 0) -> np.ndarray:
+    return (samples + 0.05 * np.random.default_rng(seed).standard_normal(samples.size)).astype(np.float32)
+
+
+def test_trace_follows_hum_and_cut_is_located() -> None:
+    clean = detect_enf(_noisy(_hum(120)), SR)
+    assert clean["nominal_hz"] == 50.0 and clean["coverage"] > 0.95
+    assert clean["frequency_mean"] == pytest.approx(50.0, abs=0.01)
+    assert clean["discontinuities"] == []
+
+    hum = _hum(180)
+    cut = 90 * SR
+    edited = detect_enf(_noisy(np.concatenate([hum[:cut], hum[cut + 370 :]])), SR)
+    assert [point["kind"] for point in edited["discontinuities"]] == ["phase_jump"]
+    assert edited["discontinuities"][0]["time"] == pytest.approx(90.0, abs=0.5)
+
+
+def test_frequency_jump_between_spliced_recordings() -> None:
+    samples = np.concatenate([_hum(60, 60.0), _hum(60, 60.06, phase=1.0)])
+    result = detect_enf(_noisy(samples), SR)
+    assert result["nominal_hz"] == 60.0
+    kinds = {point["kind"]: point["time"] for point in result["discontinuities"]}
+    assert kinds["frequency_jump"] == pytest.approx(60.0, abs=2.0)
+    assert kinds["phase_jump"] == pytest.approx(60.0, abs=0.5)
+
+
+def test_no_hum_reports_no_discontinuities() -> None:
+    noise = np.random.default_rng(3).standard_normal(60 * SR).astype(np.float32)
+    result = detect_enf(noise, SR)
+    assert result["coverage"] < 0.5
+    assert result["discontinuities"] == []
+    json.dumps(result, allow_nan=False)
+
+
+def test_undefined_metrics_are_none() -> None:
+    # Below 101 Hz no hum harmonic fits under Nyquist.
+    result = detect_enf(np.zeros(60 * 90, dtype=np.float32), 90)
+    assert result["nominal_hz"] is None and result["frequency_mean"] is None
+    json.dumps(result, allow_nan=False)
+
+
+def test_short_clip_returns_empty_result() -> None:
+    result = detect_enf(np.ones(10, dtype=np.float32), SR)
+    assert result["nominal_hz"] is None and result["discontinuities"] == []
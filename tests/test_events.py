@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import numpy as np
+
+from frequencipher.events import local_peaks, runs
+
+
+def test_local_peaks_keep_the_largest_score_within_the_radius() -> None:
+    scores = np.array([0.0, 2.0, 1.0, 3.0, 0.0, 0.0, 0.0, 2.5, 0.5])
+    np.testing.assert_array_equal(local_peaks(scores, 1.5, 2), [3, 7])
+    assert local_peaks(np.zeros(0), 1.0, 2).size == 0
+
+
+def test_runs_include_edges() -> None:
+    starts, stops = runs(np.array([True, True, False, True, False, True]))
+    np.testing.assert_array_equal(starts, [0, 3, 5])
+    np.testing.assert_array_equal(stops, [2, 4, 6])
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from frequencipher.analysis import run_full_analysis
+from frequencipher.export import open_matrices, open_matrix, sidecar_dir_for, write_matrices
+
+
+def test_matrices_round_trip_memory_mapped(tmp_path: Path) -> None:
+    matrices = {"stft": np.arange(12, dtype=np.float32).reshape(3, 4), "rolloff": np.ones((1, 4))}
+    references = write_matrices(matrices, tmp_path / "out.spectra")
+    assert references["stft"] == {"path": str(tmp_path / "out.spectra" / "stft.npy"), "dtype": "<f4", "shape": [3, 4]}
+    opened = open_matrix(references["stft"])
+    assert isinstance(opened, np.memmap)
+    np.testing.assert_array_equal(opened, matrices["stft"])
+    assert open_matrix(references["rolloff"]).dtype == np.float64
+    assert sidecar_dir_for("results/a.json") == Path("results/a.spectra")
+
+
+def test_pipeline_references_sidecar_from_json(tmp_path: Path) -> None:
+    path = tmp_path / "tone.wav"
+    sf.write(path, 0.3 * np.sin(np.arange(22050) * 0.1), 22050)
+    with pytest.raises(ValueError, match="spectra_dir"):
+        run_full_analysis(str(path), include_raw_spectra=True)
+
+    _, results = run_full_analysis(
+        str(path), target_sr=22050, only=["spectral"], include_raw_spectra=True, spectra_dir=tmp_path / "tone.spectra"
+    )
+    results = json.loads(json.dumps(results))
+    matrices = open_matrices(results)
+    assert set(matrices) == set(results["spectral"]["summaries"])
+    assert matrices["mel"].shape[0] == 128
+    assert float(np.mean(matrices["mel"])) == pytest.approx(results["spectral"]["summaries"]["mel"]["mean"], rel=1e-4)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from frequencipher.analysis import run_full_analysis
+from frequencipher.cli import main
+from frequencipher.exceptions import FingerprintIndexError
+from frequencipher.fingerprint import FingerprintIndex, extract_fingerprints
+
+SR = 22050
+
+
+def _song(seconds: float, seed: int) -> np.ndarray:
+    """Quarter-second chords of random tones over a little noise."""
+
+    rng = np.random.default_rng(seed)
+    n = SR // 4
+    t = np.arange(n) / SR
+    notes = [
+        np.hanning(n) * np.sin(2 * np.pi * rng.uniform(200, 3000, (3, 1)) * t).sum(axis=0)
+        for _ in range(int(seconds * 4))
+    ]
+    samples = 0.2 * np.concatenate(notes)
+    return (samples + 0.01 * rng.standard_normal(samples.size)).astype(np.float32)
+
+
+def _excerpt(samples: np.ndarray, start: float, seconds: float, seed: int = 100) -> np.ndarray:
+    clip = samples[int(start * SR) : int((start + seconds) * SR)]
+    return (clip + 0.05 * np.random.default_rng(seed).standard_normal(clip.size)).astype(np.float32)
+
+
+def test_index_finds_noisy_excerpt_across_segments(tmp_path: Path) -> None:
+    songs = [_song(30, seed) for seed in range(4)]
+    index = FingerprintIndex(tmp_path / "index", shards=4)
+    assert index.add((f"song{seed}", *extract_fingerprints(songs[seed], SR)) for seed in range(2)) == [0, 1]
+    index.add((f"song{seed}", *extract_fingerprints(songs[seed], SR)) for seed in range(2, 4))
+
+    hashes, offsets = extract_fingerprints(_excerpt(songs[2], 12.34, 8.0), SR)
+    matches = index.query(hashes, offsets)
+    assert [match["name"] for match in matches] == ["song2"]
+    assert matches[0]["offset_seconds"] == pytest.approx(12.34, abs=0.05)
+    assert index.query(*extract_fingerprints(_song(8, 99), SR)) == []
+
+    index.compact()
+    reopened = FingerprintIndex(tmp_path / "index")
+    assert all(len(names) <= 1 for names in reopened._manifest["segments"])
+    assert len(list((tmp_path / "index").glob("*.keys.npy"))) <= 4
+    assert reopened.query(hashes, offsets) == matches and len(reopened) == len(index)
+
+    (tmp_path / "index" / "manifest.json").write_text(json.dumps({"format": 0}))
+    with pytest.raises(FingerprintIndexError):
+        FingerprintIndex(tmp_path / "index")
+
+
+def test_known_content_escalates_cascade_and_cli_round_trip(tmp_path: Path, capsys) -> None:
+    reference = tmp_path / "payload.wav"
+    sf.write(reference, _song(20, 7), SR, subtype="FLOAT")
+    submission = tmp_path / "submission.wav"
+    sf.write(submission, np.concatenate([_song(6, 8), _excerpt(_song(20, 7), 5.0, 8.0)]), SR, subtype="FLOAT")
+    index_dir = str(tmp_path / "index")
+
+    main(["index", "add", str(reference), "--index", index_dir, "--compact"])
+    main(["index", "query", str(submission), "--index", index_dir])
+    count, offset, path, name = capsys.readouterr().out.strip().split("\t")
+    assert path == str(submission) and name == str(reference) and int(count) >= 8
+    # The excerpt starts 5 s into the reference but 6 s into the submission.
+    assert float(offset) == pytest.approx(-1.0, abs=0.05)
+
+    _, results = run_full_analysis(str(submission), target_sr=16000, cascade=True, index=index_dir)
+    cascade = results["metadata"]["cascade"]
+    assert cascade["tiers"]["fingerprint"] == 1 and "known_matches" in cascade["triggers"]
+    assert results["fingerprint"]["matches"][0]["name"] == str(reference)
+    _, plain = run_full_analysis(str(submission), target_sr=16000, only=["fingerprint", "steganography"])
+    assert "fingerprint" not in plain
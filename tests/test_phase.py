@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from frequencipher.phase import detect_phase_anomalies
+
+SR = 22050
+
+
+def _reference(samples: np.ndarray) -> dict:
+    """The original full-matrix phase metrics."""
+
+    from scipy.stats import entropy
+
+    import librosa
+
+    phase_diff = np.diff(np.unwrap(np.angle(librosa.stft(samples, n_fft=2048, hop_length=512))), axis=1)
+    hist, _ = np.histogram(phase_diff.flatten(), bins=64, range=(-np.pi, np.pi), density=True)
+    return {
+        "phase_variance": float(np.var(phase_diff)),
+        "phase_mean_deviation": float(np.mean(np.abs(phase_diff))),
+        "phase_coherence": float(np.abs(np.mean(np.exp(1j * phase_diff)))),
+        "phase_entropy": float(entropy(hist + 1e-8)),
+        "phase_diff_percentile_75": float(np.percentile(phase_diff, 75)),
+    }
+
+
+def _noise(seconds: float, seed: int = 0) -> np.ndarray:
+    return (0.1 * np.random.default_rng(seed).standard_normal(int(seconds * SR))).astype(np.float32)
+
+
+def test_block_metrics_match_full_matrix() -> None:
+    samples = _noise(6.0)
+    result = detect_phase_anomalies(samples, SR, block_frames=64)
+    for name, expected in _reference(samples).items():
+        assert result[name] == pytest.approx(expected, rel=0.02, abs=1e-3), name
+
+
+def test_map_locates_phase_ordered_region() -> None:
+    samples = _noise(8.0)
+    t = np.arange(2 * SR) / SR
+    # Bin-centred carriers across 2.8-3.4 kHz in seconds 4-6, as a multi-carrier phase code leaves.
+    phases = np.random.default_rng(1).uniform(0, 2 * np.pi, 14)
+    for k, phase in zip(range(260, 316, 4), phases):
+        samples[4 * SR : 6 * SR] += (0.05 * np.sin(2 * np.pi * k * SR / 2048 * t + phase)).astype(np.float32)
+    result = detect_phase_anomalies(samples, SR)
+    coherence = np.array(result["map"]["coherence"])
+    entropy = np.array(result["map"]["entropy"])
+    time = np.array(result["map"]["time"])
+    assert coherence.shape == (time.size, 16)
+    band = int(np.searchsorted(result["map"]["band_edges_hz"], 3100)) - 1
+    centre = time + result["map"]["cell_seconds"] / 2
+    inside = (centre > 4.0) & (centre < 6.0)
+    outside = (time + result["map"]["cell_seconds"] <= 4.0) | (time >= 6.0)
+    assert coherence[inside, band].min() > coherence[outside, band].max() + 0.1
+    assert entropy[inside, band].max() < entropy[outside, band].min()
+    assert coherence[inside, band].min() > np.delete(coherence[inside], band, axis=1).max()
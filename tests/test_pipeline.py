@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from pathlib import Path
 
 import numpy as np
@@ -44,4 +45,23 @@ def test_run_full_analysis_structure(tmp_audio_file: Path) -> None:
     assert "steganography" in results
     assert "temporal" in results
     assert "watermark" in results
+    assert "enf" in results
     assert "anomaly" in results
+
+
+def test_stereo_analysis_reports_channels(tmp_audio_file: Path) -> None:
+    _, results = run_full_analysis(str(tmp_audio_file), target_sr=22050, mono=False, only=["channels", "phase"])
+    channels = results["channels"]
+    assert channels["channels"] == 2 and len(channels["per_channel"]) == 2
+    # The 5 Hz modulation is in antiphase, so it lives only in the side channel.
+    assert channels["side_band_ratio"][0] > 0.1 and channels["side_band_ratio_max"] == channels["side_band_ratio"][0]
+    assert "phase_entropy" in results["phase"]
+
+
+@pytest.mark.parametrize("mono", [True, False])
+def test_undefined_metrics_serialise_as_json(tmp_path: Path, mono: bool) -> None:
+    # Silence has no tempo or hum, and the mono downmix has no channel metrics.
+    path = tmp_path / "silence.wav"
+    sf.write(path, np.zeros((2 * 16000, 2)), 16000)
+    _, results = run_full_analysis(str(path), mono=mono)
+    json.dumps(results, allow_nan=False)
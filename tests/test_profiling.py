@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+from frequencipher.analysis import run_full_analysis
+from frequencipher.cache import ResultCache
+from frequencipher.profiling import Profiler, StageRecord, profiling, stage, write_prometheus
+from frequencipher.scheduler import Task, run_tasks
+
+
+def test_nested_stages_record_peaks_and_call_hooks() -> None:
+    seen: list[StageRecord] = []
+    profiler = Profiler(hooks=[seen.append])
+    with profiling(profiler):
+        with stage("outer"):
+            with stage("inner"):
+                block = np.ones(1 << 20)
+            del block
+            with stage("inner"):
+                pass
+    assert [record.name for record in seen] == ["inner", "inner", "outer"]
+    summary = profiler.to_dict()
+    assert summary["inner"]["calls"] == 2
+    assert summary["inner"]["peak_bytes"] >= 8 << 20
+    assert summary["outer"]["peak_bytes"] >= summary["inner"]["peak_bytes"]
+    with stage("ignored"):
+        pass
+    assert "ignored" not in profiler.to_dict()
+
+
+def test_profiler_follows_tasks_onto_worker_threads() -> None:
+    profiler = Profiler(trace_memory=False)
+    tasks = [Task(name, lambda _, name=name: _run_stage(name)) for name in ("a", "b")]
+    with profiling(profiler):
+        run_tasks(tasks, workers=2)
+    assert set(profiler.to_dict()) == {"a", "b"}
+
+
+def _run_stage(name: str) -> None:
+    with stage(name):
+        pass
+
+
+def test_profile_section_is_not_cached(tmp_path: Path) -> None:
+    path = tmp_path / "tone.wav"
+    sf.write(path, 0.1 * np.sin(np.arange(16000) * 0.05), 16000)
+    cache = ResultCache(tmp_path / "cache")
+    profiler = Profiler(trace_memory=False)
+    _, results = run_full_analysis(str(path), target_sr=16000, cache=cache, only=["phase"], profiler=profiler)
+    assert {"analysis", "ingestion", "detector.phase"} <= set(results["profile"])
+    _, cached = run_full_analysis(str(path), target_sr=16000, cache=cache, only=["phase"])
+    assert "profile" not in cached
+
+    prom = tmp_path / "profile.prom"
+    write_prometheus(results["profile"], prom, labels={"host": "a"})
+    text = prom.read_text()
+    assert "# TYPE frequencipher_stage_wall_seconds gauge" in text
+    assert 'frequencipher_stage_calls{stage="detector.phase",host="a"} 1.0' in text
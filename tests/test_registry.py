@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from frequencipher import analysis
+from frequencipher.analysis import run_full_analysis
+from frequencipher.registry import DETECTORS, select_detectors
+
+
+def test_selection_orders_and_closes_dependencies() -> None:
+    assert select_detectors() == list(DETECTORS)
+    assert select_detectors(profile="triage") == ["backmask", "subliminal", "steganography", "temporal"]
+    assert select_detectors(only=["anomaly", "phase"]) == ["spectral", "phase", "anomaly"]
+    assert "watermark" not in select_detectors(skip=["watermark"])
+    with pytest.raises(ValueError, match="Unknown detector"):
+        select_detectors(only=["nope"])
+    with pytest.raises(ValueError, match="Unknown profile"):
+        select_detectors(profile="nope")
+
+
+def test_stego_only_skips_decoding(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "pcm.wav"
+    samples = np.random.default_rng(0).integers(-2000, 2000, size=(8000, 2), dtype=np.int16)
+    sf.write(path, samples, 8000, subtype="PCM_16")
+
+    def fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("audio was decoded")
+
+    monkeypatch.setattr(analysis, "load_audio", fail)
+    audio, results = run_full_analysis(str(path), profile="stego-only")
+    assert set(results) == {"metadata", "steganography"}
+    assert results["metadata"]["detectors"] == ["steganography"]
+    assert results["steganography"]["bit_depth"] == 16
+    assert audio.sample_rate == 8000 and audio.duration == pytest.approx(1.0)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+from scipy.signal import resample_poly
+
+from frequencipher.analysis import run_full_analysis
+from frequencipher.context import AnalysisContext
+from frequencipher.resample import PolyphaseResampler, polyphase_filter, rational_factors, resample
+
+
+@pytest.mark.parametrize(("source", "target"), [(96000, 44100), (44100, 22050), (8000, 44100)])
+def test_block_resampler_matches_resample_poly(source: int, target: int) -> None:
+    samples = np.random.default_rng(0).standard_normal(20011)
+    resampler = PolyphaseResampler(source, target)
+    pieces = [resampler.process(samples[start : start + 3001]) for start in range(0, samples.size, 3001)]
+    pieces.append(resampler.flush())
+    expected = resample_poly(samples, *rational_factors(source, target))
+    np.testing.assert_allclose(np.concatenate(pieces), expected, atol=1e-12)
+
+
+def test_filter_designs_and_rates_are_memoised() -> None:
+    polyphase_filter.cache_clear()
+    resample(np.zeros(100), 48000, 44100)
+    resample(np.zeros(100), 48000, 44100)
+    assert polyphase_filter.cache_info().hits >= 1
+
+    context = AnalysisContext(np.zeros((2, 4800), dtype=np.float32), 48000)
+    assert context.at_rate(48000) is context
+    half = context.at_rate(24000)
+    assert half is context.at_rate(24000)
+    assert half.samples.shape == (2, 2400) and half.samples.dtype == np.float32
+
+
+def test_detectors_run_at_declared_rates(tmp_path: Path) -> None:
+    path = tmp_path / "hi.wav"
+    t = np.arange(96000) / 96000
+    sf.write(path, 0.5 * np.sin(2 * np.pi * 440 * t), 96000, subtype="PCM_16")
+    _, results = run_full_analysis(str(path), target_sr=44100)
+    assert results["metadata"]["sample_rate"] == 44100
+    assert results["metadata"]["analysis_rates"] == {
+        "subliminal": 96000, "temporal": 22050, "watermark": 22050, "enf": 1000
+    }
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from frequencipher import analysis
+from frequencipher.cache import ResultCache
+from frequencipher.scheduler import Task, run_tasks
+
+
+def _boom(_: object) -> None:
+    raise RuntimeError("boom")
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_results_are_ordered_and_failures_isolated(workers: int) -> None:
+    tasks = [
+        Task("slow", lambda _: sum(range(10_000))),
+        Task("broken", _boom),
+        Task("fast", lambda _: 1),
+        Task("needs_broken", lambda inputs: inputs["broken"], depends_on=("broken",)),
+        Task("needs_fast", lambda inputs: inputs["fast"] + 1, depends_on=("fast",)),
+    ]
+    results, errors = run_tasks(tasks, workers=workers)
+    assert list(results) == ["slow", "fast", "needs_fast"]
+    assert results["needs_fast"] == 2
+    assert errors == {"broken": "RuntimeError: boom", "needs_broken": "dependency 'broken' failed"}
+
+
+def test_tasks_run_concurrently() -> None:
+    barrier = threading.Barrier(2, timeout=5)
+    tasks = [Task(name, lambda _: barrier.wait()) for name in ("a", "b")]
+    results, errors = run_tasks(tasks, workers=2)
+    assert not errors and set(results) == {"a", "b"}
+
+
+def test_failing_detector_keeps_other_results(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "clip.wav"
+    sf.write(path, 0.3 * np.random.default_rng(0).standard_normal(22050), 22050)
+    monkeypatch.setattr(analysis, "detect_watermark", lambda *args, **kwargs: _boom(None))
+    cache = ResultCache(tmp_path / "cache")
+
+    _, results = analysis.run_full_analysis(str(path), target_sr=22050, cache=cache, detector_workers=4)
+    assert results["watermark"] == {"error": "RuntimeError: boom"}
+    assert results["metadata"]["errors"] == {"watermark": "RuntimeError: boom"}
+    assert "anomaly_score" in results["anomaly"]
+    assert list(results)[1:] == [
+        "spectral", "phase", "backmask", "subliminal", "steganography", "temporal", "watermark", "enf", "channels", "anomaly"
+    ]
+    assert not list((tmp_path / "cache").glob("*/*.json"))
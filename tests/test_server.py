@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from frequencipher.exceptions import ServiceBusyError
+from frequencipher.server import AnalysisService
+
+
+async def _request(port: int, method: str, target: str, payload: Any = None) -> Tuple[int, bytes]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), content
+
+
+def _chunks(content: bytes) -> List[Dict[str, Any]]:
+    lines = []
+    while content:
+        size, _, rest = content.partition(b"\r\n")
+        length = int(size, 16)
+        if length == 0:
+            break
+        lines.append(json.loads(rest[:length]))
+        content = rest[length + 2 :]
+    return lines
+
+
+def test_jobs_stream_status_and_results(tmp_path: Path) -> None:
+    path = tmp_path / "clip.wav"
+    sf.write(path, 0.3 * np.sin(np.arange(8000) * 0.2), 8000)
+
+    async def scenario() -> None:
+        service = AnalysisService(workers=1, queue_size=4)
+        await service.start(warm_up=False)
+        server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            status, body = await _request(port, "POST", "/jobs", {"path": str(path), "options": {"only": ["phase"]}})
+            assert status == 202
+            job_id = json.loads(body)["id"]
+            status, body = await _request(port, "GET", f"/jobs/{job_id}/events")
+            events = _chunks(body)
+            assert events[-1]["status"] == "done"
+            assert set(events[-1]["results"]) == {"metadata", "phase"}
+
+            status, body = await _request(port, "POST", "/analyse", {"path": str(path), "options": {"bogus": 1}})
+            assert status == 400
+            for options in ({"block_size": 4096}, {"stream": True, "target_sr": 22050}):
+                assert (await _request(port, "POST", "/jobs", {"path": str(path), "options": options}))[0] == 400
+            for length in ("abc", "-1"):
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(f"POST /jobs HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+                assert (await reader.read()).split()[1] == b"400"
+                writer.close()
+            status, body = await _request(port, "POST", "/analyse", {"path": str(tmp_path / "missing.wav")})
+            assert status == 200 and json.loads(body)["status"] == "failed"
+            assert (await _request(port, "GET", "/jobs/nope"))[0] == 404
+            assert json.loads((await _request(port, "GET", "/health"))[1])["queued"] == 0
+        finally:
+            server.close()
+            await service.close()
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_is_refused() -> None:
+    async def scenario() -> None:
+        service = AnalysisService(workers=1, queue_size=1)
+        await service.start(warm_up=False)
+        try:
+            service.submit("a.wav")
+            with pytest.raises(ServiceBusyError):
+                service.submit("b.wav")
+        finally:
+            await service.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# The CLI is invoked thousands of times a day from shell pipelines; keep its
+# startup free of the scientific stack and well under this budget.
+HELP_BUDGET_SECONDS = 1.5
+HEAVY_MODULES = ("librosa.core", "scipy.signal", "scipy.stats", "sklearn", "fpdf", "numba", "matplotlib")
+
+PACKAGE_PARENT = Path(__file__).resolve().parents[2]
+
+
+def _run(*args: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=str(PACKAGE_PARENT))
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, check=True)
+
+
+def test_cli_import_does_not_load_heavy_dependencies() -> None:
+    probe = (
+        "import json, sys, frequencipher, frequencipher.cli, frequencipher.analysis; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    assert json.loads(_run("-c", probe).stdout) == []
+
+
+def test_cli_help_startup_time() -> None:
+    _run("-m", "frequencipher.cli", "--help")  # warm the bytecode cache
+    start = time.perf_counter()
+    _run("-m", "frequencipher.cli", "--help")
+    assert time.perf_counter() - start < HELP_BUDGET_SECONDS
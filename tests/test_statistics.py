@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from frequencipher.statistics import SummaryAccumulator, summarise_array
+
+
+def _reference(values: np.ndarray) -> dict:
+    finite = values[np.isfinite(values)].astype(np.float64)
+    return {
+        "mean": np.mean(finite),
+        "std": np.std(finite),
+        "median": np.median(finite),
+        "min": np.min(finite),
+        "max": np.max(finite),
+        "percentile_25": np.percentile(finite, 25),
+        "percentile_75": np.percentile(finite, 75),
+    }
+
+
+def test_exact_summary_matches_numpy_and_ignores_non_finite() -> None:
+    values = np.random.default_rng(0).gamma(2.0, size=(300, 700)).astype(np.float32)
+    values[0, :5] = [np.nan, np.inf, -np.inf, np.nan, np.nan]
+    summary = summarise_array(values).to_dict()
+    for key, expected in _reference(values).items():
+        assert summary[key] == pytest.approx(expected, rel=1e-5)
+    assert np.isnan(summarise_array([]).mean)
+
+
+@pytest.mark.parametrize("exact", [True, False])
+def test_merged_partials_match_single_pass(exact: bool) -> None:
+    values = np.random.default_rng(1).normal(3.0, 2.0, size=50_000)
+    whole = SummaryAccumulator(exact=exact).update(values).result().to_dict()
+    merged = SummaryAccumulator(exact=exact)
+    for part in np.array_split(values, 7):
+        merged.merge(SummaryAccumulator(exact=exact).update(part))
+    merged_result = merged.result().to_dict()
+    for key in whole:
+        assert merged_result[key] == pytest.approx(whole[key], rel=1e-9)
+
+
+def test_approximate_quantiles_stay_within_relative_accuracy() -> None:
+    values = np.random.default_rng(2).normal(0.0, 1.0, size=200_000)
+    approx = summarise_array(values, exact=False).to_dict()
+    reference = _reference(values)
+    assert approx["mean"] == pytest.approx(reference["mean"], rel=1e-9)
+    for key in ("percentile_25", "percentile_75"):
+        assert approx[key] == pytest.approx(reference[key], rel=0.03)
+    assert abs(approx["median"] - reference["median"]) < 0.01
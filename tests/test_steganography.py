@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from frequencipher.analysis import run_full_analysis
+from frequencipher.steganography import detect_pcm_steganography, pcm_bit_depth
+
+
+@pytest.fixture()
+def pcm24_file(tmp_path: Path) -> Path:
+    rng = np.random.default_rng(0)
+    samples = (rng.standard_normal((48000, 2)) * 2**18).astype(np.int32)
+    samples[:, 1] &= ~1  # channel 1 has a stuck LSB
+    path = tmp_path / "evidence.wav"
+    sf.write(path, samples << 8, 48000, subtype="PCM_24")
+    return path
+
+
+def test_bit_planes_are_read_from_native_pcm(pcm24_file: Path) -> None:
+    results = detect_pcm_steganography(pcm24_file)
+    assert results["bit_depth"] == 24
+    planes = results["bit_planes"]
+    assert len(planes["channel_0"]["ones_ratio"]) == 24
+    assert planes["channel_0"]["ones_ratio"][0] == pytest.approx(0.5, abs=0.01)
+    assert planes["channel_1"]["ones_ratio"][0] == 0.0
+    assert planes["channel_1"]["window_flagged_ratio"][0] == 1.0
+    assert planes["channel_1"]["transition_rate"][0] == 0.0
+    assert planes["channel_0"]["window_flagged_ratio"][0] < 0.2
+
+
+def test_pipeline_uses_native_pcm_only_for_integer_files(pcm24_file: Path, tmp_path: Path) -> None:
+    float_path = tmp_path / "float.wav"
+    sf.write(float_path, np.zeros(4800, dtype=np.float32), 48000, subtype="FLOAT")
+    assert pcm_bit_depth(pcm24_file) == 24
+    assert pcm_bit_depth(float_path) is None
+
+    _, results = run_full_analysis(str(pcm24_file), target_sr=22050)
+    assert results["steganography"]["bit_depth"] == 24
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from frequencipher.analysis import run_streaming_analysis
+from frequencipher.backmask import detect_backmasking
+from frequencipher.ingestion import load_audio
+from frequencipher.steganography import detect_steganography
+from frequencipher.streaming import StreamReader
+from frequencipher.subliminal import detect_subliminal
+
+
+@pytest.fixture()
+def long_audio_file(tmp_path: Path) -> Path:
+    sr = 8000
+    rng = np.random.default_rng(1)
+    t = np.arange(sr * 12) / sr
+    signal = 0.4 * np.sin(2 * np.pi * 300 * t) + 0.05 * rng.standard_normal(t.size) + 0.1
+    # A noise burst that reappears reversed, for the backmasking segment scan.
+    burst = rng.standard_normal(sr)
+    signal[2 * sr : 3 * sr] += burst
+    signal[8 * sr : 9 * sr] += burst[::-1]
+    path = tmp_path / "long.wav"
+    sf.write(path, signal, sr, subtype="FLOAT")
+    return path
+
+
+def test_stream_reader_matches_load_audio(long_audio_file: Path) -> None:
+    audio = load_audio(long_audio_file)
+    with StreamReader(long_audio_file) as reader:
+        blocks = list(reader.blocks(block_size=4096, overlap=512))
+        joined = np.concatenate([block.fresh for block in blocks])
+    np.testing.assert_allclose(joined, audio.samples, atol=1e-5)
+    assert blocks[1].lead == 512
+
+
+def test_streaming_results_match_in_memory_detectors(long_audio_file: Path) -> None:
+    audio = load_audio(long_audio_file)
+    _, results = run_streaming_analysis(str(long_audio_file), block_size=4096, overlap=256)
+
+    expected_backmask = detect_backmasking(audio.samples, audio.sample_rate)
+    assert expected_backmask["segments"]
+    for key, value in expected_backmask.items():
+        if key == "segments":
+            assert results["backmask"][key] == [pytest.approx(segment, rel=1e-4, abs=1e-6) for segment in value]
+        else:
+            assert results["backmask"][key] == pytest.approx(value, rel=1e-4, abs=1e-6)
+
+    expected_stego = detect_steganography(audio.samples, audio.sample_rate)
+    assert results["steganography"]["lsb_transition_rate"] == pytest.approx(
+        expected_stego["lsb_transition_rate"], abs=1e-3
+    )
+    expected_subliminal = detect_subliminal(audio.samples, audio.sample_rate)
+    assert set(results["subliminal"]) == set(expected_subliminal)
+    assert results["subliminal"]["audible_energy"] == pytest.approx(expected_subliminal["audible_energy"], rel=1e-4)
+    np.testing.assert_allclose(
+        results["subliminal"]["tracks"]["audible_energy"],
+        expected_subliminal["tracks"]["audible_energy"],
+        rtol=1e-4,
+    )
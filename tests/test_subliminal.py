@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from frequencipher.subliminal import detect_subliminal
+
+
+def test_tracks_locate_ultrasonic_burst() -> None:
+    sr = 44100
+    rng = np.random.default_rng(0)
+    t = np.arange(sr * 10 + 123) / sr
+    samples = (0.1 * rng.standard_normal(t.size)).astype(np.float32)
+    burst = (t >= 4) & (t < 6)
+    samples[burst] += 0.5 * np.sin(2 * np.pi * 21000 * t[burst]).astype(np.float32)
+
+    results = detect_subliminal(samples, sr)
+    tracks = results["tracks"]
+    ultrasound = np.array(tracks["ultrasound_energy"])
+    loud = np.array(tracks["time"])[ultrasound > 1.3 * np.median(ultrasound)]
+    assert loud.min() == pytest.approx(3.5, abs=0.5)
+    assert loud.max() == pytest.approx(5.5, abs=0.5)
+    assert len(tracks["amplitude_modulation_std"]) == ultrasound.size
+    assert results["segment_seconds"] == pytest.approx(1.0)
+
+
+def test_whole_signal_mode_has_no_tracks() -> None:
+    samples = np.random.default_rng(1).standard_normal(8000).astype(np.float32)
+    results = detect_subliminal(samples, 8000, segment_seconds=None)
+    assert "tracks" not in results
+    assert results["amplitude_modulation_std"] > 0
+
+
+def test_side_channel_carrier_is_found() -> None:
+    sr = 44100
+    rng = np.random.default_rng(2)
+    t = np.arange(sr * 6) / sr
+    common = (0.1 * rng.standard_normal(t.size)).astype(np.float32)
+    carrier = (0.3 * np.sin(2 * np.pi * 21000 * t) * ((t >= 2) & (t < 4))).astype(np.float32)
+
+    results = detect_subliminal(np.stack([common + carrier, common - carrier]), sr)
+    mono, side = (np.array(section["tracks"]["ultrasound_energy"]) for section in (results, results["side"]))
+    assert mono.max() < 1.1 * np.median(mono)
+    assert side.max() > 10 * np.median(side)
+    assert np.array(results["side"]["tracks"]["time"])[side.argmax()] == pytest.approx(2.5, abs=1.0)
+    assert set(results["side"]) == set(results) - {"side"}
+    assert "side" not in detect_subliminal(common, sr)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from frequencipher.temporal import check_temporal_manipulation
+
+SR = 22050
+
+
+def _clicks(bpm: float, seconds: float) -> np.ndarray:
+    samples = np.zeros(int(seconds * SR), dtype=np.float32)
+    click = np.hanning(200) * np.sin(2 * np.pi * 1000 * np.arange(200) / SR)
+    for start in np.arange(0, seconds, 60.0 / bpm):
+        index = int(start * SR)
+        samples[index : index + 200] += click[: samples.size - index]
+    return samples
+
+
+def test_speed_change_and_zcr_drift_are_located() -> None:
+    samples = np.concatenate([_clicks(120, 40), _clicks(128, 40)])
+    t = np.arange(samples.size) / SR
+    samples += (0.2 * np.where(t < 60, np.sin(2 * np.pi * 300 * t), np.sin(2 * np.pi * 360 * t))).astype(np.float32)
+
+    result = check_temporal_manipulation(samples, SR)
+    points = {point["kind"]: point["time"] for point in result["change_points"]}
+    assert points["speed_change"] == pytest.approx(40.0, abs=1.0)
+    assert points["zcr_drift"] == pytest.approx(60.0, abs=0.5)
+    assert result["tracks"]["tempo_bpm"][0] == pytest.approx(120.0, abs=1.0)
+    assert result["tracks"]["tempo_bpm"][-1] == pytest.approx(128.0, abs=1.0)
+
+
+def test_hard_splice_is_timestamped() -> None:
+    t = np.arange(20 * SR) / SR
+    samples = (0.5 * np.sin(2 * np.pi * 250 * t)).astype(np.float32)
+    cut = int(12.501 * SR)  # at a waveform peak, so the polarity flip jumps by twice the amplitude
+    samples[cut:] = -samples[cut:]
+
+    result = check_temporal_manipulation(samples, SR)
+    splices = [point for point in result["change_points"] if point["kind"] == "splice"]
+    assert len(splices) == 1
+    assert splices[0]["time"] == pytest.approx(12.5, abs=0.01)
+    assert not [point for point in result["change_points"] if point["kind"] != "splice"]
+
+
+def test_silence_has_no_tempo() -> None:
+    samples = np.zeros(20 * SR, dtype=np.float32)
+    samples[12 * SR :] = _clicks(120, 8)
+
+    silent = check_temporal_manipulation(samples[: 12 * SR], SR)
+    assert silent["tempo_bpm"] is None
+    assert silent["tempo_interval_std"] is None
+    assert silent["tempo_interval_percentile_75"] is None
+    assert all(value is None for value in silent["tracks"]["tempo_bpm"])
+    assert not silent["change_points"]
+
+    # Clicks starting after a silent intro are no speed change.
+    result = check_temporal_manipulation(samples, SR)
+    assert result["tracks"]["tempo_bpm"][0] is None
+    assert not [point for point in result["change_points"] if point["kind"] == "speed_change"]
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from frequencipher.analysis import run_full_analysis
+
+
+def _write(path: Path, reversed_segment: bool) -> str:
+    sr = 16000
+    samples = (0.3 * np.random.default_rng(0).standard_normal(sr * 8)).astype(np.float32)
+    if reversed_segment:
+        samples[5 * sr : 6 * sr] = samples[1 * sr : 2 * sr][::-1]
+    sf.write(path, samples, sr, subtype="FLOAT")
+    return str(path)
+
+
+def test_clean_file_stays_in_first_tier(tmp_path: Path) -> None:
+    _, results = run_full_analysis(_write(tmp_path / "clean.wav", False), target_sr=16000, cascade=True)
+    cascade = results["metadata"]["cascade"]
+    assert not cascade["escalated"] and cascade["triggers"] == []
+    assert cascade["tiers"] == {"backmask": 1, "subliminal": 1, "steganography": 1, "enf": 1, "channels": 1}
+    assert "watermark" in cascade["deferred"] and "watermark" not in results
+    assert "segments" not in results["backmask"] and "screen_score" in results["backmask"]
+
+
+def test_reversed_segment_escalates_to_second_tier(tmp_path: Path) -> None:
+    _, results = run_full_analysis(_write(tmp_path / "reversed.wav", True), target_sr=16000, cascade=True)
+    cascade = results["metadata"]["cascade"]
+    assert cascade["escalated"] and "reversed_correlation" in cascade["triggers"]
+    assert cascade["tiers"]["backmask"] == 2 and cascade["tiers"]["watermark"] == 2
+    assert results["backmask"]["max_segment_score"] > 0.95
+    assert results["metadata"]["detectors"] == list(cascade["tiers"])
+
+
+def test_reversal_in_side_channel_escalates_and_is_scanned(tmp_path: Path) -> None:
+    sr = 16000
+    side = 0.3 * sf.read(_write(tmp_path / "side.wav", True), dtype="float32")[0]
+    common = (0.3 * np.random.default_rng(1).standard_normal(sr * 8)).astype(np.float32)
+    path = tmp_path / "stereo.wav"
+    sf.write(path, np.column_stack([common + side, common - side]), sr, subtype="FLOAT")
+
+    _, results = run_full_analysis(str(path), target_sr=16000, mono=False, cascade=True)
+    cascade = results["metadata"]["cascade"]
+    assert cascade["triggers"] == ["reversed_correlation"]
+    assert cascade["scores"]["reversed_correlation"] == results["backmask"]["side"]["screen_score"]
+    assert results["backmask"]["max_segment_score"] < 0.5
+    assert results["backmask"]["side"]["max_segment_score"] > 0.95
+
+
+def test_clean_wide_stereo_stays_in_first_tier(tmp_path: Path) -> None:
+    sr = 16000
+    rng = np.random.default_rng(2)
+    common = 0.3 * rng.standard_normal(sr * 8)
+    delay = int(0.01 * sr)
+    # A 10 ms inter-channel delay plus independent noise per channel, as a spaced microphone pair records.
+    left = common + 0.05 * rng.standard_normal(common.size)
+    right = np.concatenate([np.zeros(delay), common[:-delay]]) + 0.05 * rng.standard_normal(common.size)
+    path = tmp_path / "wide.wav"
+    sf.write(path, np.column_stack([left, right]).astype(np.float32), sr, subtype="FLOAT")
+
+    _, results = run_full_analysis(str(path), target_sr=16000, mono=False, cascade=True)
+    cascade = results["metadata"]["cascade"]
+    assert not cascade["escalated"] and cascade["triggers"] == []
+    assert cascade["scores"]["side_band_ratio"] < 0.5
+    assert results["channels"]["side_energy_ratio"] > 0.5
+
+
+def test_unknown_triage_threshold_is_rejected(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Unknown triage threshold"):
+        run_full_analysis(_write(tmp_path / "clean.wav", False), cascade=True, triage_thresholds={"nope": 1.0})
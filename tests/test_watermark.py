@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from frequencipher.watermark import detect_watermark
+
+
+def test_fast_mode_locates_embedded_tonal_segment() -> None:
+    sr = 22050
+    samples = (0.2 * np.random.default_rng(0).standard_normal(sr * 20)).astype(np.float32)
+    t = np.arange(sr * 3) / sr
+    samples[8 * sr : 11 * sr] += (0.3 * np.sin(2 * np.pi * 3000 * t)).astype(np.float32)
+
+    result = detect_watermark(samples, sr)
+    assert len(result["segments"]) == 1
+    segment = result["segments"][0]
+    assert segment["start"] == pytest.approx(8.0, abs=0.2)
+    assert segment["end"] == pytest.approx(11.0, abs=0.2)
+    assert len(result["tracks"]["time"]) == len(result["tracks"]["likelihood"])
+    assert max(result["tracks"]["likelihood"]) > 0.9
+
+
+def test_fast_mode_matches_cqt_flatness_and_rejects_unknown_modes() -> None:
+    sr = 22050
+    samples = (0.2 * np.random.default_rng(1).standard_normal(sr * 5)).astype(np.float32)
+    fast = detect_watermark(samples, sr)
+    reference = detect_watermark(samples, sr, mode="cqt")
+    assert fast["spectral_flatness_mean"] == pytest.approx(reference["spectral_flatness_mean"], rel=1e-4)
+    assert fast["segments"] == []
+    with pytest.raises(ValueError, match="Unknown watermark mode"):
+        detect_watermark(samples, sr, mode="nope")
+
+
+@pytest.mark.filterwarnings("error::RuntimeWarning")
+@pytest.mark.parametrize("sr", [22050, 96000])
+def test_steady_tone_has_no_outlier_frames(sr: int) -> None:
+    samples = (0.5 * np.sin(2 * np.pi * 440 * np.arange(sr * 5) / sr)).astype(np.float32)
+    result = detect_watermark(samples, sr)
+    assert result["likelihood_max"] == 0.0 and result["segments"] == []
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from frequencipher.ingestion import load_audio
+from frequencipher.wavmap import read_wav_layout
+
+
+@pytest.mark.parametrize(
+    ("subtype", "container", "channels"),
+    [("FLOAT", "WAV", 1), ("PCM_16", "WAV", 2), ("PCM_24", "RF64", 2), ("PCM_U8", "WAV", 1)],
+)
+@pytest.mark.parametrize("mono", [True, False])
+def test_mapped_ingestion_matches_soundfile(
+    tmp_path: Path, subtype: str, container: str, channels: int, mono: bool
+) -> None:
+    rng = np.random.default_rng(0)
+    data = np.clip(0.4 * rng.standard_normal((5003, channels)) + 0.1, -1, 0.99)
+    path = tmp_path / "clip.wav"
+    sf.write(path, data, 8000, subtype=subtype, format=container)
+
+    mapped = load_audio(path, mono=mono, chunk_size=1024)
+    decoded = load_audio(path, mono=mono, mmap=False)
+    assert mapped.samples.shape == decoded.samples.shape
+    np.testing.assert_allclose(mapped.samples, decoded.samples, atol=1e-6)
+    assert mapped.memory_mapped == (subtype == "FLOAT")
+
+
+def test_layout_rejects_compressed_audio(tmp_path: Path) -> None:
+    path = tmp_path / "clip.wav"
+    sf.write(path, np.zeros(100), 8000, subtype="IMA_ADPCM")
+    assert read_wav_layout(path) is None
+    assert load_audio(path).samples.size > 0
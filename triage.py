@@ -0,0 +1,95 @@
+"""Cheap first-pass scores that decide whether the expensive detectors run."""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Optional
+
+# A score at or above its threshold escalates the file to the second tier.
+# Defaults keep the benchmark's clean speech and held-chord music below every
+# threshold (its ``clean_not_escalated`` check) while planted reversed
+# speech, intermittent ultrasonic carriers and partial LSB payloads cross at
+# least one of them (see ``benchmark.SUITES``).
+TRIAGE_THRESHOLDS: Dict[str, float] = {
+    # Indexed known-bad tracks found in the file (needs a fingerprint index).
+    "known_matches": 1.0,
+    # Best windowed correlation between the signal and its reversal, discounted
+    # for stationary periodicity. Five minutes of clean benchmark speech reach
+    # about 0.43 and held-chord music 0; planted reversals score above 0.99.
+    "reversed_correlation": 0.7,
+    # Loudest ultrasound segment relative to the median segment.
+    "ultrasound_contrast": 1.25,
+    # Infrasound plus ultrasound band energy relative to the audible band.
+    "band_energy_ratio": 3.0,
+    # Spread of the per-window LSB ratio; partial payloads raise it.
+    "lsb_window_std": 0.05,
+    # Phase or frequency discontinuities in the mains hum, which edits leave.
+    "enf_discontinuities": 1.0,
+    # Side (L - R) energy incoherent with the mid (L + R) signal, relative to
+    # the rest of the band, in the most lopsided band. Delayed or panned
+    # mixes score near 0 and independent channels near 1; the benchmark's
+    # spaced-pair stereo with independent noise reaches about 1.8.
+    "side_band_ratio": 4.0,
+}
+
+
+def check_thresholds(thresholds: Optional[Mapping[str, float]]) -> Dict[str, float]:
+    """Merge ``thresholds`` over :data:`TRIAGE_THRESHOLDS`, rejecting unknown names."""
+
+    thresholds = dict(thresholds or {})
+    unknown = [name for name in thresholds if name not in TRIAGE_THRESHOLDS]
+    if unknown:
+        raise ValueError(
+            f"Unknown triage threshold(s): {', '.join(unknown)}. Available: {', '.join(TRIAGE_THRESHOLDS)}"
+        )
+    return {**TRIAGE_THRESHOLDS, **{name: float(value) for name, value in thresholds.items()}}
+
+
+def _sections(result: Mapping[str, Any]) -> List[Mapping[str, Any]]:
+    """A detector's mono result plus its ``side`` section, if any; scores take the worse of the two."""
+
+    return [result] + ([result["side"]] if "side" in result else [])
+
+
+def _contrast(track: Optional[List[float]]) -> Optional[float]:
+    if not track:
+        return None
+    median = sorted(track)[len(track) // 2]
+    return float(max(track) / median) if median > 0 else 0.0
+
+
+def triage_scores(results: Mapping[str, Mapping[str, Any]]) -> Dict[str, float]:
+    """First-pass scores available from the first-tier detector ``results``.
+
+    Scores whose detector did not run (or failed) are left out. Backmask
+    and subliminal scores take the larger of the mono and side values.
+    """
+
+    scores: Dict[str, float] = {}
+    fingerprint = results.get("fingerprint")
+    if fingerprint and "error" not in fingerprint:
+        scores["known_matches"] = float(len(fingerprint["matches"]))
+    backmask = results.get("backmask")
+    if backmask and "screen_score" in backmask:
+        scores["reversed_correlation"] = max(float(section["screen_score"]) for section in _sections(backmask))
+    subliminal = results.get("subliminal")
+    if subliminal and "error" not in subliminal:
+        sections = _sections(subliminal)
+        scores["band_energy_ratio"] = max(float(section["subliminal_energy_ratio"]) for section in sections)
+        contrasts = [_contrast(section.get("tracks", {}).get("ultrasound_energy")) for section in sections]
+        if any(contrast is not None for contrast in contrasts):
+            scores["ultrasound_contrast"] = max(contrast for contrast in contrasts if contrast is not None)
+    steganography = results.get("steganography")
+    if steganography and "error" not in steganography:
+        scores["lsb_window_std"] = float(steganography["lsb_window_std"])
+    enf = results.get("enf")
+    if enf and "error" not in enf:
+        scores["enf_discontinuities"] = float(len(enf["discontinuities"]))
+    channels = results.get("channels")
+    if channels and "error" not in channels and channels["channels"] > 1:
+        scores["side_band_ratio"] = float(channels["side_band_ratio_max"])
+    return scores
+
+
+def escalation_triggers(scores: Mapping[str, float], thresholds: Mapping[str, float]) -> List[str]:
+    """Names of the ``scores`` at or above their threshold."""
+
+    return [name for name, value in scores.items() if name in thresholds and value >= thresholds[name]]
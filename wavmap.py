@@ -0,0 +1,126 @@
+"""Memory-mapped access to the sample data of PCM and float WAV/RF64 files."""
+from __future__ import annotations
+
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+_RF64_SIZE_PLACEHOLDER = 0xFFFFFFFF
+
+_NATIVE_DTYPES = {
+    (_WAVE_FORMAT_PCM, 8): np.dtype("u1"),
+    (_WAVE_FORMAT_PCM, 16): np.dtype("<i2"),
+    (_WAVE_FORMAT_PCM, 32): np.dtype("<i4"),
+    (_WAVE_FORMAT_IEEE_FLOAT, 32): np.dtype("<f4"),
+    (_WAVE_FORMAT_IEEE_FLOAT, 64): np.dtype("<f8"),
+}
+
+
+@dataclass(slots=True)
+class WavLayout:
+    """Where and how the samples of a WAV/RF64 file are stored."""
+
+    data_offset: int
+    frames: int
+    channels: int
+    sample_rate: int
+    format_tag: int
+    bits_per_sample: int
+
+    @property
+    def block_align(self) -> int:
+        return self.channels * self.bits_per_sample // 8
+
+    @property
+    def is_float32(self) -> bool:
+        return self.format_tag == _WAVE_FORMAT_IEEE_FLOAT and self.bits_per_sample == 32
+
+
+def read_wav_layout(path: str | Path) -> Optional[WavLayout]:
+    """Parse the RIFF/RF64 chunk list of ``path``.
+
+    Returns ``None`` for anything that is not an uncompressed 8/16/24/32-bit
+    PCM or 32/64-bit float WAV, so callers can fall back to ``soundfile``.
+    """
+
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] not in (b"RIFF", b"RF64") or header[8:12] != b"WAVE":
+            return None
+        data_size_64: Optional[int] = None
+        fmt: Optional[tuple] = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                return None
+            chunk_id, size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+            if chunk_id == b"data":
+                if size == _RF64_SIZE_PLACEHOLDER and data_size_64 is not None:
+                    size = data_size_64
+                data_offset = f.tell()
+                break
+            body = f.read(size) if chunk_id in (b"ds64", b"fmt ") else None
+            if chunk_id == b"ds64" and body is not None and len(body) >= 16:
+                data_size_64 = struct.unpack("<Q", body[8:16])[0]
+            elif chunk_id == b"fmt " and body is not None and len(body) >= 16:
+                fmt = struct.unpack("<HHIIHH", body[:16])
+                if fmt[0] == _WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                    fmt = (struct.unpack("<H", body[24:26])[0],) + fmt[1:]
+            if body is None:
+                f.seek(size, os.SEEK_CUR)
+            if size % 2:
+                f.seek(1, os.SEEK_CUR)
+
+    if fmt is None:
+        return None
+    format_tag, channels, sample_rate, _, block_align, bits = fmt
+    supported = (format_tag, bits) in _NATIVE_DTYPES or (format_tag == _WAVE_FORMAT_PCM and bits == 24)
+    if not supported or channels == 0 or block_align != channels * bits // 8:
+        return None
+    size = min(size, file_size - data_offset)
+    return WavLayout(data_offset, size // block_align, channels, sample_rate, format_tag, bits)
+
+
+def map_frames(path: str | Path, layout: WavLayout, *, mode: str = "r") -> np.memmap:
+    """Memory-map the sample data as ``(frames, channels)``.
+
+    Formats with a native NumPy dtype map to that dtype; packed 24-bit PCM
+    maps to ``(frames, channels, 3)`` bytes (see :func:`decode_frames`).
+    ``mode="c"`` gives a copy-on-write view that may be modified in place.
+    """
+
+    dtype = _NATIVE_DTYPES.get((layout.format_tag, layout.bits_per_sample))
+    if dtype is None:
+        shape: tuple = (layout.frames, layout.channels, 3)
+        dtype = np.dtype("u1")
+    else:
+        shape = (layout.frames, layout.channels)
+    return np.memmap(path, dtype=dtype, mode=mode, offset=layout.data_offset, shape=shape)
+
+
+def decode_frames(frames: np.ndarray) -> np.ndarray:
+    """Convert mapped frames to float32 in ``[-1, 1)``, scaled like ``soundfile``."""
+
+    if frames.ndim == 3:
+        values = frames[..., 2].astype(np.int8).astype(np.int32) << 16
+        values |= frames[..., 1].astype(np.int32) << 8
+        values |= frames[..., 0]
+        scale = 2.0**-23
+    elif frames.dtype == np.uint8:
+        values = frames.astype(np.int16) - 128
+        scale = 2.0**-7
+    elif frames.dtype.kind == "i":
+        values = frames
+        scale = 2.0 ** -(8 * frames.dtype.itemsize - 1)
+    else:
+        values = frames
+        scale = 1.0
+    return np.multiply(values, np.float32(scale), dtype=np.float32, casting="unsafe")